@@ -77,6 +77,8 @@ CREATE TABLE dbo.dim_cliente (
     fecha_fin DATETIME2 NULL,
     version INT DEFAULT 1,
     es_actual BIT DEFAULT 1,                      -- 1 = Registro actual, 0 = Histórico
+    es_inferido BIT NOT NULL DEFAULT 0,           -- 1 = Miembro inferido desde un hecho, pendiente de completar
+    hash_atributos BINARY(16) NULL,               -- MD5 de los atributos (detección de cambios)
     
     -- Metadatos de Auditoría
     created_at DATETIME2 DEFAULT GETDATE(),
@@ -123,6 +125,8 @@ CREATE TABLE dbo.dim_producto (
     fecha_fin DATETIME2 NULL,
     version INT DEFAULT 1,
     es_actual BIT DEFAULT 1,                      -- 1 = Registro actual, 0 = Histórico
+    es_inferido BIT NOT NULL DEFAULT 0,           -- 1 = Miembro inferido desde un hecho, pendiente de completar
+    hash_atributos BINARY(16) NULL,               -- MD5 de los atributos (detección de cambios)
     
     -- Metadatos de Auditoría
     created_at DATETIME2 DEFAULT GETDATE(),
@@ -160,6 +164,7 @@ CREATE TABLE dbo.dim_vendedor (
     fecha_fin DATETIME2 NULL,
     version INT DEFAULT 1,
     es_actual BIT DEFAULT 1,                      -- 1 = Registro actual, 0 = Histórico
+    hash_atributos BINARY(16) NULL,               -- MD5 de los atributos (detección de cambios)
     
     -- Metadatos de Auditoría
     created_at DATETIME2 DEFAULT GETDATE(),
@@ -187,6 +192,7 @@ CREATE TABLE dbo.dim_tipo_documento (
     -- Atributos Descriptivos
     codigo VARCHAR(10) NOT NULL,
     nombre VARCHAR(50) NOT NULL,
+    es_inferido BIT NOT NULL DEFAULT 0,           -- 1 = Miembro inferido desde un hecho, pendiente de completar
     
     -- Metadatos de Auditoría
     created_at DATETIME2 DEFAULT GETDATE(),
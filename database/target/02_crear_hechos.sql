@@ -33,6 +33,7 @@ CREATE TABLE dbo.fact_ventas (
     
     -- Degenerate Dimensions (Dimensiones Degeneradas)
     venta_id INT NOT NULL,
+    salida_id INT NULL,                        -- Línea de detalle (llave natural junto con venta_id)
     orden_pedido_id INT NULL,
     numero_venta NVARCHAR(191) NULL,
     
@@ -93,6 +94,8 @@ CREATE NONCLUSTERED INDEX idx_fact_ventas_vendedor ON dbo.fact_ventas(vendedor_k
 CREATE NONCLUSTERED INDEX idx_fact_ventas_ubicacion ON dbo.fact_ventas(ubicacion_key);
 CREATE NONCLUSTERED INDEX idx_fact_ventas_fecha ON dbo.fact_ventas(fecha_venta);
 CREATE NONCLUSTERED INDEX idx_fact_ventas_venta_id ON dbo.fact_ventas(venta_id);
+CREATE UNIQUE NONCLUSTERED INDEX uq_fact_ventas_venta_salida 
+    ON dbo.fact_ventas(venta_id, salida_id) WHERE salida_id IS NOT NULL;
 CREATE NONCLUSTERED INDEX idx_fact_ventas_estado ON dbo.fact_ventas(estado_venta_key);
 
 -- Índices compuestos para queries comunes
@@ -103,9 +106,122 @@ CREATE NONCLUSTERED INDEX idx_fact_ventas_tiempo_producto
 CREATE NONCLUSTERED INDEX idx_fact_ventas_tiempo_vendedor 
     ON dbo.fact_ventas(tiempo_key, vendedor_key);
 
--- Índice columnar para mejor performance analítico (SQL Server Enterprise/Standard 2016+)
--- Descomentar si se tiene la edición apropiada
--- CREATE COLUMNSTORE INDEX idx_fact_ventas_columnstore ON dbo.fact_ventas;
+-- Índice columnar para mejor performance analítico (SQL Server 2016 SP1+)
+-- 05_crear_tablas_etl.sql convierte la tabla a columnstore agrupado (reemplaza los
+-- índices anteriores); cargar con load_fact_ventas.py --columnstore
+GO
+
+-- ============================================================================
+-- SNAPSHOT PERIÓDICO DE CARTERA
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Fact Table: Cartera (snapshot diario de cuentas por cobrar)
+-- Una fila por día y venta a crédito abierta; la carga
+-- load_fact_cartera_snapshot.py arrastra el snapshot anterior y aplica
+-- solo las ventas que cambiaron desde entonces
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.fact_cartera_snapshot', 'U') IS NOT NULL
+    DROP TABLE dbo.fact_cartera_snapshot;
+GO
+
+CREATE TABLE dbo.fact_cartera_snapshot (
+    fecha_snapshot DATE NOT NULL,
+    tiempo_key INT NOT NULL,                   -- Día del snapshot
+
+    -- Foreign Keys a Dimensiones
+    cliente_key INT NOT NULL,
+    vendedor_key INT NULL,
+    condicion_pago_key INT NULL,
+
+    -- Degenerate Dimension
+    venta_id INT NOT NULL,
+
+    -- Métricas (saldo y monto son semi-aditivos: no sumar entre días)
+    fecha_venta DATE NOT NULL,
+    monto_credito DECIMAL(12,4) NOT NULL DEFAULT 0.0,
+    saldo DECIMAL(12,4) NOT NULL DEFAULT 0.0,
+    dias_pendiente INT NOT NULL,
+    rango_antiguedad NVARCHAR(20) NOT NULL,
+
+    -- Metadatos de Auditoría
+    fecha_carga DATETIME2 DEFAULT GETDATE(),
+
+    -- Constraints
+    CONSTRAINT pk_fact_cartera_snapshot PRIMARY KEY CLUSTERED (fecha_snapshot, cliente_key, venta_id),
+    CONSTRAINT fk_fact_cartera_tiempo FOREIGN KEY (tiempo_key)
+        REFERENCES dbo.dim_tiempo(tiempo_key),
+    CONSTRAINT fk_fact_cartera_cliente FOREIGN KEY (cliente_key)
+        REFERENCES dbo.dim_cliente(cliente_key),
+    CONSTRAINT fk_fact_cartera_vendedor FOREIGN KEY (vendedor_key)
+        REFERENCES dbo.dim_vendedor(vendedor_key),
+    CONSTRAINT fk_fact_cartera_condicion FOREIGN KEY (condicion_pago_key)
+        REFERENCES dbo.dim_condicion_pago(condicion_pago_key)
+);
+GO
+
+CREATE NONCLUSTERED INDEX idx_fact_cartera_cliente
+    ON dbo.fact_cartera_snapshot(cliente_key, fecha_snapshot) INCLUDE (saldo, dias_pendiente);
+CREATE NONCLUSTERED INDEX idx_fact_cartera_venta
+    ON dbo.fact_cartera_snapshot(venta_id, fecha_snapshot);
+GO
+
+-- ============================================================================
+-- AGREGADO DIARIO DE VENTAS
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Fact Table: Ventas diarias (día x producto x vendedor)
+-- Se carga con el motor genérico: python etl/load/load_fact.py --fact ventas_diarias
+-- (declarada en la sección facts de config.yaml). Las ventas anuladas no suman
+-- en las métricas y se cuentan en ventas_anuladas, así un día recargado con
+-- --merge reemplaza sus filas sin dejar grupos huérfanos
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.fact_ventas_diarias', 'U') IS NOT NULL
+    DROP TABLE dbo.fact_ventas_diarias;
+GO
+
+CREATE TABLE dbo.fact_ventas_diarias (
+    tiempo_key INT NOT NULL,
+    producto_key INT NOT NULL,
+    vendedor_key INT NULL,
+
+    -- Llave natural del agregado (vendedor_id 0 = sin vendedor)
+    fecha DATE NOT NULL,
+    producto_id INT NOT NULL,
+    vendedor_id INT NOT NULL,
+
+    -- Métricas aditivas de las ventas no anuladas del día
+    numero_ventas INT NOT NULL DEFAULT 0,
+    numero_lineas INT NOT NULL DEFAULT 0,
+    cantidad DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    venta_exenta DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    venta_gravada DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    venta_total DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    iva DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    venta_total_con_impuestos DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    costo_total DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    margen_bruto DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+    porcentaje_margen DECIMAL(8,2) NULL,       -- No aditivo: recalcular al agregar
+    ventas_anuladas INT NOT NULL DEFAULT 0,
+
+    -- Metadatos de Auditoría
+    fecha_carga DATETIME2 DEFAULT GETDATE(),
+    fecha_actualizacion DATETIME2 NULL,
+
+    -- Constraints
+    CONSTRAINT pk_fact_ventas_diarias PRIMARY KEY CLUSTERED (fecha, producto_id, vendedor_id),
+    CONSTRAINT fk_fact_ventas_diarias_tiempo FOREIGN KEY (tiempo_key)
+        REFERENCES dbo.dim_tiempo(tiempo_key),
+    CONSTRAINT fk_fact_ventas_diarias_producto FOREIGN KEY (producto_key)
+        REFERENCES dbo.dim_producto(producto_key),
+    CONSTRAINT fk_fact_ventas_diarias_vendedor FOREIGN KEY (vendedor_key)
+        REFERENCES dbo.dim_vendedor(vendedor_key)
+);
+GO
+
+CREATE NONCLUSTERED INDEX idx_fact_ventas_diarias_tiempo
+    ON dbo.fact_ventas_diarias(tiempo_key) INCLUDE (venta_total, cantidad);
 GO
 
 PRINT 'Tabla de hechos creada exitosamente';
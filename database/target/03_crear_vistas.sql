@@ -142,6 +142,7 @@ GO
 
 -- ----------------------------------------------------------------------------
 -- Vista para análisis de cartera por cliente
+-- Lee el último día de fact_cartera_snapshot (load_fact_cartera_snapshot.py)
 -- ----------------------------------------------------------------------------
 IF OBJECT_ID('dbo.v_cartera_clientes', 'V') IS NOT NULL
     DROP VIEW dbo.v_cartera_clientes;
@@ -154,22 +155,23 @@ SELECT
     dc.departamento,
     dc.municipio,
     dc.fecha_primera_compra,
-    COUNT(DISTINCT fv.venta_id) AS ventas_pendientes,
-    SUM(fv.venta_total_con_impuestos) AS monto_total_credito,
-    MIN(fv.fecha_venta) AS fecha_venta_mas_antigua,
-    MAX(fv.fecha_venta) AS fecha_venta_mas_reciente,
-    AVG(DATEDIFF(DAY, fv.fecha_venta, GETDATE())) AS dias_promedio_pendiente
-FROM dbo.fact_ventas fv
-INNER JOIN dbo.dim_cliente dc ON fv.cliente_key = dc.cliente_key
-WHERE fv.es_venta_credito = 1
-    AND fv.esta_liquidado = 0
-    AND fv.esta_anulado = 0
+    COUNT(*) AS ventas_pendientes,
+    SUM(fc.monto_credito) AS monto_total_credito,
+    MIN(fc.fecha_venta) AS fecha_venta_mas_antigua,
+    MAX(fc.fecha_venta) AS fecha_venta_mas_reciente,
+    AVG(fc.dias_pendiente) AS dias_promedio_pendiente,
+    SUM(fc.saldo) AS saldo_pendiente,
+    fc.fecha_snapshot
+FROM dbo.fact_cartera_snapshot fc
+INNER JOIN dbo.dim_cliente dc ON fc.cliente_key = dc.cliente_key
+WHERE fc.fecha_snapshot = (SELECT MAX(fecha_snapshot) FROM dbo.fact_cartera_snapshot)
 GROUP BY 
     dc.cliente_id,
     dc.nombre,
     dc.departamento,
     dc.municipio,
-    dc.fecha_primera_compra;
+    dc.fecha_primera_compra,
+    fc.fecha_snapshot;
 GO
 
 -- ----------------------------------------------------------------------------
@@ -333,34 +333,35 @@ IF OBJECT_ID('dbo.sp_obtener_cartera_vencida', 'P') IS NOT NULL
 GO
 
 CREATE PROCEDURE dbo.sp_obtener_cartera_vencida
-    @dias_vencimiento INT = 30
+    @dias_vencimiento INT = 30,
+    @fecha DATE = NULL                        -- Día del snapshot (NULL = el último cargado)
 AS
 BEGIN
     SET NOCOUNT ON;
     
+    IF @fecha IS NULL
+        SELECT @fecha = MAX(fecha_snapshot) FROM dbo.fact_cartera_snapshot;
+    
     SELECT 
         dc.cliente_id,
         dc.nombre AS cliente,
         dc.departamento,
         dc.telefono_1,
-        COUNT(DISTINCT fv.venta_id) AS ventas_pendientes,
-        SUM(fv.saldo) AS saldo_total,
-        MIN(fv.fecha_venta) AS fecha_venta_mas_antigua,
-        DATEDIFF(DAY, MIN(fv.fecha_venta), GETDATE()) AS dias_vencido,
+        COUNT(*) AS ventas_pendientes,
+        SUM(fc.saldo) AS saldo_total,
+        MIN(fc.fecha_venta) AS fecha_venta_mas_antigua,
+        MAX(fc.dias_pendiente) AS dias_vencido,
         CASE 
-            WHEN DATEDIFF(DAY, MIN(fv.fecha_venta), GETDATE()) <= 30 THEN '0-30 días'
-            WHEN DATEDIFF(DAY, MIN(fv.fecha_venta), GETDATE()) <= 60 THEN '31-60 días'
-            WHEN DATEDIFF(DAY, MIN(fv.fecha_venta), GETDATE()) <= 90 THEN '61-90 días'
-            WHEN DATEDIFF(DAY, MIN(fv.fecha_venta), GETDATE()) <= 120 THEN '91-120 días'
+            WHEN MAX(fc.dias_pendiente) <= 30 THEN '0-30 días'
+            WHEN MAX(fc.dias_pendiente) <= 60 THEN '31-60 días'
+            WHEN MAX(fc.dias_pendiente) <= 90 THEN '61-90 días'
+            WHEN MAX(fc.dias_pendiente) <= 120 THEN '91-120 días'
             ELSE 'Más de 120 días'
         END AS rango_antiguedad
-    FROM dbo.fact_ventas fv
-    INNER JOIN dbo.dim_cliente dc ON fv.cliente_key = dc.cliente_key
-    WHERE fv.es_venta_credito = 1
-        AND fv.esta_liquidado = 0
-        AND fv.esta_anulado = 0
-        AND fv.saldo > 0
-        AND DATEDIFF(DAY, fv.fecha_venta, GETDATE()) >= @dias_vencimiento
+    FROM dbo.fact_cartera_snapshot fc
+    INNER JOIN dbo.dim_cliente dc ON fc.cliente_key = dc.cliente_key
+    WHERE fc.fecha_snapshot = @fecha
+        AND fc.dias_pendiente >= @dias_vencimiento
     GROUP BY 
         dc.cliente_id,
         dc.nombre,
@@ -394,3 +395,6 @@ GO
 
 -- Obtener cartera vencida (más de 30 días)
 -- EXEC dbo.sp_obtener_cartera_vencida @dias_vencimiento = 30;
+
+-- Cartera vencida de un día anterior (snapshot)
+-- EXEC dbo.sp_obtener_cartera_vencida @dias_vencimiento = 30, @fecha = '2025-11-01';
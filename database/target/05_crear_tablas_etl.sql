@@ -0,0 +1,496 @@
+-- ============================================================================
+-- DATA WAREHOUSE - PROCESO DE VENTAS
+-- SQL SERVER - TABLAS DE SOPORTE DEL ETL
+-- Fecha: 2026-10-18
+-- ============================================================================
+-- Se puede ejecutar sobre un DW existente: no borra datos de fact_ventas
+-- ============================================================================
+
+USE [LGL_DW];
+GO
+
+-- ============================================================================
+-- LLAVE NATURAL DE FACT_VENTAS
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Agregar salida_id a fact_ventas (DW creados antes de este cambio)
+-- ----------------------------------------------------------------------------
+IF COL_LENGTH('dbo.fact_ventas', 'salida_id') IS NULL
+    ALTER TABLE dbo.fact_ventas ADD salida_id INT NULL;
+GO
+
+-- Unicidad por línea de venta (las filas antiguas sin salida_id quedan fuera del índice)
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes 
+    WHERE name = 'uq_fact_ventas_venta_salida' 
+    AND object_id = OBJECT_ID('dbo.fact_ventas')
+)
+    CREATE UNIQUE NONCLUSTERED INDEX uq_fact_ventas_venta_salida 
+        ON dbo.fact_ventas(venta_id, salida_id) WHERE salida_id IS NOT NULL;
+GO
+
+-- ----------------------------------------------------------------------------
+-- Índice columnstore agrupado (SQL Server 2016 SP1+)
+-- Solo una tabla con columnstore agrupado comprime las cargas masivas directo a
+-- rowgroups: load_fact_ventas.py --columnstore inserta lotes de
+-- performance.columnstore_batch_size filas (1,048,576 = rowgroups completos).
+-- La llave primaria pasa a ser no agrupada y la unicidad por línea deja de ser
+-- filtrada, así que la conversión requiere que todas las filas tengan salida_id
+-- (recargar con load_fact_ventas.py --truncate antes de volver a ejecutar)
+-- ----------------------------------------------------------------------------
+IF CAST(SERVERPROPERTY('ProductMajorVersion') AS INT) >= 13
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE object_id = OBJECT_ID('dbo.fact_ventas') AND type = 5
+)
+BEGIN
+    IF EXISTS (SELECT 1 FROM dbo.fact_ventas WHERE salida_id IS NULL)
+        PRINT 'fact_ventas tiene filas sin salida_id: no se convierte a columnstore agrupado';
+    ELSE
+    BEGIN
+        -- Índice columnstore no agrupado de versiones anteriores de este script
+        IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('dbo.fact_ventas') AND type = 6)
+            DROP INDEX idx_fact_ventas_columnstore ON dbo.fact_ventas;
+
+        -- Los índices por dimensión quedan cubiertos por el columnstore (eliminación de segmentos)
+        -- y solo harían más lenta la carga
+        DROP INDEX IF EXISTS idx_fact_ventas_tiempo ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_cliente ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_producto ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_vendedor ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_ubicacion ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_fecha ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_estado ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_tiempo_cliente ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_tiempo_producto ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS idx_fact_ventas_tiempo_vendedor ON dbo.fact_ventas;
+        -- (venta_id, salida_id) también sirve las búsquedas por venta_id
+        DROP INDEX IF EXISTS idx_fact_ventas_venta_id ON dbo.fact_ventas;
+        DROP INDEX IF EXISTS uq_fact_ventas_venta_salida ON dbo.fact_ventas;
+
+        -- La llave primaria de 02_crear_hechos.sql es agrupada y sin nombre fijo
+        DECLARE @pk SYSNAME = (
+            SELECT name FROM sys.key_constraints
+            WHERE parent_object_id = OBJECT_ID('dbo.fact_ventas') AND type = 'PK'
+        );
+        IF @pk IS NOT NULL
+            EXEC('ALTER TABLE dbo.fact_ventas DROP CONSTRAINT ' + QUOTENAME(@pk));
+
+        CREATE CLUSTERED COLUMNSTORE INDEX cci_fact_ventas ON dbo.fact_ventas;
+
+        ALTER TABLE dbo.fact_ventas ADD CONSTRAINT pk_fact_ventas PRIMARY KEY NONCLUSTERED (venta_key);
+        CREATE UNIQUE NONCLUSTERED INDEX uq_fact_ventas_venta_salida
+            ON dbo.fact_ventas(venta_id, salida_id);
+    END
+END
+GO
+
+-- ============================================================================
+-- MIEMBROS INFERIDOS DE DIMENSIONES
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Marca es_inferido (DW creados antes de este cambio)
+-- load_fact_ventas crea filas mínimas con es_inferido = 1 para llaves naturales
+-- que aún no existen; la siguiente carga de la dimensión las completa
+-- ----------------------------------------------------------------------------
+IF COL_LENGTH('dbo.dim_cliente', 'es_inferido') IS NULL
+    ALTER TABLE dbo.dim_cliente ADD es_inferido BIT NOT NULL DEFAULT 0;
+GO
+
+IF COL_LENGTH('dbo.dim_producto', 'es_inferido') IS NULL
+    ALTER TABLE dbo.dim_producto ADD es_inferido BIT NOT NULL DEFAULT 0;
+GO
+
+IF COL_LENGTH('dbo.dim_tipo_documento', 'es_inferido') IS NULL
+    ALTER TABLE dbo.dim_tipo_documento ADD es_inferido BIT NOT NULL DEFAULT 0;
+GO
+
+-- ============================================================================
+-- HASH DE ATRIBUTOS DE DIMENSIONES SCD2
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- hash_atributos: MD5 (16 bytes) de los atributos de cada versión, calculado
+-- por el ETL al insertarla. La carga incremental compara solo (llave, hash);
+-- las filas anteriores a la columna se completan en la primera carga
+-- El índice filtrado cubre esa consulta sin leer las filas de la dimensión
+-- ----------------------------------------------------------------------------
+IF COL_LENGTH('dbo.dim_cliente', 'hash_atributos') IS NULL
+    ALTER TABLE dbo.dim_cliente ADD hash_atributos BINARY(16) NULL;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_dim_cliente_actual_hash'
+    AND object_id = OBJECT_ID('dbo.dim_cliente')
+)
+    CREATE NONCLUSTERED INDEX idx_dim_cliente_actual_hash
+        ON dbo.dim_cliente(cliente_id) INCLUDE (hash_atributos, version, es_inferido) WHERE es_actual = 1;
+GO
+
+IF COL_LENGTH('dbo.dim_producto', 'hash_atributos') IS NULL
+    ALTER TABLE dbo.dim_producto ADD hash_atributos BINARY(16) NULL;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_dim_producto_actual_hash'
+    AND object_id = OBJECT_ID('dbo.dim_producto')
+)
+    CREATE NONCLUSTERED INDEX idx_dim_producto_actual_hash
+        ON dbo.dim_producto(producto_id) INCLUDE (hash_atributos, version, es_inferido) WHERE es_actual = 1;
+GO
+
+IF COL_LENGTH('dbo.dim_vendedor', 'hash_atributos') IS NULL
+    ALTER TABLE dbo.dim_vendedor ADD hash_atributos BINARY(16) NULL;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_dim_vendedor_actual_hash'
+    AND object_id = OBJECT_ID('dbo.dim_vendedor')
+)
+    CREATE NONCLUSTERED INDEX idx_dim_vendedor_actual_hash
+        ON dbo.dim_vendedor(vendedor_id) INCLUDE (hash_atributos, version) WHERE es_actual = 1;
+GO
+
+-- ============================================================================
+-- TABLAS DE STAGING
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Staging de fact_ventas (load_fact_ventas.py --merge)
+-- Cada lote se escribe aquí y luego se aplica con un MERGE sobre fact_ventas
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.stg_fact_ventas', 'U') IS NOT NULL
+    DROP TABLE dbo.stg_fact_ventas;
+GO
+
+CREATE TABLE dbo.stg_fact_ventas (
+    tiempo_key INT NOT NULL,
+    cliente_key INT NOT NULL,
+    producto_key INT NOT NULL,
+    vendedor_key INT NULL,
+    ubicacion_key INT NULL,
+    tipo_documento_key INT NOT NULL,
+    condicion_pago_key INT NULL,
+    estado_venta_key INT NOT NULL,
+    venta_id INT NOT NULL,
+    salida_id INT NOT NULL,
+    orden_pedido_id INT NULL,
+    numero_venta NVARCHAR(191) NULL,
+    cantidad DECIMAL(12,4) NOT NULL,
+    precio_unitario DECIMAL(12,4) NOT NULL,
+    venta_exenta DECIMAL(12,4) NOT NULL,
+    venta_gravada DECIMAL(12,4) NOT NULL,
+    venta_total DECIMAL(12,4) NOT NULL,
+    iva DECIMAL(12,4) NOT NULL,
+    venta_total_con_impuestos DECIMAL(12,4) NOT NULL,
+    costo_unitario DECIMAL(12,4) NULL,
+    costo_total DECIMAL(12,4) NULL,
+    margen_bruto DECIMAL(12,4) NULL,
+    porcentaje_margen DECIMAL(8,2) NULL,
+    es_venta_credito BIT NULL,
+    esta_liquidado BIT NULL,
+    esta_anulado BIT NULL,
+    fecha_venta DATE NOT NULL,
+    fecha_liquidacion DATE NULL,
+    fecha_anulacion DATE NULL
+);
+GO
+
+-- ----------------------------------------------------------------------------
+-- Staging de estados de ventas (update_fact_ventas_estados.py)
+-- Cada lote de ventas liquidadas/anuladas se aplica con un UPDATE por venta_id
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.stg_fact_ventas_estados', 'U') IS NOT NULL
+    DROP TABLE dbo.stg_fact_ventas_estados;
+GO
+
+CREATE TABLE dbo.stg_fact_ventas_estados (
+    venta_id INT NOT NULL PRIMARY KEY,
+    esta_liquidado BIT NOT NULL,
+    esta_anulado BIT NOT NULL,
+    fecha_liquidacion DATE NULL,
+    fecha_anulacion DATE NULL
+);
+GO
+
+-- ----------------------------------------------------------------------------
+-- Staging de cambios de cartera (load_fact_cartera_snapshot.py)
+-- Ventas que cambiaron desde el snapshot anterior; esta_abierta = 0 las quita
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.stg_fact_cartera_cambios', 'U') IS NOT NULL
+    DROP TABLE dbo.stg_fact_cartera_cambios;
+GO
+
+CREATE TABLE dbo.stg_fact_cartera_cambios (
+    venta_id INT NOT NULL PRIMARY KEY,
+    cliente_key INT NULL,
+    vendedor_key INT NULL,
+    condicion_pago_key INT NULL,
+    fecha_venta DATE NULL,
+    monto_credito DECIMAL(12,4) NULL,
+    saldo DECIMAL(12,4) NULL,
+    esta_abierta BIT NOT NULL
+);
+GO
+
+-- ----------------------------------------------------------------------------
+-- Staging de dimensiones SCD2 (versiones nuevas y modificadas)
+-- Cada lote se aplica en una transacción: cierra las versiones actuales de los
+-- modificados (accion 'M'), completa miembros inferidos ('I') e inserta las
+-- versiones nuevas ('N' y 'M') con sentencias set-based
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.stg_dim_cliente', 'U') IS NOT NULL
+    DROP TABLE dbo.stg_dim_cliente;
+GO
+
+CREATE TABLE dbo.stg_dim_cliente (
+    cliente_id INT NOT NULL PRIMARY KEY,
+    nombre NVARCHAR(191) NOT NULL,
+    nombre_alternativo NVARCHAR(191) NULL,
+    nit VARCHAR(191) NULL,
+    nrc VARCHAR(191) NULL,
+    retencion BIT NULL,
+    municipio NVARCHAR(191) NULL,
+    departamento NVARCHAR(191) NULL,
+    fecha_primera_compra DATE NULL,
+    hash_atributos BINARY(16) NULL,
+    version INT NOT NULL,
+    accion CHAR(1) NOT NULL                    -- N = nuevo, M = modificado, I = inferido a completar
+);
+GO
+
+IF OBJECT_ID('dbo.stg_dim_producto', 'U') IS NOT NULL
+    DROP TABLE dbo.stg_dim_producto;
+GO
+
+CREATE TABLE dbo.stg_dim_producto (
+    producto_id INT NOT NULL PRIMARY KEY,
+    nombre NVARCHAR(191) NOT NULL,
+    nombre_alternativo NVARCHAR(191) NULL,
+    codigo VARCHAR(50) NULL,
+    categoria_codigo VARCHAR(2) NULL,
+    categoria_nombre VARCHAR(50) NULL,
+    tipo_producto_codigo VARCHAR(2) NULL,
+    tipo_producto_nombre VARCHAR(50) NULL,
+    unidad_medida_nombre VARCHAR(50) NULL,
+    unidad_medida_abreviatura VARCHAR(10) NULL,
+    producto_activo BIT NULL,
+    hash_atributos BINARY(16) NULL,
+    version INT NOT NULL,
+    accion CHAR(1) NOT NULL
+);
+GO
+
+IF OBJECT_ID('dbo.stg_dim_vendedor', 'U') IS NOT NULL
+    DROP TABLE dbo.stg_dim_vendedor;
+GO
+
+CREATE TABLE dbo.stg_dim_vendedor (
+    vendedor_id INT NOT NULL PRIMARY KEY,
+    nombre NVARCHAR(191) NOT NULL,
+    apellido NVARCHAR(191) NULL,
+    email VARCHAR(191) NULL,
+    username VARCHAR(191) NULL,
+    hash_atributos BINARY(16) NULL,
+    version INT NOT NULL,
+    accion CHAR(1) NOT NULL
+);
+GO
+
+-- ============================================================================
+-- SNAPSHOT DE CARTERA
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- fact_cartera_snapshot (DW creados antes de este cambio; ver 02_crear_hechos.sql)
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.fact_cartera_snapshot', 'U') IS NULL
+    CREATE TABLE dbo.fact_cartera_snapshot (
+        fecha_snapshot DATE NOT NULL,
+        tiempo_key INT NOT NULL,
+        cliente_key INT NOT NULL,
+        vendedor_key INT NULL,
+        condicion_pago_key INT NULL,
+        venta_id INT NOT NULL,
+        fecha_venta DATE NOT NULL,
+        monto_credito DECIMAL(12,4) NOT NULL DEFAULT 0.0,
+        saldo DECIMAL(12,4) NOT NULL DEFAULT 0.0,
+        dias_pendiente INT NOT NULL,
+        rango_antiguedad NVARCHAR(20) NOT NULL,
+        fecha_carga DATETIME2 DEFAULT GETDATE(),
+        CONSTRAINT pk_fact_cartera_snapshot PRIMARY KEY CLUSTERED (fecha_snapshot, cliente_key, venta_id),
+        CONSTRAINT fk_fact_cartera_tiempo FOREIGN KEY (tiempo_key)
+            REFERENCES dbo.dim_tiempo(tiempo_key),
+        CONSTRAINT fk_fact_cartera_cliente FOREIGN KEY (cliente_key)
+            REFERENCES dbo.dim_cliente(cliente_key),
+        CONSTRAINT fk_fact_cartera_vendedor FOREIGN KEY (vendedor_key)
+            REFERENCES dbo.dim_vendedor(vendedor_key),
+        CONSTRAINT fk_fact_cartera_condicion FOREIGN KEY (condicion_pago_key)
+            REFERENCES dbo.dim_condicion_pago(condicion_pago_key)
+    );
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_fact_cartera_cliente'
+    AND object_id = OBJECT_ID('dbo.fact_cartera_snapshot')
+)
+    CREATE NONCLUSTERED INDEX idx_fact_cartera_cliente
+        ON dbo.fact_cartera_snapshot(cliente_key, fecha_snapshot) INCLUDE (saldo, dias_pendiente);
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_fact_cartera_venta'
+    AND object_id = OBJECT_ID('dbo.fact_cartera_snapshot')
+)
+    CREATE NONCLUSTERED INDEX idx_fact_cartera_venta
+        ON dbo.fact_cartera_snapshot(venta_id, fecha_snapshot);
+GO
+
+-- ============================================================================
+-- AGREGADO DIARIO DE VENTAS
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- fact_ventas_diarias (DW creados antes de este cambio; ver 02_crear_hechos.sql)
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.fact_ventas_diarias', 'U') IS NULL
+    CREATE TABLE dbo.fact_ventas_diarias (
+        tiempo_key INT NOT NULL,
+        producto_key INT NOT NULL,
+        vendedor_key INT NULL,
+        fecha DATE NOT NULL,
+        producto_id INT NOT NULL,
+        vendedor_id INT NOT NULL,
+        numero_ventas INT NOT NULL DEFAULT 0,
+        numero_lineas INT NOT NULL DEFAULT 0,
+        cantidad DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        venta_exenta DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        venta_gravada DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        venta_total DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        iva DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        venta_total_con_impuestos DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        costo_total DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        margen_bruto DECIMAL(16,4) NOT NULL DEFAULT 0.0,
+        porcentaje_margen DECIMAL(8,2) NULL,
+        ventas_anuladas INT NOT NULL DEFAULT 0,
+        fecha_carga DATETIME2 DEFAULT GETDATE(),
+        fecha_actualizacion DATETIME2 NULL,
+        CONSTRAINT pk_fact_ventas_diarias PRIMARY KEY CLUSTERED (fecha, producto_id, vendedor_id),
+        CONSTRAINT fk_fact_ventas_diarias_tiempo FOREIGN KEY (tiempo_key)
+            REFERENCES dbo.dim_tiempo(tiempo_key),
+        CONSTRAINT fk_fact_ventas_diarias_producto FOREIGN KEY (producto_key)
+            REFERENCES dbo.dim_producto(producto_key),
+        CONSTRAINT fk_fact_ventas_diarias_vendedor FOREIGN KEY (vendedor_key)
+            REFERENCES dbo.dim_vendedor(vendedor_key)
+    );
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_fact_ventas_diarias_tiempo'
+    AND object_id = OBJECT_ID('dbo.fact_ventas_diarias')
+)
+    CREATE NONCLUSTERED INDEX idx_fact_ventas_diarias_tiempo
+        ON dbo.fact_ventas_diarias(tiempo_key) INCLUDE (venta_total, cantidad);
+GO
+
+-- ============================================================================
+-- TABLAS DE CONTROL
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- Marcas de agua de las cargas incrementales (una fila por proceso)
+-- Se conserva entre ejecuciones del script
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.etl_control', 'U') IS NULL
+    CREATE TABLE dbo.etl_control (
+        proceso NVARCHAR(100) NOT NULL PRIMARY KEY,     -- Ej. 'fact_ventas'
+        ultimo_id BIGINT NULL,                          -- Mayor id de origen cargado
+        ultima_fecha DATE NULL,                         -- Mayor fecha de negocio cargada
+        ultimo_updated_at DATETIME2 NULL,               -- Mayor updated_at de origen (si existe)
+        registros_ultima_carga INT NULL,
+        fecha_ultima_carga DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+GO
+
+-- ----------------------------------------------------------------------------
+-- Checkpoints por ejecución (load_fact_ventas.py --resume)
+-- La frontera del último lote se guarda en la misma transacción que el lote
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.etl_checkpoints', 'U') IS NULL
+    CREATE TABLE dbo.etl_checkpoints (
+        ejecucion_id VARCHAR(36) NOT NULL PRIMARY KEY,
+        proceso NVARCHAR(100) NOT NULL,
+        parametros NVARCHAR(MAX) NULL,                 -- JSON con el filtro de extracción
+        estado VARCHAR(20) NOT NULL,                   -- en_curso, completado, fallido
+
+        -- Última fila confirmada (orden de extracción)
+        ultima_fecha DATE NULL,
+        ultimo_id INT NULL,
+        ultimo_detalle_id INT NULL,
+        lotes INT NOT NULL DEFAULT 0,
+        filas BIGINT NOT NULL DEFAULT 0,
+
+        fecha_inicio_ejecucion DATETIME2 NOT NULL DEFAULT GETDATE(),
+        fecha_actualizacion DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_etl_checkpoints_proceso'
+    AND object_id = OBJECT_ID('dbo.etl_checkpoints')
+)
+    CREATE NONCLUSTERED INDEX idx_etl_checkpoints_proceso
+        ON dbo.etl_checkpoints(proceso, fecha_inicio_ejecucion);
+GO
+
+-- ----------------------------------------------------------------------------
+-- Cuarentena de líneas de venta rechazadas (load_fact_ventas.py)
+-- Se reprocesan con: load_fact_ventas.py --reprocesar-rechazos
+-- ----------------------------------------------------------------------------
+IF OBJECT_ID('dbo.etl_rechazos_fact_ventas', 'U') IS NULL
+    CREATE TABLE dbo.etl_rechazos_fact_ventas (
+        rechazo_id BIGINT IDENTITY(1,1) PRIMARY KEY,
+        ejecucion_id VARCHAR(36) NOT NULL,             -- Ejecución que generó el rechazo
+
+        -- Ids de origen
+        venta_id INT NULL,
+        salida_id INT NULL,
+        fecha_venta DATE NULL,
+        cliente_id INT NULL,
+        producto_id INT NULL,
+        tipo_documento_id INT NULL,
+
+        -- Motivo
+        etapa VARCHAR(20) NOT NULL,                    -- transformacion, escritura
+        motivo VARCHAR(30) NOT NULL,                   -- FALTA_DIMENSION, ERROR_TRANSFORMACION, ERROR_ESCRITURA
+        dimensiones_faltantes VARCHAR(200) NULL,       -- Ej. 'cliente,producto'
+        excepcion VARCHAR(100) NULL,                   -- Clase de la excepción
+        detalle NVARCHAR(400) NULL,
+
+        -- Reproceso
+        reprocesado BIT NOT NULL DEFAULT 0,
+        fecha_reproceso DATETIME2 NULL,
+        fecha_rechazo DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'idx_rechazos_fact_ventas_pendientes'
+    AND object_id = OBJECT_ID('dbo.etl_rechazos_fact_ventas')
+)
+    CREATE NONCLUSTERED INDEX idx_rechazos_fact_ventas_pendientes
+        ON dbo.etl_rechazos_fact_ventas(venta_id) WHERE reprocesado = 0;
+GO
+
+PRINT 'Tablas de soporte del ETL creadas exitosamente';
+GO
@@ -0,0 +1,191 @@
+"""
+ETL: Carga genérica de dimensiones SCD Type 2
+Carga cualquier dimensión con versiones declarada en la sección dimensions de
+config.yaml (ver etl/utils/dimensions.py): dim_cliente, dim_producto y dim_vendedor
+"""
+import sys
+from pathlib import Path
+import argparse
+import time
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from etl.utils.database import SourceDatabase, TargetDatabase
+from etl.utils.logger import get_logger, log_etl_start, log_etl_end, log_step, log_error, log_success
+from etl.utils.config import get_setting
+from etl.utils.dimensions import (get_dimension_spec, get_dimension_specs, classify_version, build_dimension_query,
+                                  get_incremental_window, save_dimension_watermarks)
+from etl.utils.scd import (HASH_COLUMN, NUEVO, MODIFICADO, INFERIDO, get_current_hashes,
+                           backfill_hashes, create_scd2_writer, close_versions)
+
+
+MODOS = ('full', 'incremental')
+
+
+def load_scd2_dimension(nombre: str, modo: str = 'full', batch_size: int = None) -> bool:
+    """
+    Cargar una dimensión SCD2 declarada en config.yaml
+
+    Ambos modos comparan el hash de cada fila de origen con el de la versión
+    actual (sin traer los atributos del DW) y solo abren versiones para llaves
+    nuevas o con atributos distintos, escritas por lotes vía stg_<tabla>. El
+    modo full además cierra las llaves que ya no vienen del origen, de modo
+    que repetirlo sin cambios en el origen no agrega filas a la dimensión.
+
+    El modo incremental extrae solo las filas cuyas tablas origen cambiaron
+    desde su marca de agua en dbo.etl_control (ver get_incremental_window) y
+    pasa a barrido completo, como el full, cuando no puede filtrarse o el
+    último barrido tiene etl.dimension_full_sweep_days o más.
+
+    Args:
+        nombre: Nombre de la dimensión en dimensions (ej. 'cliente')
+        modo: 'full' o 'incremental'
+        batch_size: Versiones por lote, por defecto performance.scd2_batch_size
+    """
+    log = get_logger("dimensiones")
+    try:
+        if modo not in MODOS:
+            raise ValueError(f"Modo de carga no soportado: {modo} (opciones: {', '.join(MODOS)})")
+        spec = get_dimension_spec(nombre)
+    except ValueError as e:
+        log_error("Dimensión no válida", e)
+        return False
+
+    batch_size = batch_size or get_setting('performance', 'scd2_batch_size', 10000)
+    titulo = f"Carga {modo.upper()} de {spec.table}"
+
+    log_etl_start(titulo)
+
+    try:
+        target_db = TargetDatabase()
+        target_conn = target_db.get_connection()
+        target_cursor = target_conn.cursor()
+        source_db = SourceDatabase()
+
+        # PASO 1: Marcas de agua de las tablas origen (el modo full recorre todo)
+        columnas = {fuente['table']: [c for c in fuente['columns'] if source_db.has_column(fuente['table'], c)]
+                    for fuente in spec.watermarks}
+        inicio_extraccion = source_db.get_server_time() if spec.watermarks else None
+        desde = None
+        if modo == 'incremental':
+            desde, motivo = get_incremental_window(target_conn, spec, columnas)
+            if desde is None:
+                log_step(f"Barrido completo del origen: {motivo}")
+            else:
+                log_success("Marcas de agua: " + ', '.join(f"{tabla} {valor}" for tabla, valor in desde.items()))
+        barrido = desde is None
+
+        # PASO 2: Hash de las versiones actuales en SQL Server (sin sus atributos)
+        log_step("Extrayendo hash de los registros actuales de SQL Server")
+
+        completados_hash = backfill_hashes(target_conn, spec.table, spec.natural_id, spec.attributes,
+                                            normalizar=spec.types.normalize)
+        if completados_hash:
+            log_success(f"Calculado el hash de {completados_hash} registros anteriores a {HASH_COLUMN}")
+
+        # natural_id -> (hash, version[, es_inferido])
+        extra = ('version', 'es_inferido') if spec.inferred else ('version',)
+        target_data = get_current_hashes(target_cursor, spec.table, spec.natural_id, extra)
+        target_cursor.close()
+
+        log_success(f"Encontrados {len(target_data)} registros actuales en DW")
+
+        # PASO 3: Extraer de MariaDB en streaming, detectar cambios y escribir por lotes
+        log_step(f"Extrayendo {spec.name} (MariaDB{'' if barrido else ', solo filas modificadas'}) "
+                 f"y detectando cambios")
+
+        errors = []
+
+        def on_error(params, e):
+            if len(errors) < 5:
+                errors.append(f"{spec.natural_id} {params[0]}: {str(e)}")
+
+        writer = create_scd2_writer(target_conn, spec.table, spec.natural_id, spec.columns,
+                                    inferidos=spec.inferred, batch_size=batch_size, on_error=on_error)
+
+        start_time = time.perf_counter()
+        conteo = {NUEVO: 0, MODIFICADO: 0, INFERIDO: 0}
+        vistos = set()
+        extract_count = 0
+
+        query, query_params = build_dimension_query(spec, desde, columnas)
+        for row in source_db.iter_rows(query, query_params, chunk_size=batch_size):
+            extract_count += 1
+            params = spec.transform(row)
+            vistos.add(params[0])
+            hash_atributos = spec.hash(params)
+            cambio = classify_version(target_data.get(params[0]), hash_atributos)
+            if cambio is None:
+                continue
+            accion, version = cambio
+            writer.add(params + (hash_atributos, version, accion))
+            conteo[accion] += 1
+
+        writer.close()
+        source_db.close()
+
+        log_success(f"Extraídos {extract_count} registros de MariaDB")
+        log_success(f"Nuevos: {conteo[NUEVO]}, Modificados: {conteo[MODIFICADO]}, "
+                    f"Inferidos a completar: {conteo[INFERIDO]}")
+
+        # PASO 4 (barrido completo): cerrar las llaves que ya no vienen del origen
+        cerrados = 0
+        if barrido:
+            bajas = [natural_id for natural_id, actual in target_data.items()
+                     if natural_id not in vistos and not (spec.inferred and actual[2])]
+            cerrados = close_versions(target_conn, spec.table, spec.natural_id, bajas, batch_size)
+            if cerrados:
+                log_success(f"Cerradas {cerrados} versiones de llaves que ya no existen en el origen")
+
+        # PASO 5: Guardar las marcas de agua para la siguiente carga incremental
+        if spec.watermarks:
+            save_dimension_watermarks(target_conn, spec, columnas, inicio_extraccion, extract_count, barrido)
+
+        target_conn.close()
+
+        log_step(f"Escritura: {writer.elapsed:.2f}s ({writer.batches} lotes, "
+                 f"{writer.rows_merged} versiones insertadas) | Total: {time.perf_counter() - start_time:.2f}s")
+        if writer.rows_failed:
+            log_step(f"Omitidos: {writer.rows_failed} registros con error")
+            for error in errors:
+                log_step(f"  - {error}")
+
+        total_procesados = writer.rows_written + cerrados
+        log_success(f"Procesados {total_procesados} cambios")
+        log_etl_end(titulo, success=True, records=total_procesados)
+        return True
+
+    except Exception as e:
+        log_error(f"Error en la carga de {spec.table}", e)
+        log_etl_end(titulo, success=False)
+        return False
+
+
+def build_parser(descripcion: str, con_dimension: bool = False) -> argparse.ArgumentParser:
+    """Argumentos comunes de los scripts de dimensiones SCD2 (--mode o --modo)"""
+    parser = argparse.ArgumentParser(description=descripcion)
+    if con_dimension:
+        parser.add_argument('--dimension', help='Nombre de la dimensión (ver --list)')
+        parser.add_argument('--list', action='store_true', help='Listar las dimensiones declaradas')
+    parser.add_argument('--mode', '--modo', dest='mode', choices=MODOS, default='full',
+                        help='Modo de carga: full o incremental')
+    parser.add_argument('--batch-size', type=int,
+                        help='Versiones por lote (por defecto performance.scd2_batch_size de config.yaml)')
+    return parser
+
+
+if __name__ == "__main__":
+    parser = build_parser('Carga genérica de dimensiones SCD Type 2 declaradas en config.yaml',
+                          con_dimension=True)
+
+    args = parser.parse_args()
+
+    if args.list or not args.dimension:
+        for spec in get_dimension_specs(enabled_only=False):
+            print(f"{spec.name:20} -> {spec.target} (llave {spec.natural_id}, "
+                  f"{len(spec.attributes)} atributos{', inferidos' if spec.inferred else ''})")
+        sys.exit(0 if args.list else 1)
+
+    success = load_scd2_dimension(args.dimension, modo=args.mode, batch_size=args.batch_size)
+
+    sys.exit(0 if success else 1)
@@ -49,22 +49,31 @@ def load_dim_tipo_documento() -> bool:
             conn = target_db.get_connection()
             cursor = conn.cursor()
             
-            # Limpiar tabla
-            cursor.execute("DELETE FROM dbo.dim_tipo_documento")
-            conn.commit()
+            # Actualizar en su lugar los existentes (incluye miembros inferidos por
+            # load_fact_ventas) para conservar las keys usadas en fact_ventas
+            cursor.execute("SELECT tipo_documento_id FROM dbo.dim_tipo_documento")
+            existentes = {r[0] for r in cursor.fetchall()}
             
             # Insertar datos
             insert_count = 0
             for row in rows:
-                cursor.execute("""
-                    INSERT INTO dbo.dim_tipo_documento 
-                    (tipo_documento_id, codigo, nombre)
-                    VALUES (?, ?, ?)
-                """, (
-                    row['id'],
+                params = (
                     row.get('codigo', str(row['id']).zfill(2)),
-                    clean_string(row['nombre'])
-                ))
+                    clean_string(row['nombre']),
+                    row['id']
+                )
+                if row['id'] in existentes:
+                    cursor.execute("""
+                        UPDATE dbo.dim_tipo_documento 
+                        SET codigo = ?, nombre = ?, es_inferido = 0, updated_at = GETDATE()
+                        WHERE tipo_documento_id = ?
+                    """, params)
+                else:
+                    cursor.execute("""
+                        INSERT INTO dbo.dim_tipo_documento 
+                        (codigo, nombre, tipo_documento_id)
+                        VALUES (?, ?, ?)
+                    """, params)
                 insert_count += 1
             
             conn.commit()
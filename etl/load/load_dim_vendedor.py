@@ -1,120 +1,39 @@
 """
 ETL: Carga de dim_vendedor con SCD Type 2
-Maneja cambios históricos en los datos del vendedor
+Maneja cambios históricos en los datos del vendedor. La query origen y los
+atributos se declaran en la sección dimensions de config.yaml y la carga la
+hace el motor genérico de load_dim_scd2.py
 """
 import sys
 from pathlib import Path
-from datetime import datetime
-import argparse
 
 # Agregar el directorio raíz al path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from etl.utils.database import SourceDatabase, TargetDatabase
-from etl.utils.logger import get_logger, log_etl_start, log_etl_end, log_step, log_error, log_success
-from etl.utils.helpers import clean_string
+from etl.load.load_dim_scd2 import load_scd2_dimension, build_parser
 
 
-def load_dim_vendedor_full() -> bool:
+def load_dim_vendedor(modo: str = 'full', batch_size: int = None) -> bool:
     """
-    Carga completa de dim_vendedor con SCD Type 2
+    Carga de dim_vendedor con SCD Type 2
+
+    Args:
+        modo: 'full' o 'incremental'
+        batch_size: Versiones por lote, por defecto performance.scd2_batch_size
     """
-    log = get_logger("dim_vendedor")
-    log_etl_start("Carga FULL de dim_vendedor")
-    
-    try:
-        # PASO 1: Extraer datos de MariaDB (vendedores de la tabla users)
-        log_step("Extrayendo datos de vendedores (MariaDB)")
-        
-        source_db = SourceDatabase()
-        source_conn = source_db.get_connection()
-        source_cursor = source_conn.cursor()
-        
-        # Extraemos vendedores que tienen ventas asignadas
-        # Prioridad: vendedor de orden_pedido, si no existe, vendedor de venta
-        query = """
-            SELECT DISTINCT
-                u.id as vendedor_id,
-                u.nombre,
-                u.apellido,
-                u.email,
-                u.username
-            FROM users u
-            WHERE u.id IN (
-                SELECT DISTINCT COALESCE(op.vendedor_id, v.vendedor_id)
-                FROM ventas v
-                LEFT JOIN orden_pedidos op ON v.orden_pedido_id = op.id
-                WHERE COALESCE(op.vendedor_id, v.vendedor_id) IS NOT NULL
-            )
-            ORDER BY u.id
-        """
-        
-        source_cursor.execute(query)
-        rows = source_cursor.fetchall()
-        source_cursor.close()
-        source_conn.close()
-        
-        log_success(f"Extraídos {len(rows)} registros de MariaDB")
-        
-        # PASO 2: Cargar a SQL Server
-        log_step("Cerrando registros actuales en SQL Server")
-        
-        target_db = TargetDatabase()
-        target_conn = target_db.get_connection()
-        target_cursor = target_conn.cursor()
-        
-        # Cerrar todos los registros actuales
-        target_cursor.execute("""
-            UPDATE dbo.dim_vendedor 
-            SET es_actual = 0, 
-                fecha_fin = CAST(GETDATE() AS DATE)
-            WHERE es_actual = 1
-        """)
-        target_conn.commit()
-        
-        log_step(f"Insertando {len(rows)} registros nuevos")
-        
-        insert_count = 0
-        for row in rows:
-            target_cursor.execute("""
-                INSERT INTO dbo.dim_vendedor (
-                    vendedor_id, nombre, apellido, email, username,
-                    fecha_inicio, fecha_fin, version, es_actual
-                ) VALUES (?, ?, ?, ?, ?, CAST(GETDATE() AS DATE), NULL, 1, 1)
-            """, (
-                row['vendedor_id'],
-                clean_string(row['nombre']),
-                clean_string(row.get('apellido')),
-                clean_string(row.get('email')),
-                clean_string(row.get('username'))
-            ))
-            insert_count += 1
-        
-        target_conn.commit()
-        target_cursor.close()
-        target_conn.close()
-        
-        log_success(f"Cargados {insert_count} registros a SQL Server")
-        log_etl_end("Carga FULL de dim_vendedor", success=True, records=insert_count)
-        return True
-        
-    except Exception as e:
-        log_error("Error en la carga de dim_vendedor", e)
-        log_etl_end("Carga FULL de dim_vendedor", success=False)
-        return False
+    return load_scd2_dimension('vendedor', modo, batch_size)
+
+
+def load_dim_vendedor_full() -> bool:
+    """Carga completa de dim_vendedor: versiones solo para cambios reales y cierre de los vendedores que ya no existen"""
+    return load_dim_vendedor('full')
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Carga de dim_vendedor con SCD Type 2')
-    parser.add_argument('--mode', choices=['full', 'incremental'], default='full',
-                        help='Modo de carga: full o incremental')
+    parser = build_parser('Carga de dim_vendedor con SCD Type 2')
     
     args = parser.parse_args()
     
-    if args.mode == 'full':
-        success = load_dim_vendedor_full()
-    else:
-        print("Modo incremental no implementado aún")
-        success = False
+    success = load_dim_vendedor(args.mode, args.batch_size)
     
     sys.exit(0 if success else 1)
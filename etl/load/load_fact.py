@@ -0,0 +1,275 @@
+"""
+ETL: Carga genérica de tablas de hechos
+Carga cualquier hecho declarado en la sección facts de config.yaml
+(ver etl/utils/facts.py) con el motor de extracción -> keys -> escritura
+"""
+import sys
+from pathlib import Path
+from typing import Optional
+import argparse
+import time
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from etl.utils.database import SourceDatabase, TargetDatabase
+from etl.utils.logger import get_logger, log_etl_start, log_etl_end, log_step, log_error, log_success
+from etl.utils.config import get_setting
+from etl.utils.control import get_watermark, lookback, WatermarkTracker
+from etl.utils.facts import (get_fact_spec, get_fact_specs, build_fact_query, load_dimension_keys,
+                             transform_fact_rows, create_fact_writer, resolve_insert_mode)
+from etl.utils.writers import NullWriter
+from etl.utils.pipeline import Pipeline
+from etl.utils.benchmark import Benchmark
+
+
+# Cada cuántas filas escritas se reporta el progreso
+PROGRESS_INTERVAL = 10000
+
+# Hechos con cargador propio: si se declaran en facts se rechazan, porque el motor
+# genérico no replica su lógica (borrado de líneas sin salida_id, miembros inferidos,
+# cuarentena, checkpoints, keyset, arrastre del snapshot) y compartiría con ellos
+# la marca de agua de dbo.etl_control
+CARGADORES_ESPECIALIZADOS = {
+    'fact_ventas': 'etl/load/load_fact_ventas.py',
+    'fact_cartera_snapshot': 'etl/load/load_fact_cartera_snapshot.py',
+}
+
+
+def load_fact(nombre: str, fecha_inicio: str = None, fecha_fin: str = None, truncate: bool = False,
+              insert_mode: Optional[str] = None, batch_size: int = None, pipeline: bool = False,
+              merge: bool = False, incremental: bool = False, as_of: bool = False,
+              columnstore: bool = False, benchmark: bool = False, benchmark_path: Optional[str] = None,
+              dry_run: bool = False) -> bool:
+    """
+    Cargar un hecho declarado en config.yaml
+
+    Args:
+        nombre: Nombre del hecho en facts (los de CARGADORES_ESPECIALIZADOS
+            tienen su propio script)
+        fecha_inicio: Fecha inicial (YYYY-MM-DD) sobre source.date_column, None = todo
+        fecha_fin: Fecha final (YYYY-MM-DD), None = sin límite
+        truncate: Si True, limpia la tabla antes de cargar
+        insert_mode: 'batch', 'row' o 'bulk'; por defecto 'bulk' si se recarga
+            con truncate, performance.use_bulk_insert está activo y hay
+            performance.bulk_insert_server_directory, si no 'batch'
+        batch_size: Filas por lote, por defecto etl.batch_size de config.yaml
+        pipeline: Si True, extrae, transforma y escribe en hilos paralelos
+        merge: Si True, aplica cada lote con MERGE por la llave natural
+        incremental: Si True, extrae solo lo posterior a la marca de agua de
+            dbo.etl_control (menos etl.lookback_days); implica merge
+        as_of: Si True, las dimensiones SCD2 se resuelven con la versión vigente
+            en source.date_alias
+        columnstore: Si True, lotes de al menos 102,400 filas aplicados con
+            INSERT ... SELECT WITH (TABLOCK)
+        benchmark: Si True, guarda un reporte JSON con el tiempo de cada fase
+        benchmark_path: Archivo del reporte (por defecto logs/benchmark_<tabla>_<fecha>.json)
+        dry_run: Si True, extrae y transforma sin escribir en el DW
+    """
+    log = get_logger("fact")
+    batch_size = batch_size or get_setting('etl', 'batch_size', 1000)
+    if dry_run:
+        truncate = False
+    if incremental:
+        # La ventana de lookback vuelve a leer filas ya cargadas
+        merge = True
+
+    try:
+        insert_mode = resolve_insert_mode(insert_mode, truncate)
+        spec = get_fact_spec(nombre)
+        if spec.table in CARGADORES_ESPECIALIZADOS:
+            raise ValueError(f"{spec.table} se carga con {CARGADORES_ESPECIALIZADOS[spec.table]}")
+    except ValueError as e:
+        log_error("Carga no válida", e)
+        return False
+
+    if incremental:
+        log_etl_start(f"Carga INCREMENTAL de {spec.table}")
+    elif fecha_inicio:
+        log_etl_start(f"Carga de {spec.table} (desde {fecha_inicio} hasta {fecha_fin or 'hoy'})")
+    else:
+        log_etl_start(f"Carga COMPLETA de {spec.table}")
+    bench = Benchmark(spec.table, count_bytes=benchmark)
+
+    try:
+        # PASO 1: Mapeos de las dimensiones del hecho
+        target_db = TargetDatabase()
+        target_conn = target_db.get_connection()
+        target_cursor = target_conn.cursor()
+
+        log_step(f"Cargando mapeos de {len(spec.dimensions)} roles de dimensión"
+                 f"{' (versiones SCD2 por fecha)' if as_of else ''}...")
+        with bench.phase('dimensiones') as fase:
+            dim_keys = load_dimension_keys(target_cursor, spec, as_of)
+            fase['filas'] = sum(len(keys) for keys in dim_keys.values())
+        log_success("Mapeos cargados: " +
+                    ', '.join(f"{len(keys)} {dimension}" for dimension, keys in dim_keys.items()))
+
+        # PASO 2: Limpiar tabla si se solicita
+        if truncate:
+            log_step(f"Limpiando {spec.table}...")
+            target_cursor.execute(f"DELETE FROM {spec.target}")
+            target_conn.commit()
+            log_success("Tabla limpiada")
+
+        # Marca de agua de la última carga (dbo.etl_control)
+        watermark = None
+        desde_id = None
+        if incremental:
+            if not (spec.date_alias and spec.id_alias):
+                raise ValueError(f"La carga incremental de {spec.name} requiere source.date_alias y source.id_alias")
+            watermark = get_watermark(target_conn, spec.proceso)
+            if watermark is None:
+                log_step("Sin marca de agua previa: se cargará todo el historial")
+            elif not fecha_inicio:
+                dias = get_setting('etl', 'lookback_days', 7)
+                fecha_inicio = lookback(watermark['ultima_fecha'], dias)
+                desde_id = watermark['ultimo_id']
+                log_success(f"Marca de agua: id {desde_id}, fecha {watermark['ultima_fecha']} (lookback {dias} días)")
+        tracker = WatermarkTracker(spec.id_alias, spec.date_alias, previous=watermark) if incremental else None
+
+        # PASO 3: Extraer en streaming
+        log_step(f"Extrayendo {spec.name} de MariaDB...")
+        query, params = build_fact_query(spec, fecha_inicio, fecha_fin, desde_id)
+        source_db = SourceDatabase()
+        chunks = bench.timed_chunks(source_db.stream_query(query, params, chunk_size=batch_size))
+        if tracker:
+            chunks = tracker.track(chunks)
+
+        # PASO 4: Transformar y escribir
+        stats = {'extraidos': 0, 'omitidos': 0, 'errores': []}
+        posiciones_llave = [spec.columns.index(c) for c in spec.natural_key]
+
+        def on_insert_error(params, e):
+            if len(stats['errores']) < 5:
+                llave = ', '.join(f"{c} {params[i]}" for c, i in zip(spec.natural_key, posiciones_llave))
+                stats['errores'].append(f"{llave or 'Fila'}: {str(e)}")
+
+        if dry_run:
+            writer = NullWriter(batch_size)
+        else:
+            writer = create_fact_writer(spec, target_conn, insert_mode, merge, columnstore, batch_size,
+                                        on_insert_error)
+        log_step(f"Escritura: {type(writer).__name__}, lotes de {writer.batch_size} filas")
+
+        transform = bench.timed(lambda rows: transform_fact_rows(spec, rows, dim_keys, stats), 'transformacion')
+        progress = {'siguiente': PROGRESS_INTERVAL}
+
+        def extend(batch):
+            writer.extend(batch)
+            if writer.rows_written >= progress['siguiente']:
+                log_step(f"Progreso: {writer.rows_written} registros escritos...")
+                progress['siguiente'] += PROGRESS_INTERVAL
+        write_batch = bench.timed(extend, 'escritura')
+
+        start_time = time.perf_counter()
+        if pipeline:
+            etl_pipeline = Pipeline(queue_size=get_setting('etl', 'pipeline_queue_size', 4))
+            etl_pipeline.run(chunks, transform, write_batch)
+        else:
+            for rows in chunks:
+                write_batch(transform(rows))
+        with bench.phase('escritura'):
+            writer.close()
+        source_db.close()
+
+        if tracker and not dry_run:
+            tracker.save(target_conn, spec.proceso, stats['extraidos'])
+            log_success(f"Marca de agua actualizada: id {tracker.ultimo_id}, fecha {tracker.ultima_fecha}")
+
+        target_cursor.close()
+        target_conn.close()
+
+        # RESUMEN
+        total_elapsed = time.perf_counter() - start_time
+        log_success(f"Extraídos {stats['extraidos']} registros de {spec.name}")
+        if dry_run:
+            log_success(f"Dry-run: {writer.rows_written} registros transformados, nada escrito en el DW")
+        elif merge:
+            log_success(f"Aplicados vía MERGE: {writer.rows_written} registros "
+                        f"({writer.rows_merged} insertados o actualizados)")
+        else:
+            log_success(f"Insertados: {writer.rows_written} registros")
+        if not dry_run:
+            log_step(f"Escritura: {writer.elapsed:.2f}s, {writer.rows_per_second:,.0f} filas/s "
+                     f"({writer.batches} commits) | Total transformación+carga: {total_elapsed:.2f}s")
+        skip_count = stats['omitidos'] + writer.rows_failed
+        if skip_count:
+            log_step(f"Omitidos: {skip_count} registros (sin keys o errores)")
+            for error in stats['errores'][:5]:
+                log_step(f"  - {error}")
+
+        if benchmark:
+            ruta = bench.save(benchmark_path, parametros={
+                'hecho': spec.name, 'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin,
+                'insert_mode': insert_mode, 'batch_size': batch_size, 'pipeline': pipeline,
+                'merge': merge, 'incremental': incremental, 'as_of': as_of,
+                'columnstore': columnstore, 'dry_run': dry_run,
+            }, totales={'extraidos': stats['extraidos'], 'escritos': writer.rows_written,
+                        'omitidos': skip_count})
+            log_success(f"Reporte de benchmark: {ruta}")
+
+        log_etl_end(f"Carga de {spec.table}", success=True, records=writer.rows_written)
+        return True
+
+    except Exception as e:
+        log_error(f"Error en la carga de {spec.table}", e)
+        log_etl_end(f"Carga de {spec.table}", success=False)
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Carga genérica de hechos declarados en config.yaml (facts)')
+    parser.add_argument('--fact', help='Nombre del hecho (ver --list)')
+    parser.add_argument('--list', action='store_true', help='Listar los hechos declarados')
+    parser.add_argument('--fecha-inicio', help='Fecha inicial (YYYY-MM-DD)')
+    parser.add_argument('--fecha-fin', help='Fecha final (YYYY-MM-DD)')
+    parser.add_argument('--truncate', action='store_true', help='Limpiar tabla antes de cargar')
+    parser.add_argument('--insert-mode', choices=['batch', 'row', 'bulk'],
+                        help='Modo de inserción (por defecto bulk con --truncate si performance.use_bulk_insert '
+                             'y bulk_insert_server_directory, '
+                             'si no batch)')
+    parser.add_argument('--batch-size', type=int,
+                        help='Filas por lote (por defecto etl.batch_size de config.yaml)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Solapar extracción, transformación y escritura en hilos con colas acotadas')
+    parser.add_argument('--merge', action='store_true',
+                        help='Carga idempotente: staging + MERGE por la llave natural del hecho')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Cargar solo lo posterior a la marca de agua de dbo.etl_control; implica --merge')
+    parser.add_argument('--as-of', action='store_true',
+                        help='Resolver dimensiones SCD2 con la versión vigente en la fecha del hecho')
+    parser.add_argument('--columnstore', action='store_true',
+                        help='Cargar por rowgroups completos con INSERT ... SELECT WITH (TABLOCK)')
+    parser.add_argument('--benchmark', nargs='?', const='', metavar='RUTA',
+                        help='Medir cada fase y guardar un reporte JSON (por defecto en logs/)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Extraer y transformar sin escribir en el DW')
+
+    args = parser.parse_args()
+
+    if args.list or not args.fact:
+        for spec in get_fact_specs(enabled_only=False):
+            cargador = CARGADORES_ESPECIALIZADOS.get(spec.table)
+            print(f"{spec.name:20} -> {spec.target} ({len(spec.columns)} columnas, "
+                  f"llave {', '.join(spec.natural_key) or '-'})"
+                  f"{f' [usar {cargador}]' if cargador else ''}")
+        sys.exit(0 if args.list else 1)
+
+    success = load_fact(
+        args.fact,
+        fecha_inicio=args.fecha_inicio,
+        fecha_fin=args.fecha_fin,
+        truncate=args.truncate,
+        insert_mode=args.insert_mode,
+        batch_size=args.batch_size,
+        pipeline=args.pipeline,
+        merge=args.merge,
+        incremental=args.incremental,
+        as_of=args.as_of,
+        columnstore=args.columnstore,
+        benchmark=args.benchmark is not None,
+        benchmark_path=args.benchmark or None,
+        dry_run=args.dry_run
+    )
+
+    sys.exit(0 if success else 1)
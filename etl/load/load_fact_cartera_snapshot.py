@@ -0,0 +1,312 @@
+"""
+ETL: Snapshot diario de cartera (fact_cartera_snapshot)
+Guarda por día una fila por cliente y venta a crédito abierta con su saldo y
+antigüedad. Cada día se arma desde el snapshot anterior: se arrastran sus filas
+y solo se extraen de MariaDB las ventas que cambiaron desde esa fecha
+"""
+import sys
+from pathlib import Path
+from datetime import date
+import argparse
+import time
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from etl.utils.database import SourceDatabase, TargetDatabase
+from etl.utils.logger import get_logger, log_etl_start, log_etl_end, log_step, log_error, log_success
+from etl.utils.config import get_setting
+from etl.utils.helpers import safe_date, safe_float
+from etl.utils.control import save_watermark
+from etl.utils.writers import create_writer
+from etl.utils.schema import TypedParameters
+from etl.utils.scd import get_scd_keys
+
+
+# Nombre del proceso en dbo.etl_control
+PROCESO = 'fact_cartera_snapshot'
+
+# Columnas de stg_fact_cartera_cambios en el orden de transform_cartera
+CARTERA_COLUMNS = (
+    'venta_id', 'cliente_key', 'vendedor_key', 'condicion_pago_key',
+    'fecha_venta', 'monto_credito', 'saldo', 'esta_abierta',
+)
+
+# Ventas con su saldo (una fila por venta, sin detalle)
+QUERY_CARTERA = """
+    SELECT
+        v.id AS venta_id,
+        v.cliente_id,
+        COALESCE(NULLIF(op.vendedor_id, 0), v.vendedor_id) AS vendedor_id,
+        v.condicion_pago_id,
+        v.fecha AS fecha_venta,
+        v.venta_total_con_impuestos AS monto_credito,
+        v.saldo,
+        v.fecha_liquidado,
+        v.fecha_anulado
+    FROM ventas v
+    LEFT JOIN orden_pedidos op ON v.orden_pedido_id = op.id
+"""
+
+INSERT_STG_CARTERA = f"""
+    INSERT INTO dbo.stg_fact_cartera_cambios ({', '.join(CARTERA_COLUMNS)})
+    VALUES ({', '.join('?' * len(CARTERA_COLUMNS))})
+"""
+
+CLEAR_STG_CARTERA = "TRUNCATE TABLE dbo.stg_fact_cartera_cambios"
+
+DELETE_SNAPSHOT_DIA = "DELETE FROM dbo.fact_cartera_snapshot WHERE fecha_snapshot = ?"
+
+# Snapshot del día: filas del snapshot base sin cambios (con su antigüedad
+# recalculada) más las ventas cambiadas que siguen abiertas.
+# Parámetros: fecha, tiempo_key, fecha, fecha base, fecha
+APPLY_SNAPSHOT = """
+    INSERT INTO dbo.fact_cartera_snapshot
+        (fecha_snapshot, tiempo_key, cliente_key, vendedor_key, condicion_pago_key, venta_id,
+         fecha_venta, monto_credito, saldo, dias_pendiente, rango_antiguedad)
+    SELECT
+        ?, ?, c.cliente_key, c.vendedor_key, c.condicion_pago_key, c.venta_id,
+        c.fecha_venta, c.monto_credito, c.saldo, c.dias_pendiente,
+        CASE
+            WHEN c.dias_pendiente <= 30 THEN N'0-30 días'
+            WHEN c.dias_pendiente <= 60 THEN N'31-60 días'
+            WHEN c.dias_pendiente <= 90 THEN N'61-90 días'
+            WHEN c.dias_pendiente <= 120 THEN N'91-120 días'
+            ELSE N'Más de 120 días'
+        END
+    FROM (
+        SELECT p.cliente_key, p.vendedor_key, p.condicion_pago_key, p.venta_id,
+               p.fecha_venta, p.monto_credito, p.saldo,
+               DATEDIFF(DAY, p.fecha_venta, ?) AS dias_pendiente
+        FROM dbo.fact_cartera_snapshot p
+        WHERE p.fecha_snapshot = ?
+            AND NOT EXISTS (SELECT 1 FROM dbo.stg_fact_cartera_cambios s WHERE s.venta_id = p.venta_id)
+        UNION ALL
+        SELECT s.cliente_key, s.vendedor_key, s.condicion_pago_key, s.venta_id,
+               s.fecha_venta, s.monto_credito, s.saldo,
+               DATEDIFF(DAY, s.fecha_venta, ?) AS dias_pendiente
+        FROM dbo.stg_fact_cartera_cambios s
+        WHERE s.esta_abierta = 1
+    ) c
+"""
+
+
+def build_cartera_query(fecha: date, desde: date = None, con_updated_at: bool = False) -> tuple:
+    """
+    Construir el query de ventas para el snapshot
+
+    Args:
+        fecha: Día del snapshot (no entran ventas posteriores)
+        desde: Fecha del snapshot base; se extraen solo las ventas creadas,
+            liquidadas, anuladas o modificadas desde entonces. None = todas las
+            ventas a crédito abiertas en la fecha (snapshot completo)
+        con_updated_at: Si True, incluye las ventas con updated_at desde la
+            fecha base (abonos que cambian el saldo sin cerrar la venta)
+
+    Returns:
+        Tupla (query, params) para pymysql
+    """
+    condiciones = ["v.fecha <= %s"]
+    params = [fecha]
+
+    if desde is None:
+        condiciones.append("v.condicion_pago_id NOT IN (0, 1)")
+        condiciones.append("v.saldo > 0")
+        condiciones.append("(v.fecha_liquidado IS NULL OR v.fecha_liquidado > %s)")
+        condiciones.append("(v.fecha_anulado IS NULL OR v.fecha_anulado > %s)")
+        params.extend([fecha, fecha])
+    else:
+        cambios = ["v.fecha >= %s", "v.fecha_liquidado >= %s", "v.fecha_anulado >= %s"]
+        params.extend([desde, desde, desde])
+        if con_updated_at:
+            cambios.append("v.updated_at >= %s")
+            params.append(desde)
+        condiciones.append(f"({' OR '.join(cambios)})")
+
+    query = QUERY_CARTERA + f" WHERE {' AND '.join(condiciones)} ORDER BY v.id"
+    return query, params
+
+
+def get_dimension_keys(target_cursor) -> dict:
+    """Mapeos natural_id -> key (versión actual) de las dimensiones del snapshot"""
+    target_cursor.execute("SELECT condicion_pago_key, condicion_pago_id FROM dbo.dim_condicion_pago")
+    dim_condicion_pago = {row[1]: row[0] for row in target_cursor.fetchall()}
+    return {
+        'cliente': get_scd_keys(target_cursor, 'dim_cliente', 'cliente_id', 'cliente_key'),
+        'vendedor': get_scd_keys(target_cursor, 'dim_vendedor', 'vendedor_id', 'vendedor_key'),
+        'condicion_pago': dim_condicion_pago,
+    }
+
+
+def esta_abierta(row: dict, fecha: date) -> bool:
+    """Venta a crédito con saldo, sin liquidar ni anular al día del snapshot"""
+    if not row['condicion_pago_id'] or row['condicion_pago_id'] == 1:
+        return False
+    if safe_float(row['saldo']) <= 0:
+        return False
+    fecha_liquidado = safe_date(row['fecha_liquidado'])
+    fecha_anulado = safe_date(row['fecha_anulado'])
+    return ((fecha_liquidado is None or fecha_liquidado > fecha) and
+            (fecha_anulado is None or fecha_anulado > fecha))
+
+
+def transform_cartera(rows: list, fecha: date, dim_keys: dict, stats: dict) -> list:
+    """
+    Convertir un bloque de ventas en los parámetros de stg_fact_cartera_cambios
+
+    Las ventas cerradas se envían con esta_abierta = 0 (solo quitan la venta
+    del snapshot). Una venta abierta cuyo cliente no está en dim_cliente se
+    cuenta como omitida y también se envía con esta_abierta = 0: así su fila
+    del snapshot base no se arrastra con un saldo que ya cambió.
+
+    Args:
+        rows: Bloque de registros extraídos de MariaDB
+        fecha: Día del snapshot
+        dim_keys: Mapeos de get_dimension_keys
+        stats: Contadores (omitidos, errores) que se actualizan
+
+    Returns:
+        Lista de tuplas en el orden de CARTERA_COLUMNS
+    """
+    result = []
+    for row in rows:
+        cerrada = (row['venta_id'], None, None, None, None, None, None, 0)
+        if not esta_abierta(row, fecha):
+            result.append(cerrada)
+            continue
+
+        cliente_key = dim_keys['cliente'].get(row['cliente_id'])
+        if cliente_key is None:
+            stats['omitidos'] += 1
+            if len(stats['errores']) < 5:
+                stats['errores'].append(f"Venta {row['venta_id']}: cliente {row['cliente_id']} no existe en dim_cliente")
+            result.append(cerrada)
+            continue
+
+        result.append((
+            row['venta_id'],
+            cliente_key,
+            dim_keys['vendedor'].get(row['vendedor_id']) if row['vendedor_id'] else None,
+            dim_keys['condicion_pago'].get(row['condicion_pago_id']),
+            safe_date(row['fecha_venta']),
+            safe_float(row['monto_credito']),
+            safe_float(row['saldo']),
+            1,
+        ))
+    return result
+
+
+def load_fact_cartera_snapshot(fecha: str = None, full: bool = False, batch_size: int = None) -> bool:
+    """
+    Cargar el snapshot de cartera de un día
+
+    Args:
+        fecha: Día del snapshot (YYYY-MM-DD), por defecto hoy. Si ya existe se reemplaza
+        full: Si True, extrae todas las ventas abiertas en lugar de partir del
+            snapshot anterior
+        batch_size: Ventas por lote, por defecto etl.batch_size de config.yaml
+    """
+    log = get_logger("fact_cartera_snapshot")
+    batch_size = batch_size or get_setting('etl', 'batch_size', 1000)
+    fecha = safe_date(fecha) if fecha else date.today()
+
+    log_etl_start(f"Snapshot de cartera {fecha}")
+
+    try:
+        target_db = TargetDatabase()
+        target_conn = target_db.get_connection()
+        target_cursor = target_conn.cursor()
+        source_db = SourceDatabase()
+
+        # PASO 1: Día del snapshot en dim_tiempo y snapshot base
+        target_cursor.execute("SELECT tiempo_key FROM dbo.dim_tiempo WHERE fecha = ?", fecha)
+        row = target_cursor.fetchone()
+        if row is None:
+            raise ValueError(f"La fecha {fecha} no existe en dim_tiempo")
+        tiempo_key = row[0]
+
+        target_cursor.execute("SELECT MAX(fecha_snapshot) FROM dbo.fact_cartera_snapshot WHERE fecha_snapshot < ?",
+                              fecha)
+        base = None if full else safe_date(target_cursor.fetchone()[0])
+        con_updated_at = source_db.has_column('ventas', 'updated_at')
+
+        if base:
+            log_success(f"Snapshot base: {base} (se arrastra y se aplican las ventas cambiadas desde esa fecha)")
+            if not con_updated_at:
+                log_step("ventas no tiene updated_at: los abonos que no cierran la venta se reflejan "
+                         "solo con --full")
+        else:
+            log_step("Sin snapshot base: se extraen todas las ventas a crédito abiertas")
+
+        dim_keys = get_dimension_keys(target_cursor)
+        log_success(f"Mapeos cargados: {len(dim_keys['cliente'])} clientes, "
+                    f"{len(dim_keys['vendedor'])} vendedores")
+
+        # PASO 2: Extraer ventas (abiertas o cambiadas) y escribirlas en staging
+        log_step("Extrayendo ventas de cartera...")
+        target_cursor.execute(CLEAR_STG_CARTERA)
+        target_conn.commit()
+
+        errors = []
+
+        def on_error(params, e):
+            if len(errors) < 5:
+                errors.append(f"Venta {params[0]}: {str(e)}")
+
+        writer = create_writer('batch', target_conn, INSERT_STG_CARTERA, batch_size, on_error)
+        if get_setting('performance', 'typed_parameters', True):
+            writer.parameter_types = TypedParameters('dbo.stg_fact_cartera_cambios', CARTERA_COLUMNS)
+
+        start_time = time.perf_counter()
+        stats = {'omitidos': 0, 'errores': []}
+        extract_count = 0
+        for rows in source_db.stream_query(*build_cartera_query(fecha, base, con_updated_at),
+                                           chunk_size=batch_size):
+            extract_count += len(rows)
+            writer.extend(transform_cartera(rows, fecha, dim_keys, stats))
+        writer.close()
+        source_db.close()
+        log_success(f"Extraídas {extract_count} ventas ({writer.rows_written} en staging)")
+
+        # PASO 3: Armar el día (reemplaza el snapshot de la fecha si ya existía)
+        log_step(f"Aplicando snapshot del {fecha}...")
+        target_cursor.execute(DELETE_SNAPSHOT_DIA, fecha)
+        target_cursor.execute(APPLY_SNAPSHOT, fecha, tiempo_key, fecha, base, fecha)
+        filas = target_cursor.rowcount
+        target_cursor.execute(CLEAR_STG_CARTERA)
+        target_conn.commit()
+
+        save_watermark(target_conn, PROCESO, None, fecha, None, filas)
+        target_cursor.close()
+        target_conn.close()
+
+        log_success(f"Snapshot {fecha}: {filas} ventas abiertas")
+        log_step(f"Tiempo total: {time.perf_counter() - start_time:.2f}s")
+
+        if stats['omitidos'] or writer.rows_failed:
+            log_step(f"Omitidas: {stats['omitidos'] + writer.rows_failed} ventas "
+                     f"({stats['omitidos']} quitadas del snapshot hasta que su cliente exista en dim_cliente)")
+            for error in stats['errores'] + errors:
+                log_step(f"  - {error}")
+
+        log_etl_end(f"Snapshot de cartera {fecha}", success=True, records=filas)
+        return True
+
+    except Exception as e:
+        log_error("Error en el snapshot de cartera", e)
+        log_etl_end(f"Snapshot de cartera {fecha}", success=False)
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Snapshot diario de cartera (fact_cartera_snapshot)')
+    parser.add_argument('--fecha', help='Día del snapshot (YYYY-MM-DD), por defecto hoy')
+    parser.add_argument('--full', action='store_true',
+                        help='Extraer todas las ventas abiertas sin partir del snapshot anterior')
+    parser.add_argument('--batch-size', type=int,
+                        help='Ventas por lote (por defecto etl.batch_size de config.yaml)')
+
+    args = parser.parse_args()
+
+    success = load_fact_cartera_snapshot(fecha=args.fecha, full=args.full, batch_size=args.batch_size)
+
+    sys.exit(0 if success else 1)
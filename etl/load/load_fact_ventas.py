@@ -4,35 +4,428 @@ Carga la tabla de hechos con las transacciones de ventas
 """
 import sys
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Callable, Optional
 import argparse
+import time
+import numpy as np
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from etl.utils.database import SourceDatabase, TargetDatabase
-from etl.utils.logger import get_logger, log_etl_start, log_etl_end, log_step, log_error, log_success
+from etl.utils.database import SourceDatabase, TargetDatabase, stream_partitions, open_consistent_snapshots
+from etl.utils.logger import (get_logger, log_etl_start, log_etl_end, log_step, log_error, log_success,
+                              log_warning)
+from etl.utils.config import get_setting
+from etl.utils.helpers import safe_date, split_date_range
+from etl.utils.control import (get_watermark, lookback, WatermarkTracker, start_run, save_checkpoint,
+                               set_run_status, get_resumable_run)
+from etl.utils.writers import MergeWriter, NullWriter
+from etl.utils.facts import create_staged_writer, resolve_insert_mode
+from etl.utils.pipeline import Pipeline
+from etl.utils.benchmark import Benchmark
+from etl.utils.schema import TypedParameters
+from etl.utils.columnstore import (get_columnstore_index, get_rowgroups, rowgroup_summary, new_rowgroups,
+                                  rowgroup_problems)
+from etl.utils.keyset import KeysetPaginator
+from etl.utils.hashjoin import LookupCache, fetch_by_ids, group_by
+from etl.utils.vectorized import rows_to_frame, truthy_mask, to_float, map_keys, to_sql_list
+from etl.utils.scd import AsOfKeys, get_scd_keys, scd_key, map_scd_keys, to_days
+from etl.utils.inferred import InferredMembers
+from etl.utils.quarantine import (Quarantine, new_run_id, FALTA_DIMENSION, ERROR_TRANSFORMACION,
+                                  ERROR_ESCRITURA)
 
 
-def get_dimension_keys(target_cursor):
-    """Obtener mappings de IDs a keys de las dimensiones"""
+# Cada cuántas filas insertadas se reporta el progreso
+PROGRESS_INTERVAL = 10000
+
+# Nombre del proceso en dbo.etl_control
+PROCESO = 'fact_ventas'
+
+# Tabla de cuarentena y ids de origen que se guardan de cada línea rechazada
+TABLA_RECHAZOS = 'etl_rechazos_fact_ventas'
+RECHAZOS_IDS = ('venta_id', 'salida_id', 'fecha_venta', 'cliente_id', 'producto_id', 'tipo_documento_id')
+
+# Dimensiones con miembros inferidos -> columna extraída con la llave natural
+MIEMBROS_INFERIDOS = {
+    'cliente': 'cliente_id',
+    'producto': 'producto_id',
+    'tipo_documento': 'tipo_documento_id',
+}
+
+# Columnas de fact_ventas en el orden de los parámetros de transform_venta
+FACT_VENTAS_COLUMNS = (
+    'tiempo_key', 'cliente_key', 'producto_key', 'vendedor_key', 'ubicacion_key',
+    'tipo_documento_key', 'condicion_pago_key', 'estado_venta_key',
+    'venta_id', 'salida_id', 'orden_pedido_id', 'numero_venta',
+    'cantidad', 'precio_unitario', 'venta_exenta', 'venta_gravada',
+    'venta_total', 'iva', 'venta_total_con_impuestos',
+    'costo_unitario', 'costo_total', 'margen_bruto', 'porcentaje_margen',
+    'es_venta_credito', 'esta_liquidado', 'esta_anulado',
+    'fecha_venta', 'fecha_liquidacion', 'fecha_anulacion',
+)
+
+# Llave natural de una línea de venta
+FACT_VENTAS_KEY = ('venta_id', 'salida_id')
+
+_COLUMNAS = ', '.join(FACT_VENTAS_COLUMNS)
+_PARAMETROS = ', '.join('?' * len(FACT_VENTAS_COLUMNS))
+
+INSERT_FACT_VENTAS = f"""
+    INSERT INTO dbo.fact_ventas ({_COLUMNAS}, fecha_carga)
+    VALUES ({_PARAMETROS}, GETDATE())
+"""
+
+INSERT_STG_FACT_VENTAS = f"""
+    INSERT INTO dbo.stg_fact_ventas ({_COLUMNAS})
+    VALUES ({_PARAMETROS})
+"""
+
+_ATRIBUTOS = [c for c in FACT_VENTAS_COLUMNS if c not in FACT_VENTAS_KEY]
+
+MERGE_FACT_VENTAS = [
+    # Filas cargadas antes de guardar salida_id: se reemplazan por las del lote
+    """
+    DELETE f
+    FROM dbo.fact_ventas f
+    WHERE f.salida_id IS NULL
+      AND f.venta_id IN (SELECT venta_id FROM dbo.stg_fact_ventas)
+    """,
+    # Insertar líneas nuevas y actualizar solo las que cambiaron
+    f"""
+    MERGE dbo.fact_ventas WITH (HOLDLOCK) AS t
+    USING dbo.stg_fact_ventas AS s
+        ON t.venta_id = s.venta_id AND t.salida_id = s.salida_id
+    WHEN MATCHED AND EXISTS (
+        SELECT {', '.join('s.' + c for c in _ATRIBUTOS)}
+        EXCEPT
+        SELECT {', '.join('t.' + c for c in _ATRIBUTOS)}
+    ) THEN
+        UPDATE SET {', '.join(f'{c} = s.{c}' for c in _ATRIBUTOS)},
+                   fecha_actualizacion = GETDATE()
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT ({_COLUMNAS}, fecha_carga)
+        VALUES ({', '.join('s.' + c for c in FACT_VENTAS_COLUMNS)}, GETDATE());
+    """,
+]
+
+CLEAR_STG_FACT_VENTAS = "TRUNCATE TABLE dbo.stg_fact_ventas"
+
+# Carga columnstore: un solo INSERT ... SELECT masivo por rowgroup desde la staging
+# (con el columnstore agrupado de 05_crear_tablas_etl.sql comprime directo)
+INSERT_SELECT_FACT_VENTAS = f"""
+    INSERT INTO dbo.fact_ventas WITH (TABLOCK) ({_COLUMNAS}, fecha_carga)
+    SELECT {_COLUMNAS}, GETDATE()
+    FROM dbo.stg_fact_ventas
+"""
+
+# Con --merge las líneas ya cargadas se reemplazan (borrar + insertar) en lugar de un
+# MERGE, que insertaría fila por fila en el delta store
+COLUMNSTORE_MERGE_FACT_VENTAS = [
+    MERGE_FACT_VENTAS[0],
+    """
+    DELETE f
+    FROM dbo.fact_ventas f
+    INNER JOIN dbo.stg_fact_ventas s ON f.venta_id = s.venta_id AND f.salida_id = s.salida_id
+    """,
+    INSERT_SELECT_FACT_VENTAS,
+]
+
+# Sentencias para create_staged_writer (la misma selección de escritor que load_fact.py)
+SENTENCIAS_FACT_VENTAS = {
+    'insert': INSERT_FACT_VENTAS,
+    'stage_insert': INSERT_STG_FACT_VENTAS,
+    'clear': CLEAR_STG_FACT_VENTAS,
+    'insert_select': INSERT_SELECT_FACT_VENTAS,
+    'merge': MERGE_FACT_VENTAS,
+    'replace': COLUMNSTORE_MERGE_FACT_VENTAS,
+}
+
+# Reproceso de la cuarentena: ventas pendientes hasta el último rechazo leído
+# (los rechazos sin venta_id no se pueden reprocesar y quedan pendientes)
+SELECT_RECHAZOS_PENDIENTES = f"""
+    SELECT venta_id, MAX(rechazo_id)
+    FROM dbo.{TABLA_RECHAZOS}
+    WHERE reprocesado = 0 AND venta_id IS NOT NULL
+    GROUP BY venta_id
+"""
+
+MARCAR_RECHAZOS_REPROCESADOS = f"""
+    UPDATE dbo.{TABLA_RECHAZOS}
+    SET reprocesado = 1, fecha_reproceso = GETDATE()
+    WHERE reprocesado = 0 AND venta_id IS NOT NULL AND rechazo_id <= ?
+"""
+
+# Ventas por query al reprocesar rechazos (lista de IN)
+VENTAS_POR_QUERY = 1000
+
+# Llave de orden de la extracción (expresiones SQL y columnas extraídas)
+KEYSET_EXPRS = ('v.fecha', 'v.id', 's.id')
+KEYSET_COLUMNS = ('fecha_venta', 'venta_id', 'salida_id')
+
+# Posición de la llave de orden en los parámetros de fact_ventas (checkpoint de cada lote)
+CHECKPOINT_INDEXES = tuple(FACT_VENTAS_COLUMNS.index(c) for c in KEYSET_COLUMNS)
+
+
+# Query principal: ventas -> orden_pedidos -> salidas
+# Según tu análisis: salidas tiene el detalle por producto
+QUERY_VENTAS = """
+        SELECT 
+            v.id as venta_id,
+            v.tipo_documento_id,
+            v.orden_pedido_id,
+            v.estado_venta_id,
+            v.cliente_id,
+            v.vendedor_id,
+            v.condicion_pago_id,
+            v.numero as numero_venta,
+            v.fecha as fecha_venta,
+            v.saldo,
+            v.fecha_anulado,
+            v.fecha_liquidado,
+            -- Desde orden_pedidos
+            op.vendedor_id as op_vendedor_id,
+            -- Desde clientes (municipio para ubicacion_key)
+            c.municipio_id,
+            -- Desde salidas (detalle por producto)
+            s.id as salida_id,
+            s.cantidad,
+            s.precio_unitario,
+            s.venta_exenta,
+            s.venta_gravada,
+            -- Producto: desde precios o producciones
+            COALESCE(pr.producto_id, prod.producto_id) as producto_id,
+            -- Costo del producto
+            p.costo as costo_producto
+        FROM ventas v
+        LEFT JOIN clientes c ON v.cliente_id = c.id
+        LEFT JOIN orden_pedidos op ON v.orden_pedido_id = op.id
+        LEFT JOIN salidas s ON s.orden_pedido_id = op.id
+        LEFT JOIN precios pr ON s.precio_id = pr.id
+        LEFT JOIN producciones prod ON s.produccion_id = prod.id
+        LEFT JOIN productos p ON COALESCE(pr.producto_id, prod.producto_id) = p.id
+        WHERE s.id IS NOT NULL  -- Solo ventas con detalle
+    """
+
+# Extracción con joins del lado del cliente (--hash-join): solo ventas, el
+# resto de tablas se leen por id y se unen en Python (ver extract_ventas_hash_join)
+QUERY_VENTAS_SCAN = """
+        SELECT
+            v.id as venta_id,
+            v.tipo_documento_id,
+            v.orden_pedido_id,
+            v.estado_venta_id,
+            v.cliente_id,
+            v.vendedor_id,
+            v.condicion_pago_id,
+            v.numero as numero_venta,
+            v.fecha as fecha_venta,
+            v.saldo,
+            v.fecha_anulado,
+            v.fecha_liquidado
+        FROM ventas v
+        WHERE 1 = 1
+    """
+
+COLUMNAS_SALIDAS = ('id', 'orden_pedido_id', 'cantidad', 'precio_unitario', 'venta_exenta',
+                    'venta_gravada', 'precio_id', 'produccion_id')
+
+
+def build_ventas_query(fecha_inicio=None, fecha_fin=None, desde_id=None, desde_updated_at=None,
+                       con_updated_at: bool = False, venta_ids: list = None,
+                       ordenar: bool = True) -> tuple:
+    """
+    Construir el query de extracción de ventas con filtro de fechas parametrizado
+    
+    En carga incremental, fecha_inicio, desde_id y desde_updated_at se combinan
+    con OR: entra toda venta dentro de la ventana de fechas, con id posterior a
+    la marca de agua o modificada desde la última carga.
     
-    log_step("Cargando mapeos de dimensiones...")
+    Args:
+        fecha_inicio: Fecha inicial inclusiva (date o YYYY-MM-DD), None = sin límite
+        fecha_fin: Fecha final inclusiva (date o YYYY-MM-DD), None = sin límite
+        desde_id: Incluir ventas con id mayor a este valor
+        desde_updated_at: Incluir ventas con updated_at igual o posterior
+        con_updated_at: Si True, extrae v.updated_at como venta_updated_at
+        venta_ids: Si se indica, extrae solo estas ventas (reproceso de rechazos)
+        ordenar: Si False, omite el ORDER BY (lo agrega KeysetPaginator por página)
+    
+    Returns:
+        Tupla (query, params) para pymysql
+    """
+    query = QUERY_VENTAS
+    if con_updated_at:
+        query = query.replace("SELECT", "SELECT\n            v.updated_at as venta_updated_at,", 1)
+    
+    filtros, params = ventas_filters(fecha_inicio, fecha_fin, desde_id, desde_updated_at, venta_ids)
+    query += filtros
+    if ordenar:
+        query += f" ORDER BY {', '.join(KEYSET_EXPRS)}"
+    return query, params
+
+
+def build_ventas_scan_query(fecha_inicio=None, fecha_fin=None, desde_id=None, desde_updated_at=None,
+                            con_updated_at: bool = False) -> tuple:
+    """
+    Query de extracción solo sobre ventas (--hash-join), con los mismos filtros
+    que build_ventas_query y ordenado por (v.fecha, v.id)
+    
+    Returns:
+        Tupla (query, params) para pymysql
+    """
+    query = QUERY_VENTAS_SCAN
+    if con_updated_at:
+        query = query.replace("SELECT", "SELECT\n            v.updated_at as venta_updated_at,", 1)
+    filtros, params = ventas_filters(fecha_inicio, fecha_fin, desde_id, desde_updated_at)
+    return query + filtros + f" ORDER BY {', '.join(KEYSET_EXPRS[:2])}", params
+
+
+def ventas_filters(fecha_inicio=None, fecha_fin=None, desde_id=None, desde_updated_at=None,
+                   venta_ids: list = None) -> tuple:
+    """
+    Condiciones AND sobre ventas (alias v) de la extracción; ver build_ventas_query
+    
+    Returns:
+        Tupla (condiciones, params)
+    """
+    query = ""
+    params = []
+    
+    # Filtro desde la fecha inicial o la marca de agua
+    desde = []
+    if fecha_inicio:
+        desde.append("v.fecha >= %s")
+        params.append(fecha_inicio)
+    if desde_id is not None:
+        desde.append("v.id > %s")
+        params.append(desde_id)
+    if desde_updated_at is not None:
+        desde.append("v.updated_at >= %s")
+        params.append(desde_updated_at)
+    if desde:
+        query += f" AND ({' OR '.join(desde)})"
+    
+    if fecha_fin:
+        query += " AND v.fecha <= %s"
+        params.append(fecha_fin)
+    if venta_ids:
+        query += f" AND v.id IN ({', '.join(['%s'] * len(venta_ids))})"
+        params.extend(venta_ids)
+    return query, params
+
+
+def extract_ventas_hash_join(query: str, params: list, chunk_size: int = 1000,
+                             sync_lock: bool = False):
+    """
+    Extraer las líneas de venta uniendo las tablas en Python
+    
+    MariaDB solo recorre ventas por rango (fecha/id) y responde lecturas por
+    id: orden_pedidos y salidas por bloque de ventas, y precios, producciones,
+    productos y clientes con caché durante toda la ejecución. Cada fila tiene
+    las mismas columnas que QUERY_VENTAS y se entregan en el mismo orden
+    (v.fecha, v.id, s.id).
+    
+    Args:
+        query: Query sobre ventas (ver build_ventas_scan_query)
+        params: Parámetros del query
+        chunk_size: Ventas por bloque
+        sync_lock: Ver open_consistent_snapshots
+    
+    Yields:
+        Lista de diccionarios por bloque de ventas
+    """
+    ventas_db = SourceDatabase()
+    lookup_db = SourceDatabase()
+    precios = LookupCache('precios', ('id', 'producto_id'))
+    producciones = LookupCache('producciones', ('id', 'producto_id'))
+    productos = LookupCache('productos', ('id', 'costo'))
+    clientes = LookupCache('clientes', ('id', 'municipio_id'))
+    
+    try:
+        # Ambas conexiones leen el mismo snapshot: las ventas y su detalle son coherentes
+        open_consistent_snapshots([ventas_db, lookup_db], sync_lock)
+        conn = lookup_db.get_connection()
+        
+        for ventas in ventas_db.stream_query(query, params, chunk_size=chunk_size):
+            ordenes = {row['id']: row for row in fetch_by_ids(
+                conn, 'orden_pedidos', ('id', 'vendedor_id'), (v['orden_pedido_id'] for v in ventas))}
+            salidas = group_by(fetch_by_ids(conn, 'salidas', COLUMNAS_SALIDAS, ordenes, key='orden_pedido_id'),
+                               'orden_pedido_id', order_by='id')
+            detalle = [s for grupo in salidas.values() for s in grupo]
+            precios.load(conn, (s['precio_id'] for s in detalle))
+            producciones.load(conn, (s['produccion_id'] for s in detalle))
+            clientes.load(conn, (v['cliente_id'] for v in ventas))
+            
+            # COALESCE(pr.producto_id, prod.producto_id)
+            for s in detalle:
+                producto_id = precios.get(s['precio_id'], 'producto_id')
+                s['producto_id'] = (producto_id if producto_id is not None
+                                    else producciones.get(s['produccion_id'], 'producto_id'))
+            productos.load(conn, (s['producto_id'] for s in detalle))
+            
+            rows = []
+            for venta in ventas:
+                orden = ordenes.get(venta['orden_pedido_id'])
+                if orden is None:
+                    continue
+                for s in salidas.get(orden['id'], ()):
+                    row = dict(venta)
+                    row['op_vendedor_id'] = orden['vendedor_id']
+                    row['municipio_id'] = clientes.get(venta['cliente_id'], 'municipio_id')
+                    row['salida_id'] = s['id']
+                    row['cantidad'] = s['cantidad']
+                    row['precio_unitario'] = s['precio_unitario']
+                    row['venta_exenta'] = s['venta_exenta']
+                    row['venta_gravada'] = s['venta_gravada']
+                    row['producto_id'] = s['producto_id']
+                    row['costo_producto'] = productos.get(s['producto_id'], 'costo')
+                    rows.append(row)
+            if rows:
+                yield rows
+    finally:
+        ventas_db.close()
+        lookup_db.close()
+
+
+def parse_posicion(value: str) -> tuple:
+    """Convertir 'YYYY-MM-DD,venta_id,salida_id' en una posición de KeysetPaginator"""
+    fecha, venta_id, salida_id = value.split(',')
+    return safe_date(fecha.strip()), int(venta_id), int(salida_id)
+
+
+def get_source_date_range(source_db: SourceDatabase) -> tuple:
+    """Obtener la primera y última fecha de ventas en MariaDB"""
+    conn = source_db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(fecha) AS fecha_min, MAX(fecha) AS fecha_max FROM ventas")
+    row = cursor.fetchone()
+    cursor.close()
+    return row['fecha_min'], row['fecha_max']
+
+
+def get_dimension_keys(target_cursor, as_of: bool = False):
+    """
+    Obtener mappings de IDs a keys de las dimensiones
+    
+    Args:
+        target_cursor: Cursor pyodbc destino
+        as_of: Si True, cliente/producto/vendedor se resuelven con la versión
+            vigente en la fecha de la venta en lugar de la actual
+    """
+    
+    log_step(f"Cargando mapeos de dimensiones{' (versiones SCD2 por fecha)' if as_of else ''}...")
     
     # dim_tiempo: fecha -> tiempo_key
     target_cursor.execute("SELECT tiempo_key, fecha FROM dbo.dim_tiempo")
     dim_tiempo = {row[1]: row[0] for row in target_cursor.fetchall()}
     
-    # dim_cliente: cliente_id -> cliente_key (solo registros actuales)
-    target_cursor.execute("SELECT cliente_key, cliente_id FROM dbo.dim_cliente WHERE es_actual = 1")
-    dim_cliente = {row[1]: row[0] for row in target_cursor.fetchall()}
+    # dim_cliente: cliente_id -> cliente_key
+    dim_cliente = get_scd_keys(target_cursor, 'dim_cliente', 'cliente_id', 'cliente_key', as_of)
     
-    # dim_producto: producto_id -> producto_key (solo registros actuales)
-    target_cursor.execute("SELECT producto_key, producto_id FROM dbo.dim_producto WHERE es_actual = 1")
-    dim_producto = {row[1]: row[0] for row in target_cursor.fetchall()}
+    # dim_producto: producto_id -> producto_key
+    dim_producto = get_scd_keys(target_cursor, 'dim_producto', 'producto_id', 'producto_key', as_of)
     
-    # dim_vendedor: vendedor_id -> vendedor_key (solo registros actuales)
-    target_cursor.execute("SELECT vendedor_key, vendedor_id FROM dbo.dim_vendedor WHERE es_actual = 1")
-    dim_vendedor = {row[1]: row[0] for row in target_cursor.fetchall()}
+    # dim_vendedor: vendedor_id -> vendedor_key
+    dim_vendedor = get_scd_keys(target_cursor, 'dim_vendedor', 'vendedor_id', 'vendedor_key', as_of)
     
     # dim_tipo_documento: tipo_documento_id -> tipo_documento_key
     target_cursor.execute("SELECT tipo_documento_key, tipo_documento_id FROM dbo.dim_tipo_documento")
@@ -65,7 +458,613 @@ def get_dimension_keys(target_cursor):
     }
 
 
-def load_fact_ventas(fecha_inicio: str = None, fecha_fin: str = None, truncate: bool = False) -> bool:
+def transform_venta(row: dict, dim_keys: dict) -> Optional[tuple]:
+    """
+    Transformar una línea de venta extraída en los parámetros de fact_ventas
+    (en el orden de FACT_VENTAS_COLUMNS)
+    
+    Args:
+        row: Registro extraído de MariaDB (venta + salida)
+        dim_keys: Mapeos de dimensiones (ver get_dimension_keys)
+    
+    Returns:
+        Tupla de parámetros o None si falta una key obligatoria
+    """
+    # Obtener keys de dimensiones
+    fecha_venta = row['fecha_venta']
+    tiempo_key = dim_keys['tiempo'].get(fecha_venta)
+    cliente_key = scd_key(dim_keys['cliente'], row['cliente_id'], fecha_venta)
+    producto_key = scd_key(dim_keys['producto'], row['producto_id'], fecha_venta)
+    
+    # Vendedor: primero de orden_pedido, luego de venta
+    vendedor_id = row.get('op_vendedor_id') or row.get('vendedor_id')
+    vendedor_key = scd_key(dim_keys['vendedor'], vendedor_id, fecha_venta) if vendedor_id else None
+    
+    # Ubicacion desde municipio del cliente
+    municipio_id = row.get('municipio_id')
+    ubicacion_key = dim_keys['ubicacion'].get(municipio_id) if municipio_id else None
+    
+    tipo_documento_key = dim_keys['tipo_documento'].get(row['tipo_documento_id'])
+    condicion_pago_key = dim_keys['condicion_pago'].get(row['condicion_pago_id'])
+    estado_venta_key = dim_keys['estado_venta'].get(row['estado_venta_id'])
+    
+    # Validar keys obligatorias
+    if not all([tiempo_key, cliente_key, producto_key, tipo_documento_key, estado_venta_key]):
+        return None
+    
+    # Calcular métricas según tu análisis
+    cantidad = float(row['cantidad'] or 0)
+    precio_unitario = float(row['precio_unitario'] or 0)
+    venta_exenta = float(row['venta_exenta'] or 0)
+    venta_gravada = float(row['venta_gravada'] or 0)
+    
+    # Según tu documentación:
+    # venta_total = venta_gravada + venta_exenta
+    # iva = venta_gravada * 0.13
+    venta_total = venta_gravada + venta_exenta
+    iva = venta_gravada * 0.13
+    venta_total_con_impuestos = venta_total + iva
+    
+    # Calcular costo y margen
+    costo_unitario = float(row.get('costo_producto') or 0)
+    costo_total = cantidad * costo_unitario
+    margen_bruto = venta_total - costo_total
+    porcentaje_margen = (margen_bruto / venta_total * 100) if venta_total > 0 else 0.0
+    
+    # Estados de la venta
+    esta_liquidado = 1 if row['fecha_liquidado'] else 0
+    esta_anulado = 1 if row['fecha_anulado'] else 0
+    es_venta_credito = 1 if row['condicion_pago_id'] and row['condicion_pago_id'] != 1 else 0
+    
+    return (
+        tiempo_key, cliente_key, producto_key, vendedor_key, ubicacion_key,
+        tipo_documento_key, condicion_pago_key, estado_venta_key,
+        row['venta_id'], row['salida_id'], row['orden_pedido_id'], row['numero_venta'],
+        cantidad, precio_unitario, venta_exenta, venta_gravada,
+        venta_total, iva, venta_total_con_impuestos,
+        costo_unitario, costo_total, margen_bruto, porcentaje_margen,
+        es_venta_credito, esta_liquidado, esta_anulado,
+        fecha_venta, row['fecha_liquidado'], row['fecha_anulado']
+    )
+
+
+def dimensiones_faltantes(row: dict, dim_keys: dict) -> list:
+    """
+    Obtener las dimensiones obligatorias sin key para una línea de venta
+    (mismo criterio que transform_venta)
+    """
+    fecha_venta = row['fecha_venta']
+    keys = {
+        'tiempo': dim_keys['tiempo'].get(fecha_venta),
+        'cliente': scd_key(dim_keys['cliente'], row['cliente_id'], fecha_venta),
+        'producto': scd_key(dim_keys['producto'], row['producto_id'], fecha_venta),
+        'tipo_documento': dim_keys['tipo_documento'].get(row['tipo_documento_id']),
+        'estado_venta': dim_keys['estado_venta'].get(row['estado_venta_id']),
+    }
+    return [dimension for dimension, key in keys.items() if not key]
+
+
+def quarantine_row(stats: dict, row: dict, dim_keys: dict, error: Exception = None):
+    """Enviar una línea rechazada en la transformación a la cuarentena (si está activa)"""
+    rechazos = stats.get('rechazos')
+    if rechazos is None:
+        return
+    if error is None:
+        rechazos.add(row, 'transformacion', FALTA_DIMENSION, dimensiones_faltantes(row, dim_keys))
+    else:
+        rechazos.add(row, 'transformacion', ERROR_TRANSFORMACION, error=error)
+
+
+def transform_ventas(rows: list, dim_keys: dict, stats: dict) -> list:
+    """
+    Transformar un bloque de filas extraídas
+    
+    Args:
+        rows: Bloque de registros extraídos de MariaDB
+        dim_keys: Mapeos de dimensiones (ver get_dimension_keys)
+        stats: Contadores de la carga ('extraidos', 'omitidos', 'errores'), se actualizan aquí;
+            si trae 'rechazos' (Quarantine) las líneas omitidas se guardan en cuarentena
+    
+    Returns:
+        Lista de tuplas de parámetros (orden de FACT_VENTAS_COLUMNS)
+    """
+    batch = []
+    for row in rows:
+        stats['extraidos'] += 1
+        exception = None
+        try:
+            params = transform_venta(row, dim_keys)
+        except Exception as e:
+            params = None
+            exception = e
+            error = f"Venta {row['venta_id']}: {str(e)}"
+        else:
+            error = f"Venta {row['venta_id']}, Salida {row['salida_id']}: Falta key de dimensión"
+        
+        if params is None:
+            stats['omitidos'] += 1
+            quarantine_row(stats, row, dim_keys, exception)
+            if len(stats['errores']) < 5:
+                stats['errores'].append(error)
+            continue
+        
+        batch.append(params)
+    return batch
+
+
+def transform_ventas_vectorized(rows: list, dim_keys: dict, stats: dict) -> list:
+    """
+    Versión columnar de transform_ventas (mismo resultado, sin bucle por fila)
+    
+    Las keys se resuelven con factorize + mapeo por valor distinto, las
+    métricas se calculan con NumPy y la máscara de keys obligatorias
+    faltantes se arma en una sola pasada. Si el bloque trae datos que no se
+    pueden convertir, se procesa con transform_ventas para aislar las filas.
+    
+    Args:
+        rows: Bloque de registros extraídos de MariaDB
+        dim_keys: Mapeos de dimensiones (ver get_dimension_keys)
+        stats: Contadores de la carga ('extraidos', 'omitidos', 'errores'), se actualizan aquí
+    
+    Returns:
+        Lista de tuplas de parámetros (orden de FACT_VENTAS_COLUMNS)
+    """
+    if not rows:
+        return []
+    
+    try:
+        df = rows_to_frame(rows)
+        
+        # Obtener keys de dimensiones
+        tiempo_key = map_keys(df['fecha_venta'], dim_keys['tiempo'])
+        # Con --as-of la fecha de venta se convierte una sola vez para las tres dimensiones SCD2
+        dias = to_days(df['fecha_venta']) if isinstance(dim_keys['cliente'], AsOfKeys) else None
+        cliente_key = map_scd_keys(df['cliente_id'], df['fecha_venta'], dim_keys['cliente'], dias)
+        producto_key = map_scd_keys(df['producto_id'], df['fecha_venta'], dim_keys['producto'], dias)
+        
+        # Vendedor: primero de orden_pedido, luego de venta
+        op_vendedor_id = df['op_vendedor_id'].to_numpy()
+        vendedor_id = np.where(truthy_mask(op_vendedor_id), op_vendedor_id, df['vendedor_id'].to_numpy())
+        vendedor_key = map_scd_keys(vendedor_id, df['fecha_venta'], dim_keys['vendedor'], dias)
+        vendedor_key[~truthy_mask(vendedor_id)] = np.nan
+        
+        # Ubicacion desde municipio del cliente
+        ubicacion_key = map_keys(df['municipio_id'], dim_keys['ubicacion'])
+        ubicacion_key[~truthy_mask(df['municipio_id'])] = np.nan
+        
+        tipo_documento_key = map_keys(df['tipo_documento_id'], dim_keys['tipo_documento'])
+        condicion_pago_key = map_keys(df['condicion_pago_id'], dim_keys['condicion_pago'])
+        estado_venta_key = map_keys(df['estado_venta_id'], dim_keys['estado_venta'])
+        
+        # Keys obligatorias faltantes (mismo criterio que all([...]): nula o cero)
+        missing = np.zeros(len(df), dtype=bool)
+        for keys in (tiempo_key, cliente_key, producto_key, tipo_documento_key, estado_venta_key):
+            missing |= np.isnan(keys) | (keys == 0)
+        
+        # Métricas
+        cantidad = to_float(df['cantidad'])
+        precio_unitario = to_float(df['precio_unitario'])
+        venta_exenta = to_float(df['venta_exenta'])
+        venta_gravada = to_float(df['venta_gravada'])
+        
+        venta_total = venta_gravada + venta_exenta
+        iva = venta_gravada * 0.13
+        venta_total_con_impuestos = venta_total + iva
+        
+        costo_unitario = to_float(df['costo_producto'])
+        costo_total = cantidad * costo_unitario
+        margen_bruto = venta_total - costo_total
+        with np.errstate(divide='ignore', invalid='ignore'):
+            porcentaje_margen = np.where(venta_total > 0, margen_bruto / venta_total * 100, 0.0)
+        
+        # Estados de la venta
+        esta_liquidado = truthy_mask(df['fecha_liquidado']).astype(np.int64)
+        esta_anulado = truthy_mask(df['fecha_anulado']).astype(np.int64)
+        es_venta_credito = (truthy_mask(df['condicion_pago_id']) &
+                            (df['condicion_pago_id'] != 1).to_numpy(dtype=bool)).astype(np.int64)
+    except Exception:
+        return transform_ventas(rows, dim_keys, stats)
+    
+    stats['extraidos'] += len(df)
+    skipped = np.flatnonzero(missing)
+    stats['omitidos'] += len(skipped)
+    for i in skipped[:max(0, 5 - len(stats['errores']))]:
+        stats['errores'].append(f"Venta {rows[i]['venta_id']}, Salida {rows[i]['salida_id']}: "
+                                f"Falta key de dimensión")
+    for i in skipped:
+        quarantine_row(stats, rows[i], dim_keys)
+    
+    valid = ~missing
+    
+    def passthrough(column):
+        return df[column].to_numpy()[valid].tolist()
+    
+    columns = [
+        to_sql_list(tiempo_key[valid], as_int=True),
+        to_sql_list(cliente_key[valid], as_int=True),
+        to_sql_list(producto_key[valid], as_int=True),
+        to_sql_list(vendedor_key[valid], as_int=True),
+        to_sql_list(ubicacion_key[valid], as_int=True),
+        to_sql_list(tipo_documento_key[valid], as_int=True),
+        to_sql_list(condicion_pago_key[valid], as_int=True),
+        to_sql_list(estado_venta_key[valid], as_int=True),
+        passthrough('venta_id'),
+        passthrough('salida_id'),
+        passthrough('orden_pedido_id'),
+        passthrough('numero_venta'),
+        cantidad[valid].tolist(),
+        precio_unitario[valid].tolist(),
+        venta_exenta[valid].tolist(),
+        venta_gravada[valid].tolist(),
+        venta_total[valid].tolist(),
+        iva[valid].tolist(),
+        venta_total_con_impuestos[valid].tolist(),
+        costo_unitario[valid].tolist(),
+        costo_total[valid].tolist(),
+        margen_bruto[valid].tolist(),
+        porcentaje_margen[valid].tolist(),
+        es_venta_credito[valid].tolist(),
+        esta_liquidado[valid].tolist(),
+        esta_anulado[valid].tolist(),
+        passthrough('fecha_venta'),
+        passthrough('fecha_liquidado'),
+        passthrough('fecha_anulado'),
+    ]
+    return list(zip(*columns))
+
+
+class LoadOptions:
+    """
+    Modos de una carga de fact_ventas, resueltos una sola vez
+
+    Precedencia (cada nivel anula lo que contradice a los siguientes):
+        1. dry_run: no escribe nada en el DW (sin truncate, miembros
+           inferidos, cuarentena, checkpoints ni marca de agua)
+        2. reprocess: solo las ventas pendientes en la cuarentena, leídas
+           por id y aplicadas con merge (sin truncate, incremental, keyset,
+           shards ni hash join)
+        3. incremental / merge: incremental implica merge
+        4. columnstore / insert_mode: cómo se escriben los lotes
+
+    resume toma los filtros y modos de la ejecución interrumpida
+    (apply_run) y descarta reprocess.
+    """
+
+    def __init__(self, fecha_inicio: str = None, fecha_fin: str = None, truncate: bool = False,
+                 insert_mode: Optional[str] = None, batch_size: int = None, pipeline: bool = False,
+                 shards: int = 1, vectorized: bool = False, merge: bool = False,
+                 incremental: bool = False, as_of: bool = False,
+                 infer_members: Optional[bool] = None, quarantine: Optional[bool] = None,
+                 reprocess: bool = False, keyset: bool = False,
+                 posicion: Optional[tuple] = None, resume: bool = False,
+                 benchmark: bool = False, benchmark_path: Optional[str] = None,
+                 dry_run: bool = False, hash_join: bool = False, columnstore: bool = False):
+        """
+        Args: los de load_fact_ventas
+
+        Raises:
+            ValueError: Si el modo de inserción pedido no se puede usar (resolve_insert_mode)
+        """
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin
+        self.truncate = truncate
+        self.insert_mode_pedido = insert_mode
+        self.batch_size = batch_size or get_setting('etl', 'batch_size', 1000)
+        self.pipeline = pipeline
+        self.shards = shards
+        self.vectorized = vectorized
+        self.merge = merge
+        self.incremental = incremental
+        self.as_of = as_of
+        self.infer_members = get_setting('etl', 'infer_members', False) if infer_members is None else infer_members
+        self.quarantine = get_setting('etl', 'quarantine_rejects', False) if quarantine is None else quarantine
+        self.reprocess = reprocess and not resume
+        self.keyset = keyset
+        self.posicion = posicion
+        self.resume = resume
+        self.benchmark = benchmark
+        self.benchmark_path = benchmark_path
+        self.dry_run = dry_run
+        self.hash_join = hash_join
+        self.columnstore = columnstore
+        self._resolve()
+
+    def _resolve(self):
+        """Aplicar la precedencia de los modos"""
+        if self.dry_run:
+            # Las llaves desconocidas se cuentan como omitidas en lugar de crear miembros
+            self.truncate = self.infer_members = self.quarantine = False
+        if self.reprocess:
+            # Las ventas pueden estar cargadas en parte: se aplica con MERGE
+            self.merge = True
+            self.truncate = self.incremental = self.keyset = self.hash_join = False
+            self.shards = 1
+            self.posicion = None
+            self.quarantine = not self.dry_run
+        if self.incremental:
+            # La ventana de lookback vuelve a leer filas ya cargadas
+            self.merge = True
+        # Las recargas completas usan la vía masiva si el servidor ve los archivos
+        self.insert_mode = ((self.insert_mode_pedido or 'batch') if self.dry_run
+                            else resolve_insert_mode(self.insert_mode_pedido, self.truncate))
+
+    def apply_run(self, run: dict):
+        """Retomar una ejecución de dbo.etl_checkpoints: mismos filtros, desde su última fila confirmada"""
+        parametros = run['parametros']
+        self.fecha_inicio = parametros.get('fecha_inicio')
+        self.fecha_fin = parametros.get('fecha_fin')
+        self.merge = parametros.get('merge', False)
+        self.incremental = parametros.get('incremental', False)
+        self.as_of = parametros.get('as_of', False)
+        self.truncate = False
+        self.keyset = True
+        self.shards = 1
+        self.posicion = run['posicion']
+        self._resolve()
+
+    @property
+    def titulo(self) -> str:
+        """Título de la carga en el log"""
+        if self.resume:
+            return "Reanudación de carga de fact_ventas"
+        if self.reprocess:
+            return "Reproceso de rechazos de fact_ventas"
+        if self.incremental:
+            return "Carga INCREMENTAL de fact_ventas"
+        if self.fecha_inicio:
+            return f"Carga de fact_ventas (desde {self.fecha_inicio} hasta {self.fecha_fin or 'hoy'})"
+        return "Carga COMPLETA de fact_ventas"
+
+    @property
+    def extraccion(self) -> str:
+        """Forma de extraer: reproceso > keyset > shards > hash_join > streaming"""
+        if self.reprocess:
+            return 'reproceso'
+        if self.keyset:
+            return 'keyset'
+        if self.shards > 1:
+            return 'shards'
+        if self.hash_join:
+            return 'hash_join'
+        return 'streaming'
+
+    @property
+    def checkpoints(self) -> bool:
+        """Checkpoints por lote: solo con extracción en el orden de la llave (v.fecha, v.id, s.id)"""
+        return not (self.reprocess or self.dry_run) and self.shards <= 1
+
+    @property
+    def modo(self) -> str:
+        """Modo de escritura (log y benchmark)"""
+        if self.dry_run:
+            return 'dry-run'
+        if self.insert_mode == 'bulk':
+            return 'bulk'
+        if self.columnstore:
+            return 'columnstore'
+        return 'merge' if self.merge else self.insert_mode
+
+
+def resolve_filters(target_conn, source_db: SourceDatabase, opciones: LoadOptions,
+                    run: Optional[dict] = None) -> tuple:
+    """
+    Filtros de extracción según la marca de agua de dbo.etl_control
+
+    Con incremental, extrae desde la última fecha menos etl.lookback_days, las
+    ventas con id posterior a la marca y las modificadas desde su updated_at;
+    al retomar una ejecución usa los filtros que calculó la original.
+
+    Returns:
+        Tupla (filtros, watermark): diccionario con fecha_inicio, fecha_fin,
+        desde_id, desde_updated_at y con_updated_at, y la marca de agua previa
+    """
+    filtros = {'fecha_inicio': opciones.fecha_inicio, 'fecha_fin': opciones.fecha_fin,
+               'desde_id': None, 'desde_updated_at': None, 'con_updated_at': False}
+    if not opciones.incremental:
+        return filtros, None
+    filtros['con_updated_at'] = source_db.has_column('ventas', 'updated_at')
+    log_step("Leyendo marca de agua de dbo.etl_control...")
+    watermark = get_watermark(target_conn, PROCESO)
+    if run is not None:
+        # Los filtros ya se calcularon en la ejecución original
+        filtros['desde_id'] = run['parametros'].get('desde_id')
+        desde_updated_at = run['parametros'].get('desde_updated_at')
+        if desde_updated_at:
+            filtros['desde_updated_at'] = datetime.fromisoformat(desde_updated_at)
+    elif watermark is None:
+        log_step("Sin marca de agua previa: se cargará todo el historial")
+    elif not opciones.fecha_inicio:
+        dias = get_setting('etl', 'lookback_days', 7)
+        filtros['fecha_inicio'] = lookback(watermark['ultima_fecha'], dias)
+        filtros['desde_id'] = watermark['ultimo_id']
+        if filtros['con_updated_at']:
+            filtros['desde_updated_at'] = lookback(watermark['ultimo_updated_at'], dias)
+        log_success(f"Marca de agua: venta_id {watermark['ultimo_id']}, fecha {watermark['ultima_fecha']}, "
+                    f"updated_at {watermark['ultimo_updated_at']} (lookback {dias} días)")
+        log_step(f"Extrayendo ventas desde {filtros['fecha_inicio']}, id > {filtros['desde_id']}"
+                 + (f" o modificadas desde {filtros['desde_updated_at']}" if filtros['desde_updated_at'] else ""))
+    return filtros, watermark
+
+
+def extract_chunks(source_db: SourceDatabase, opciones: LoadOptions, filtros: dict,
+                   venta_ids: Optional[list] = None) -> tuple:
+    """
+    Extraer las ventas por bloques según opciones.extraccion
+
+    Args:
+        source_db: Conexión origen
+        opciones: Opciones de la carga
+        filtros: Filtros de resolve_filters (los shards completan el rango de fechas)
+        venta_ids: Ventas a leer por id (reproceso)
+
+    Returns:
+        Tupla (bloques, paginador keyset o None)
+    """
+    batch_size = opciones.batch_size
+    desde = (filtros['desde_id'], filtros['desde_updated_at'], filtros['con_updated_at'])
+    extraccion = opciones.extraccion
+
+    if extraccion == 'reproceso':
+        def reprocess_chunks():
+            for i in range(0, len(venta_ids), VENTAS_POR_QUERY):
+                query = build_ventas_query(venta_ids=venta_ids[i:i + VENTAS_POR_QUERY])
+                yield from source_db.stream_query(*query, chunk_size=batch_size)
+
+        return reprocess_chunks(), None
+
+    if extraccion == 'keyset':
+        # Páginas independientes: un corte de conexión solo repite la página actual
+        query, params = build_ventas_query(filtros['fecha_inicio'], filtros['fecha_fin'], *desde, ordenar=False)
+        paginator = KeysetPaginator(query, params, KEYSET_EXPRS, KEYSET_COLUMNS,
+                                    page_size=batch_size, position=opciones.posicion,
+                                    max_retries=get_setting('etl', 'max_retries', 3),
+                                    retry_delay=get_setting('etl', 'retry_delay_seconds', 5))
+        log_step(f"Extracción por páginas de {batch_size} filas"
+                 + (f" desde la posición {opciones.posicion}" if opciones.posicion else ""))
+        return paginator.pages(), paginator
+
+    if extraccion == 'shards':
+        # Extracción paralela por tramos de fechas, cada uno en su propia conexión
+        if not (filtros['fecha_inicio'] and filtros['fecha_fin']):
+            rango_inicio, rango_fin = get_source_date_range(source_db)
+            filtros['fecha_inicio'] = filtros['fecha_inicio'] or rango_inicio
+            filtros['fecha_fin'] = filtros['fecha_fin'] or rango_fin
+        tramos = []
+        if filtros['fecha_inicio'] and filtros['fecha_fin']:
+            tramos = split_date_range(safe_date(filtros['fecha_inicio']), safe_date(filtros['fecha_fin']),
+                                      opciones.shards)
+        partitions = [build_ventas_query(inicio, fin, con_updated_at=filtros['con_updated_at'])
+                      for inicio, fin in tramos]
+        if tramos and (filtros['desde_id'] is not None or filtros['desde_updated_at'] is not None):
+            # Ventas anteriores a la ventana pero nuevas o modificadas según la marca de agua
+            partitions.append(build_ventas_query(None, tramos[0][0] - timedelta(days=1), *desde))
+        workers = min(len(partitions), get_setting('etl', 'parallel_processes', 4))
+        log_step(f"Extracción paralela: {len(partitions)} tramos de fechas con {workers} conexiones "
+                 f"(snapshot consistente)")
+        chunks = []
+        if partitions:
+            chunks = stream_partitions(partitions, chunk_size=batch_size, workers=workers,
+                                       sync_lock=get_setting('etl', 'snapshot_sync_lock', False))
+        return chunks, None
+
+    if extraccion == 'hash_join':
+        # Solo recorridos por rango y lecturas por id en el origen; los joins se hacen aquí
+        log_step("Extracción con joins del lado del cliente (ventas por rango + lecturas por id)")
+        chunks = extract_ventas_hash_join(*build_ventas_scan_query(filtros['fecha_inicio'], filtros['fecha_fin'],
+                                                                   *desde),
+                                          chunk_size=batch_size,
+                                          sync_lock=get_setting('etl', 'snapshot_sync_lock', False))
+        return chunks, None
+
+    query = build_ventas_query(filtros['fecha_inicio'], filtros['fecha_fin'], *desde)
+    return source_db.stream_query(*query, chunk_size=batch_size), None
+
+
+def create_ventas_writer(target_conn, opciones: LoadOptions, on_error: Optional[Callable] = None):
+    """
+    Crear el escritor de fact_ventas según opciones.modo
+
+    Misma selección que el motor genérico (create_staged_writer), con las
+    sentencias de fact_ventas (reemplazo de líneas sin salida_id, ver
+    SENTENCIAS_FACT_VENTAS); en dry-run solo cuenta filas y lotes.
+    """
+    if opciones.dry_run:
+        return NullWriter(opciones.batch_size)
+    writer = create_staged_writer(target_conn, 'dbo.stg_fact_ventas', SENTENCIAS_FACT_VENTAS,
+                                  opciones.insert_mode, opciones.merge, opciones.columnstore,
+                                  opciones.batch_size, on_error)
+    if opciones.insert_mode == 'bulk':
+        log_step(f"Carga masiva: archivos de {writer.batch_size} filas en {writer.directory} + "
+                 f"BULK INSERT (servidor: {writer.server_directory})")
+    elif opciones.columnstore:
+        log_step(f"Carga columnstore: rowgroups de {writer.batch_size} filas")
+    if get_setting('performance', 'typed_parameters', True):
+        # Tipos de 02/05_*.sql: DECIMAL(p,s) como Decimal redondeado, sin inferir tipos por fila
+        tabla_parametros = 'dbo.stg_fact_ventas' if isinstance(writer, MergeWriter) else 'dbo.fact_ventas'
+        writer.parameter_types = TypedParameters(tabla_parametros, FACT_VENTAS_COLUMNS)
+    return writer
+
+
+def report_rowgroups(target_conn, rowgroups_antes: list) -> dict:
+    """
+    Reportar la calidad de los rowgroups creados o modificados por la carga
+
+    Returns:
+        Resumen de rowgroup_summary con la lista de problemas (rowgroup_problems)
+    """
+    rowgroups_despues = get_rowgroups(target_conn, 'dbo.fact_ventas')
+    creados = new_rowgroups(rowgroups_antes, rowgroups_despues)
+    calidad = rowgroup_summary(creados)
+    log_step(f"Rowgroups de esta carga: {calidad['rowgroups']} "
+             f"({', '.join(f'{n} {estado}' for estado, n in calidad['por_estado'].items()) or 'ninguno'}), "
+             f"promedio {calidad['promedio_filas_comprimido']} filas por rowgroup comprimido, "
+             f"{calidad['filas_delta_store']} filas en delta store")
+    for rg in creados[:20]:
+        log_step(f"  - Rowgroup {rg['row_group_id']}: {rg['estado']}, {rg['filas']} filas"
+                 + (f", recorte {rg['motivo_recorte']}" if rg['motivo_recorte'] not in (None, 'NO_TRIM') else ""))
+    if len(creados) > 20:
+        log_step(f"  ... y {len(creados) - 20} rowgroups más")
+    problemas = rowgroup_problems(rowgroups_antes, rowgroups_despues)
+    calidad['problemas'] = problemas
+    if problemas:
+        log_warning(f"{len(problemas)} rowgroups de esta carga no quedaron comprimidos completos")
+        for problema in problemas[:20]:
+            log_step(f"  - {problema}")
+    elif creados:
+        log_success("Rowgroups de esta carga: todos COMPRESSED sin recorte (salvo el último)")
+    return calidad
+
+
+def log_load_summary(opciones: LoadOptions, writer, stats: dict, elapsed: float, paginator=None,
+                     inferidos: Optional[InferredMembers] = None, rechazos: Optional[Quarantine] = None,
+                     etl_pipeline: Optional[Pipeline] = None):
+    """Resumen de una carga con datos: filas escritas, velocidad, extracción y omitidos"""
+    insert_count = writer.rows_written
+    if opciones.dry_run:
+        log_success(f"Dry-run: {insert_count} registros transformados, nada escrito en el DW")
+    elif opciones.merge:
+        log_success(f"Aplicados vía MERGE: {insert_count} registros ({writer.rows_merged} insertados o actualizados)")
+    else:
+        log_success(f"Insertados: {insert_count} registros")
+    if not opciones.dry_run:
+        log_step(f"Escritura: {writer.elapsed:.2f}s, {writer.rows_per_second:,.0f} filas/s "
+                 f"({writer.batches} commits) | Total transformación+carga: {elapsed:.2f}s")
+    if paginator:
+        log_step(f"Keyset: {paginator.pages_read} páginas, {paginator.reconnects} reconexiones, "
+                 f"última posición {','.join(str(v) for v in paginator.position or ())}")
+    if inferidos and inferidos.total:
+        creados = ', '.join(f"{n} {dimension}" for dimension, n in inferidos.creados.items() if n)
+        log_step(f"Miembros inferidos creados: {creados} (se completan en la próxima carga de dimensiones)")
+    if etl_pipeline:
+        busy = etl_pipeline.busy
+        log_step(f"Pipeline: extracción {busy['extraccion']:.2f}s, transformación {busy['transformacion']:.2f}s, "
+                 f"escritura {busy['escritura']:.2f}s (tiempo real {etl_pipeline.elapsed:.2f}s)")
+
+    skip_count = stats['omitidos'] + writer.rows_failed
+    errors = stats['errores']
+    if skip_count > 0:
+        log_step(f"Omitidos: {skip_count} registros (sin keys o errores)")
+        if rechazos:
+            log_step(f"Resumen de rechazos por motivo (dbo.{TABLA_RECHAZOS}):")
+            for line in rechazos.summary_lines():
+                log_step(f"  - {line}")
+        if errors:
+            for error in errors[:5]:
+                log_step(f"  - {error}")
+            if len(errors) > 5:
+                log_step(f"  ... y {len(errors)-5} errores más")
+
+
+def load_fact_ventas(fecha_inicio: str = None, fecha_fin: str = None, truncate: bool = False,
+                     insert_mode: Optional[str] = None, batch_size: int = None, pipeline: bool = False,
+                     shards: int = 1, vectorized: bool = False, merge: bool = False,
+                     incremental: bool = False, as_of: bool = False,
+                     infer_members: Optional[bool] = None, quarantine: Optional[bool] = None,
+                     reprocess: bool = False, keyset: bool = False,
+                     posicion: Optional[tuple] = None, resume: bool = False,
+                     benchmark: bool = False, benchmark_path: Optional[str] = None,
+                     dry_run: bool = False, hash_join: bool = False,
+                     columnstore: bool = False) -> bool:
     """
     Carga fact_ventas desde MariaDB
     
@@ -73,13 +1072,73 @@ def load_fact_ventas(fecha_inicio: str = None, fecha_fin: str = None, truncate:
         fecha_inicio: Fecha inicial (YYYY-MM-DD), si es None carga todo
         fecha_fin: Fecha final (YYYY-MM-DD), si es None usa fecha actual
         truncate: Si True, limpia la tabla antes de cargar
+        insert_mode: 'batch' (executemany por lotes), 'row' (un INSERT por fila) o
+            'bulk' (archivos + BULK INSERT); por defecto 'bulk' si se recarga con
+            truncate, performance.use_bulk_insert está activo y hay
+            performance.bulk_insert_server_directory, si no 'batch'
+        batch_size: Filas por lote, por defecto etl.batch_size de config.yaml
+        pipeline: Si True, extrae, transforma y escribe en hilos paralelos
+        shards: Si es mayor que 1, divide el rango de fechas en ese número de tramos
+            y los extrae en paralelo (hasta etl.parallel_processes conexiones)
+        vectorized: Si True, transforma cada bloque en forma columnar con NumPy
+        merge: Si True, carga cada lote en stg_fact_ventas y lo aplica con MERGE
+            (inserta o actualiza por venta_id + salida_id), sin duplicar al recargar
+        incremental: Si True, extrae solo lo posterior a la marca de agua de
+            dbo.etl_control (menos etl.lookback_days) y la actualiza al terminar;
+            implica merge
+        as_of: Si True, asigna a cada venta la versión de cliente/producto/vendedor
+            vigente en fecha_venta (SCD2) en lugar de la versión actual
+        infer_members: Si True, crea miembros inferidos para clientes, productos y
+            tipos de documento que aún no existen en el DW en lugar de omitir la
+            venta; por defecto etl.infer_members de config.yaml
+        quarantine: Si True, guarda cada línea omitida en dbo.etl_rechazos_fact_ventas
+            con su motivo; por defecto etl.quarantine_rejects de config.yaml
+        reprocess: Si True, extrae solo las ventas pendientes en la cuarentena,
+            las carga vía merge y marca sus rechazos como reprocesados
+        keyset: Si True, extrae por páginas de batch_size filas con
+            WHERE (v.fecha, v.id, s.id) > (posición) LIMIT n, reconectando ante
+            cortes de conexión (hasta etl.max_retries)
+        posicion: Posición (fecha_venta, venta_id, salida_id) desde la que
+            continuar la extracción keyset (excluida)
+        resume: Si True, retoma la última ejecución sin completar de
+            dbo.etl_checkpoints con sus mismos filtros, desde la última fila
+            confirmada (extracción keyset, sin truncate)
+        benchmark: Si True, estima los bytes extraídos y guarda un reporte JSON
+            con tiempo, filas y filas/s de cada fase (dimensiones, extracción,
+            transformación, escritura)
+        benchmark_path: Archivo del reporte (por defecto logs/benchmark_fact_ventas_<fecha>.json)
+        dry_run: Si True, extrae y transforma sin escribir nada en el DW (sin
+            truncate, miembros inferidos, cuarentena, checkpoints ni marca de agua)
+        hash_join: Si True, MariaDB solo recorre ventas por rango y las demás
+            tablas se leen por id y se unen en Python (extract_ventas_hash_join);
+            no aplica con reproceso, keyset ni shards
+        columnstore: Si True, acumula lotes de al menos 102,400 filas
+            (performance.columnstore_batch_size) en stg_fact_ventas y los aplica
+            con un INSERT ... SELECT WITH (TABLOCK), que sobre el columnstore
+            agrupado comprime directo a rowgroups; al terminar reporta el
+            estado de los rowgroups y los que no quedaron comprimidos completos
+    
+    Los modos se combinan con la precedencia de LoadOptions: dry_run >
+    reprocess > incremental/merge > columnstore/insert_mode. Las cargas con
+    extracción ordenada (sin shards ni reproceso) guardan en
+    dbo.etl_checkpoints, en la misma transacción de cada lote, la posición de
+    su última fila.
     """
     log = get_logger("fact_ventas")
+    try:
+        opciones = LoadOptions(fecha_inicio, fecha_fin, truncate, insert_mode, batch_size, pipeline, shards,
+                               vectorized, merge, incremental, as_of, infer_members, quarantine, reprocess,
+                               keyset, posicion, resume, benchmark, benchmark_path, dry_run, hash_join,
+                               columnstore)
+    except ValueError as e:
+        log_error("Opciones de carga no válidas", e)
+        return False
+    log_etl_start(opciones.titulo)
     
-    if fecha_inicio:
-        log_etl_start(f"Carga de fact_ventas (desde {fecha_inicio} hasta {fecha_fin or 'hoy'})")
-    else:
-        log_etl_start("Carga COMPLETA de fact_ventas")
+    ejecucion_id = new_run_id()
+    checkpoints = False
+    run = None
+    bench = Benchmark(PROCESO, count_bytes=opciones.benchmark)
     
     try:
         # PASO 1: Obtener mapeos de dimensiones
@@ -87,197 +1146,209 @@ def load_fact_ventas(fecha_inicio: str = None, fecha_fin: str = None, truncate:
         target_conn = target_db.get_connection()
         target_cursor = target_conn.cursor()
         
-        dim_keys = get_dimension_keys(target_cursor)
+        if opciones.resume:
+            # Mismos filtros que la ejecución interrumpida, desde su última fila confirmada
+            log_step("Buscando la última ejecución sin completar en dbo.etl_checkpoints...")
+            run = get_resumable_run(target_conn, PROCESO)
+            if run is None:
+                target_cursor.close()
+                target_conn.close()
+                log_success("No hay ejecuciones pendientes de retomar")
+                log_etl_end("Carga de fact_ventas", success=True, records=0)
+                return True
+            ejecucion_id = run['ejecucion_id']
+            opciones.apply_run(run)
+            log_success(f"Ejecución {ejecucion_id} ({run['estado']}): {run['lotes']} lotes, {run['filas']} filas "
+                        f"confirmadas; continúa después de {opciones.posicion or 'el inicio'}")
+        
+        with bench.phase('dimensiones') as fase:
+            dim_keys = get_dimension_keys(target_cursor, opciones.as_of)
+            fase['filas'] = sum(len(keys) for keys in dim_keys.values())
         
         # PASO 2: Limpiar tabla si se solicita
-        if truncate:
+        if opciones.truncate:
             log_step("Limpiando fact_ventas...")
             target_cursor.execute("DELETE FROM dbo.fact_ventas")
             target_conn.commit()
             log_success("Tabla limpiada")
         
+        source_db = SourceDatabase()
+        filtros, watermark = resolve_filters(target_conn, source_db, opciones, run)
+        tracker = WatermarkTracker('venta_id', 'fecha_venta',
+                                   'venta_updated_at' if filtros['con_updated_at'] else None, previous=watermark)
+        
+        # Ventas pendientes en la cuarentena (solo al reprocesar)
+        venta_ids = []
+        ultimo_rechazo = None
+        if opciones.reprocess:
+            target_cursor.execute(SELECT_RECHAZOS_PENDIENTES)
+            pendientes = target_cursor.fetchall()
+            venta_ids = sorted(row[0] for row in pendientes)
+            ultimo_rechazo = max((row[1] for row in pendientes), default=None)
+            log_success(f"Ventas pendientes en cuarentena: {len(venta_ids)}")
+        
+        checkpoints = opciones.checkpoints
+        if checkpoints and run is None:
+            start_run(target_conn, ejecucion_id, PROCESO, {
+                'fecha_inicio': filtros['fecha_inicio'], 'fecha_fin': filtros['fecha_fin'],
+                'desde_id': filtros['desde_id'], 'desde_updated_at': filtros['desde_updated_at'],
+                'merge': opciones.merge, 'incremental': opciones.incremental, 'as_of': opciones.as_of,
+            })
+        elif checkpoints:
+            set_run_status(target_conn, ejecucion_id, 'en_curso')
+        if checkpoints:
+            log_step(f"Checkpoints por lote en dbo.etl_checkpoints (ejecución {ejecucion_id})")
+        
         # PASO 3: Extraer ventas de MariaDB
         log_step("Extrayendo ventas de MariaDB...")
+        chunks, paginator = extract_chunks(source_db, opciones, filtros, venta_ids)
+        if opciones.incremental:
+            chunks = tracker.track(chunks)
+        chunks = bench.timed_chunks(chunks, 'extraccion')
         
-        source_db = SourceDatabase()
-        source_conn = source_db.get_connection()
-        source_cursor = source_conn.cursor()
-        
-        # Query principal: ventas -> orden_pedidos -> salidas
-        # Según tu análisis: salidas tiene el detalle por producto
-        query = """
-            SELECT 
-                v.id as venta_id,
-                v.tipo_documento_id,
-                v.orden_pedido_id,
-                v.estado_venta_id,
-                v.cliente_id,
-                v.vendedor_id,
-                v.condicion_pago_id,
-                v.numero as numero_venta,
-                v.fecha as fecha_venta,
-                v.saldo,
-                v.fecha_anulado,
-                v.fecha_liquidado,
-                -- Desde orden_pedidos
-                op.vendedor_id as op_vendedor_id,
-                -- Desde clientes (municipio para ubicacion_key)
-                c.municipio_id,
-                -- Desde salidas (detalle por producto)
-                s.id as salida_id,
-                s.cantidad,
-                s.precio_unitario,
-                s.venta_exenta,
-                s.venta_gravada,
-                -- Producto: desde precios o producciones
-                COALESCE(pr.producto_id, prod.producto_id) as producto_id,
-                -- Costo del producto
-                p.costo as costo_producto
-            FROM ventas v
-            LEFT JOIN clientes c ON v.cliente_id = c.id
-            LEFT JOIN orden_pedidos op ON v.orden_pedido_id = op.id
-            LEFT JOIN salidas s ON s.orden_pedido_id = op.id
-            LEFT JOIN precios pr ON s.precio_id = pr.id
-            LEFT JOIN producciones prod ON s.produccion_id = prod.id
-            LEFT JOIN productos p ON COALESCE(pr.producto_id, prod.producto_id) = p.id
-            WHERE s.id IS NOT NULL  -- Solo ventas con detalle
-        """
+        # PASO 4: Transformar y cargar (las filas llegan por bloques desde el cursor del servidor)
+        log_step(f"Transformando ({'vectorizado' if opciones.vectorized else 'fila por fila'}) y cargando en "
+                 f"{'pipeline' if opciones.pipeline else 'streaming'} (modo {opciones.modo}, "
+                 f"lotes de {opciones.batch_size})...")
         
-        # Filtro por fechas si se proporciona
-        if fecha_inicio:
-            query += f" AND v.fecha >= '{fecha_inicio}'"
-        if fecha_fin:
-            query += f" AND v.fecha <= '{fecha_fin}'"
+        stats = {'extraidos': 0, 'omitidos': 0, 'errores': []}
+        rechazos = None
+        if opciones.quarantine:
+            rechazos = Quarantine(TABLA_RECHAZOS, RECHAZOS_IDS, ejecucion_id, opciones.batch_size)
+            stats['rechazos'] = rechazos
+            log_step(f"Rechazos en cuarentena: dbo.{TABLA_RECHAZOS} (ejecución {rechazos.ejecucion_id})")
         
-        query += " ORDER BY v.fecha, v.id, s.id"
+        def on_insert_error(params, e):
+            if len(stats['errores']) < 5:
+                stats['errores'].append(f"Venta {params[8]}: {str(e)}")
+            if rechazos:
+                rechazos.add(dict(zip(FACT_VENTAS_COLUMNS, params)), 'escritura', ERROR_ESCRITURA, error=e)
         
-        source_cursor.execute(query)
-        rows = source_cursor.fetchall()
-        source_cursor.close()
-        source_conn.close()
+        writer = create_ventas_writer(target_conn, opciones, on_insert_error)
         
-        log_success(f"Extraídos {len(rows)} registros de ventas")
+        rowgroups_antes = None
+        if opciones.columnstore and not opciones.dry_run:
+            if get_columnstore_index(target_conn, 'dbo.fact_ventas'):
+                rowgroups_antes = get_rowgroups(target_conn, 'dbo.fact_ventas')
+            else:
+                log_step("fact_ventas no tiene índice columnstore (ver 05_crear_tablas_etl.sql): "
+                         "no se reportará la calidad de los rowgroups")
         
-        if len(rows) == 0:
-            log_success("No hay datos para cargar")
-            target_cursor.close()
-            target_conn.close()
-            log_etl_end("Carga de fact_ventas", success=True, records=0)
-            return True
+        if checkpoints:
+            lotes_previos = run['lotes'] if run else 0
+            filas_previas = run['filas'] if run else 0
+            
+            def checkpoint(cursor, params):
+                # Mismo commit que el lote: la posición nunca adelanta a los datos
+                save_checkpoint(cursor, ejecucion_id, tuple(params[i] for i in CHECKPOINT_INDEXES),
+                                lotes_previos + writer.batches + 1, filas_previas + writer.rows_written)
+            
+            writer.before_commit = checkpoint
+        transform_block = transform_ventas_vectorized if opciones.vectorized else transform_ventas
+        inferidos = InferredMembers(MIEMBROS_INFERIDOS) if opciones.infer_members else None
+        resolve_inferidos = bench.timed(lambda rows: inferidos.resolve(rows, dim_keys), 'inferidos')
+        transform_timed = bench.timed(lambda rows: transform_block(rows, dim_keys, stats), 'transformacion')
         
-        # PASO 4: Transformar y cargar
-        log_step(f"Transformando y cargando {len(rows)} registros...")
+        def transform(rows):
+            if inferidos:
+                # Llaves naturales desconocidas -> miembros inferidos antes de resolver keys
+                resolve_inferidos(rows)
+            return transform_timed(rows)
+        progress = {'siguiente': PROGRESS_INTERVAL}
         
-        insert_count = 0
-        skip_count = 0
-        errors = []
+        def extend(batch):
+            writer.extend(batch)
+            if writer.rows_written >= progress['siguiente']:
+                log_step(f"Progreso: {writer.rows_written} registros insertados...")
+                progress['siguiente'] += PROGRESS_INTERVAL
+        write_batch = bench.timed(extend, 'escritura')
         
-        for row in rows:
-            try:
-                # Obtener keys de dimensiones
-                fecha_venta = row['fecha_venta']
-                tiempo_key = dim_keys['tiempo'].get(fecha_venta)
-                cliente_key = dim_keys['cliente'].get(row['cliente_id'])
-                producto_key = dim_keys['producto'].get(row['producto_id'])
-                
-                # Vendedor: primero de orden_pedido, luego de venta
-                vendedor_id = row.get('op_vendedor_id') or row.get('vendedor_id')
-                vendedor_key = dim_keys['vendedor'].get(vendedor_id) if vendedor_id else None
-                
-                # Ubicacion desde municipio del cliente
-                municipio_id = row.get('municipio_id')
-                ubicacion_key = dim_keys['ubicacion'].get(municipio_id) if municipio_id else None
-                
-                tipo_documento_key = dim_keys['tipo_documento'].get(row['tipo_documento_id'])
-                condicion_pago_key = dim_keys['condicion_pago'].get(row['condicion_pago_id'])
-                estado_venta_key = dim_keys['estado_venta'].get(row['estado_venta_id'])
-                
-                # Validar keys obligatorias
-                if not all([tiempo_key, cliente_key, producto_key, tipo_documento_key, estado_venta_key]):
-                    skip_count += 1
-                    if skip_count <= 5:
-                        errors.append(f"Venta {row['venta_id']}, Salida {row['salida_id']}: Falta key de dimensión")
-                    continue
-                
-                # Calcular métricas según tu análisis
-                cantidad = float(row['cantidad'] or 0)
-                precio_unitario = float(row['precio_unitario'] or 0)
-                venta_exenta = float(row['venta_exenta'] or 0)
-                venta_gravada = float(row['venta_gravada'] or 0)
-                
-                # Según tu documentación:
-                # venta_total = venta_gravada + venta_exenta
-                # iva = venta_gravada * 0.13
-                venta_total = venta_gravada + venta_exenta
-                iva = venta_gravada * 0.13
-                venta_total_con_impuestos = venta_total + iva
-                
-                # Calcular costo y margen
-                costo_unitario = float(row.get('costo_producto') or 0)
-                costo_total = cantidad * costo_unitario
-                margen_bruto = venta_total - costo_total
-                porcentaje_margen = (margen_bruto / venta_total * 100) if venta_total > 0 else 0
-                
-                # Estados de la venta
-                esta_liquidado = 1 if row['fecha_liquidado'] else 0
-                esta_anulado = 1 if row['fecha_anulado'] else 0
-                es_venta_credito = 1 if row['condicion_pago_id'] and row['condicion_pago_id'] != 1 else 0
-                
-                # Insertar en fact_ventas
-                target_cursor.execute("""
-                    INSERT INTO dbo.fact_ventas (
-                        tiempo_key, cliente_key, producto_key, vendedor_key, ubicacion_key,
-                        tipo_documento_key, condicion_pago_key, estado_venta_key,
-                        venta_id, orden_pedido_id, numero_venta,
-                        cantidad, precio_unitario, venta_exenta, venta_gravada,
-                        venta_total, iva, venta_total_con_impuestos,
-                        costo_unitario, costo_total, margen_bruto, porcentaje_margen,
-                        es_venta_credito, esta_liquidado, esta_anulado,
-                        fecha_venta, fecha_liquidacion, fecha_anulacion, fecha_carga
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE())
-                """, (
-                    tiempo_key, cliente_key, producto_key, vendedor_key, ubicacion_key,
-                    tipo_documento_key, condicion_pago_key, estado_venta_key,
-                    row['venta_id'], row['orden_pedido_id'], row['numero_venta'],
-                    cantidad, precio_unitario, venta_exenta, venta_gravada,
-                    venta_total, iva, venta_total_con_impuestos,
-                    costo_unitario, costo_total, margen_bruto, porcentaje_margen,
-                    es_venta_credito, esta_liquidado, esta_anulado,
-                    fecha_venta, row['fecha_liquidado'], row['fecha_anulado']
-                ))
-                
-                insert_count += 1
-                
-                # Commit cada 1000 registros
-                if insert_count % 1000 == 0:
-                    target_conn.commit()
-                    log_step(f"Progreso: {insert_count} registros insertados...")
-                    
-            except Exception as e:
-                skip_count += 1
-                if skip_count <= 5:
-                    errors.append(f"Venta {row['venta_id']}: {str(e)}")
-        
-        # Commit final
-        target_conn.commit()
+        start_time = time.perf_counter()
+        
+        etl_pipeline = None
+        if opciones.pipeline:
+            # Extracción, transformación y escritura en hilos separados con colas acotadas
+            etl_pipeline = Pipeline(queue_size=get_setting('etl', 'pipeline_queue_size', 4))
+            etl_pipeline.run(chunks, transform, write_batch)
+        else:
+            for rows in chunks:
+                write_batch(transform(rows))
+        
+        # Enviar último lote
+        with bench.phase('escritura'):
+            writer.close()
+        if inferidos:
+            inferidos.close()
+        if rechazos:
+            rechazos.close()
+        if ultimo_rechazo is not None and not opciones.dry_run:
+            # Los que volvieron a fallar quedaron registrados con esta ejecución
+            target_cursor.execute(MARCAR_RECHAZOS_REPROCESADOS, ultimo_rechazo)
+            target_conn.commit()
+        
+        extract_count = stats['extraidos']
+        
+        if opciones.incremental and not opciones.dry_run:
+            tracker.save(target_conn, PROCESO, extract_count)
+            log_success(f"Marca de agua actualizada: venta_id {tracker.ultimo_id}, fecha {tracker.ultima_fecha}")
+        if checkpoints:
+            set_run_status(target_conn, ejecucion_id, 'completado')
+        
+        calidad_rowgroups = None
+        if rowgroups_antes is not None:
+            calidad_rowgroups = report_rowgroups(target_conn, rowgroups_antes)
+        
+        source_db.close()
         target_cursor.close()
         target_conn.close()
         
-        log_success(f"Insertados: {insert_count} registros")
+        log_success(f"Extraídos {extract_count} registros de ventas")
+        
+        if opciones.benchmark:
+            reporte = bench.save(
+                opciones.benchmark_path,
+                parametros={
+                    'fecha_inicio': filtros['fecha_inicio'], 'fecha_fin': filtros['fecha_fin'],
+                    'modo': opciones.modo, 'batch_size': opciones.batch_size, 'pipeline': opciones.pipeline,
+                    'shards': opciones.shards, 'vectorized': opciones.vectorized, 'keyset': opciones.keyset,
+                    'hash_join': opciones.hash_join, 'incremental': opciones.incremental,
+                    'as_of': opciones.as_of, 'dry_run': opciones.dry_run,
+                },
+                totales={
+                    'filas_extraidas': extract_count,
+                    'filas_escritas': writer.rows_written,
+                    'filas_omitidas': stats['omitidos'] + writer.rows_failed,
+                    'lotes': writer.batches,
+                },
+                pipeline={'ocupado': etl_pipeline.busy, 'segundos': etl_pipeline.elapsed} if etl_pipeline else None,
+                columnstore=calidad_rowgroups,
+            )
+            for fase, datos in bench.report()['fases'].items():
+                log_step(f"Fase {fase}: {datos['segundos']:.2f}s, {datos['filas']} filas "
+                         f"({datos['filas_por_segundo'] or 0:,.0f} filas/s)"
+                         + (f", {datos['bytes'] / 1024 ** 2:.1f} MB" if 'bytes' in datos else ""))
+            log_success(f"Reporte de benchmark: {reporte}")
         
-        if skip_count > 0:
-            log_step(f"Omitidos: {skip_count} registros (sin keys o errores)")
-            if errors:
-                for error in errors[:5]:
-                    log_step(f"  - {error}")
-                if len(errors) > 5:
-                    log_step(f"  ... y {len(errors)-5} errores más")
+        if extract_count == 0:
+            log_success("No hay datos para cargar")
+            log_etl_end("Carga de fact_ventas", success=True, records=0)
+            return True
         
-        log_etl_end("Carga de fact_ventas", success=True, records=insert_count)
+        log_load_summary(opciones, writer, stats, time.perf_counter() - start_time, paginator, inferidos,
+                         rechazos, etl_pipeline)
+        log_etl_end("Carga de fact_ventas", success=True, records=writer.rows_written)
         return True
         
     except Exception as e:
         log_error("Error en la carga de fact_ventas", e)
+        if checkpoints:
+            try:
+                target_conn.rollback()
+                set_run_status(target_conn, ejecucion_id, 'fallido')
+            except Exception:
+                pass
+            log_step(f"Los lotes confirmados quedan registrados en la ejecución {ejecucion_id}: "
+                     f"retomar con --resume")
         log_etl_end("Carga de fact_ventas", success=False)
         return False
 
@@ -288,13 +1359,79 @@ if __name__ == "__main__":
     parser.add_argument('--fecha-fin', help='Fecha final (YYYY-MM-DD)')
     parser.add_argument('--truncate', action='store_true', 
                         help='Limpiar tabla antes de cargar')
+    parser.add_argument('--insert-mode', choices=['batch', 'row', 'bulk'],
+                        help='Modo de inserción: batch (executemany por lotes), row (fila por fila) o bulk '
+                             '(archivos + BULK INSERT); por defecto bulk con --truncate si '
+                             'performance.use_bulk_insert y bulk_insert_server_directory, si no batch')
+    parser.add_argument('--batch-size', type=int,
+                        help='Filas por lote (por defecto etl.batch_size de config.yaml)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Solapar extracción, transformación y escritura en hilos con colas acotadas')
+    parser.add_argument('--merge', action='store_true',
+                        help='Carga idempotente: staging + MERGE por (venta_id, salida_id)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Cargar solo lo posterior a la marca de agua de dbo.etl_control '
+                             '(menos etl.lookback_days); implica --merge')
+    parser.add_argument('--as-of', action='store_true',
+                        help='Resolver cliente/producto/vendedor con la versión SCD2 vigente en la fecha de venta')
+    parser.add_argument('--infer-members', action=argparse.BooleanOptionalAction, default=None,
+                        help='Crear miembros inferidos para llaves naturales sin dimensión en lugar de '
+                             'omitir la venta (por defecto etl.infer_members de config.yaml)')
+    parser.add_argument('--quarantine', action=argparse.BooleanOptionalAction, default=None,
+                        help='Guardar las líneas omitidas en dbo.etl_rechazos_fact_ventas '
+                             '(por defecto etl.quarantine_rejects de config.yaml)')
+    parser.add_argument('--reprocesar-rechazos', action='store_true',
+                        help='Cargar solo las ventas pendientes en la cuarentena (vía merge)')
+    parser.add_argument('--keyset', action='store_true',
+                        help='Extraer por páginas (v.fecha, v.id, s.id) > posición LIMIT batch-size, '
+                             'reconectando ante cortes')
+    parser.add_argument('--desde-posicion', type=parse_posicion, metavar='FECHA,VENTA_ID,SALIDA_ID',
+                        help='Continuar la extracción keyset después de esta posición')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retomar la última ejecución sin completar desde su último lote confirmado '
+                             '(dbo.etl_checkpoints)')
+    parser.add_argument('--benchmark', nargs='?', const='', metavar='RUTA',
+                        help='Medir cada fase (dimensiones, extracción, transformación, escritura) y guardar '
+                             'un reporte JSON (por defecto en logs/)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Extraer y transformar sin escribir en el DW')
+    parser.add_argument('--hash-join', action='store_true',
+                        help='Leer ventas por rango y el resto de tablas por id, uniendo en Python '
+                             '(descarga el join de MariaDB)')
+    parser.add_argument('--columnstore', action='store_true',
+                        help='Cargar por rowgroups completos (>= 102,400 filas) con INSERT ... SELECT WITH (TABLOCK) '
+                             'y reportar la calidad de los rowgroups')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='Transformar cada bloque en forma columnar (NumPy/pandas)')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Dividir el rango de fechas en N tramos extraídos en paralelo '
+                             '(hasta etl.parallel_processes conexiones)')
     
     args = parser.parse_args()
     
     success = load_fact_ventas(
         fecha_inicio=args.fecha_inicio,
         fecha_fin=args.fecha_fin,
-        truncate=args.truncate
+        truncate=args.truncate,
+        insert_mode=args.insert_mode,
+        batch_size=args.batch_size,
+        pipeline=args.pipeline,
+        shards=args.shards,
+        vectorized=args.vectorized,
+        merge=args.merge,
+        incremental=args.incremental,
+        as_of=args.as_of,
+        infer_members=args.infer_members,
+        quarantine=args.quarantine,
+        reprocess=args.reprocesar_rechazos,
+        keyset=args.keyset or args.desde_posicion is not None,
+        posicion=args.desde_posicion,
+        resume=args.resume,
+        benchmark=args.benchmark is not None,
+        benchmark_path=args.benchmark or None,
+        dry_run=args.dry_run,
+        hash_join=args.hash_join,
+        columnstore=args.columnstore
     )
     
     sys.exit(0 if success else 1)
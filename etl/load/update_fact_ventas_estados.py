@@ -0,0 +1,219 @@
+"""
+ETL: Actualización de estados de fact_ventas
+Refresca esta_liquidado, esta_anulado, fecha_liquidacion y fecha_anulacion de las
+líneas ya cargadas cuando la venta se liquida o se anula en el sistema origen
+(no inserta líneas nuevas)
+"""
+import sys
+from pathlib import Path
+import argparse
+import time
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from etl.utils.database import SourceDatabase, TargetDatabase
+from etl.utils.logger import get_logger, log_etl_start, log_etl_end, log_step, log_error, log_success
+from etl.utils.config import get_setting
+from etl.utils.helpers import safe_date
+from etl.utils.control import get_watermark, lookback, WatermarkTracker
+from etl.utils.writers import MergeWriter
+from etl.utils.schema import TypedParameters
+
+
+# Nombre del proceso en dbo.etl_control
+PROCESO = 'fact_ventas_estados'
+
+# Ventas liquidadas o anuladas; fecha_estado es la fecha del último cambio de estado
+QUERY_ESTADOS = """
+    SELECT
+        v.id AS venta_id,
+        v.fecha_liquidado,
+        v.fecha_anulado,
+        DATE(GREATEST(COALESCE(v.fecha_liquidado, DATE '1900-01-01'),
+                      COALESCE(v.fecha_anulado, DATE '1900-01-01'))) AS fecha_estado
+    FROM ventas v
+"""
+
+# Columnas de stg_fact_ventas_estados en el orden de transform_estados
+ESTADOS_COLUMNS = ('venta_id', 'esta_liquidado', 'esta_anulado', 'fecha_liquidacion', 'fecha_anulacion')
+
+INSERT_STG_ESTADOS = f"""
+    INSERT INTO dbo.stg_fact_ventas_estados
+        ({', '.join(ESTADOS_COLUMNS)})
+    VALUES ({', '.join('?' * len(ESTADOS_COLUMNS))})
+"""
+
+# Una sola sentencia por lote: actualiza todas las líneas de cada venta que cambió
+UPDATE_FACT_ESTADOS = """
+    UPDATE f
+    SET f.esta_liquidado = s.esta_liquidado,
+        f.esta_anulado = s.esta_anulado,
+        f.fecha_liquidacion = s.fecha_liquidacion,
+        f.fecha_anulacion = s.fecha_anulacion,
+        f.fecha_actualizacion = GETDATE()
+    FROM dbo.fact_ventas f
+    INNER JOIN dbo.stg_fact_ventas_estados s ON f.venta_id = s.venta_id
+    WHERE EXISTS (
+        SELECT s.esta_liquidado, s.esta_anulado, s.fecha_liquidacion, s.fecha_anulacion
+        EXCEPT
+        SELECT f.esta_liquidado, f.esta_anulado, f.fecha_liquidacion, f.fecha_anulacion
+    )
+"""
+
+CLEAR_STG_ESTADOS = "TRUNCATE TABLE dbo.stg_fact_ventas_estados"
+
+
+def build_estados_query(desde=None, desde_updated_at=None, con_updated_at: bool = False) -> tuple:
+    """
+    Construir el query de ventas con cambio de estado
+
+    Args:
+        desde: Fecha desde la que se buscan liquidaciones/anulaciones,
+            None = todas las ventas liquidadas o anuladas
+        desde_updated_at: Incluir además ventas con updated_at igual o posterior
+            (detecta estados revertidos, cuya fecha vuelve a NULL)
+        con_updated_at: Si True, extrae v.updated_at como venta_updated_at
+
+    Returns:
+        Tupla (query, params) para pymysql
+    """
+    query = QUERY_ESTADOS
+    params = []
+
+    if con_updated_at:
+        query = query.replace("SELECT", "SELECT\n        v.updated_at AS venta_updated_at,", 1)
+
+    if desde:
+        condiciones = ["v.fecha_liquidado >= %s", "v.fecha_anulado >= %s"]
+        params.extend([desde, desde])
+    else:
+        condiciones = ["v.fecha_liquidado IS NOT NULL", "v.fecha_anulado IS NOT NULL"]
+    if desde_updated_at is not None:
+        condiciones.append("v.updated_at >= %s")
+        params.append(desde_updated_at)
+
+    query += f" WHERE ({' OR '.join(condiciones)}) ORDER BY v.id"
+    return query, params
+
+
+def transform_estados(rows: list) -> list:
+    """
+    Convertir un bloque de ventas en los parámetros de stg_fact_ventas_estados
+
+    Args:
+        rows: Bloque de registros extraídos de MariaDB
+
+    Returns:
+        Lista de tuplas (venta_id, esta_liquidado, esta_anulado, fecha_liquidacion, fecha_anulacion)
+    """
+    return [
+        (
+            row['venta_id'],
+            1 if row['fecha_liquidado'] else 0,
+            1 if row['fecha_anulado'] else 0,
+            row['fecha_liquidado'],
+            row['fecha_anulado'],
+        )
+        for row in rows
+    ]
+
+
+def update_fact_ventas_estados(desde: str = None, batch_size: int = None) -> bool:
+    """
+    Actualizar los estados de fact_ventas desde la última ejecución
+
+    Args:
+        desde: Fecha (YYYY-MM-DD) desde la que buscar cambios de estado; por defecto
+            la marca de agua de dbo.etl_control menos etl.lookback_days
+        batch_size: Ventas por lote, por defecto etl.batch_size de config.yaml
+    """
+    log = get_logger("fact_ventas_estados")
+    batch_size = batch_size or get_setting('etl', 'batch_size', 1000)
+
+    log_etl_start("Actualización de estados de fact_ventas")
+
+    try:
+        target_db = TargetDatabase()
+        target_conn = target_db.get_connection()
+        source_db = SourceDatabase()
+
+        # PASO 1: Determinar desde cuándo buscar cambios
+        con_updated_at = source_db.has_column('ventas', 'updated_at')
+        watermark = get_watermark(target_conn, PROCESO)
+        desde_updated_at = None
+        dias = get_setting('etl', 'lookback_days', 7)
+
+        if desde:
+            desde = safe_date(desde)
+        elif watermark:
+            desde = lookback(watermark['ultima_fecha'], dias)
+            if con_updated_at:
+                desde_updated_at = lookback(watermark['ultimo_updated_at'], dias)
+            log_success(f"Marca de agua: fecha de estado {watermark['ultima_fecha']}, "
+                        f"updated_at {watermark['ultimo_updated_at']} (lookback {dias} días)")
+        else:
+            log_step("Sin marca de agua previa: se revisarán todas las ventas liquidadas o anuladas")
+
+        # PASO 2: Extraer ventas con cambio de estado
+        log_step(f"Extrayendo ventas liquidadas o anuladas{f' desde {desde}' if desde else ''}"
+                 f"{f' o modificadas desde {desde_updated_at}' if desde_updated_at else ''}...")
+
+        tracker = WatermarkTracker('venta_id', 'fecha_estado',
+                                   'venta_updated_at' if con_updated_at else None, previous=watermark)
+        chunks = tracker.track(source_db.stream_query(
+            *build_estados_query(desde, desde_updated_at, con_updated_at), chunk_size=batch_size))
+
+        # PASO 3: Aplicar por lotes (staging + UPDATE por venta_id)
+        errors = []
+
+        def on_error(params, e):
+            if len(errors) < 5:
+                errors.append(f"Venta {params[0]}: {str(e)}")
+
+        writer = MergeWriter(target_conn, INSERT_STG_ESTADOS, UPDATE_FACT_ESTADOS,
+                             CLEAR_STG_ESTADOS, batch_size, on_error)
+        if get_setting('performance', 'typed_parameters', True):
+            writer.parameter_types = TypedParameters('dbo.stg_fact_ventas_estados', ESTADOS_COLUMNS)
+
+        start_time = time.perf_counter()
+        extract_count = 0
+        for rows in chunks:
+            extract_count += len(rows)
+            writer.extend(transform_estados(rows))
+        writer.close()
+
+        tracker.save(target_conn, PROCESO, extract_count)
+
+        source_db.close()
+        target_conn.close()
+
+        log_success(f"Revisadas {extract_count} ventas con cambio de estado")
+        log_success(f"Líneas de fact_ventas actualizadas: {writer.rows_merged}")
+        log_step(f"Escritura: {writer.elapsed:.2f}s ({writer.batches} lotes) | "
+                 f"Total: {time.perf_counter() - start_time:.2f}s")
+
+        if writer.rows_failed > 0:
+            log_step(f"Omitidas: {writer.rows_failed} ventas con error")
+            for error in errors:
+                log_step(f"  - {error}")
+
+        log_etl_end("Actualización de estados de fact_ventas", success=True, records=writer.rows_merged)
+        return True
+
+    except Exception as e:
+        log_error("Error en la actualización de estados de fact_ventas", e)
+        log_etl_end("Actualización de estados de fact_ventas", success=False)
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Actualización de estados (liquidación/anulación) de fact_ventas')
+    parser.add_argument('--desde', help='Buscar cambios de estado desde esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--batch-size', type=int,
+                        help='Ventas por lote (por defecto etl.batch_size de config.yaml)')
+
+    args = parser.parse_args()
+
+    success = update_fact_ventas_estados(desde=args.desde, batch_size=args.batch_size)
+
+    sys.exit(0 if success else 1)
@@ -0,0 +1,179 @@
+"""
+Módulo de Medición por Fases
+Mide el tiempo, las filas y los bytes de cada fase de una carga
+(dimensiones, extracción, transformación, escritura) y genera un reporte
+JSON comparable entre versiones
+"""
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from etl.utils.config import get_setting
+
+# Bytes fijos por fila en el protocolo de texto de MySQL (encabezado del paquete)
+_BYTES_ENCABEZADO_FILA = 4
+
+
+def estimate_row_bytes(row: dict) -> int:
+    """
+    Estimar los bytes que ocupa una fila en el protocolo de texto de MySQL
+
+    Cada valor viaja como texto con un prefijo de largo (NULL ocupa 1 byte),
+    así que el largo de su representación es una buena aproximación.
+    """
+    total = _BYTES_ENCABEZADO_FILA
+    for value in row.values():
+        if value is None:
+            total += 1
+        elif isinstance(value, (bytes, bytearray)):
+            total += len(value) + 1
+        elif isinstance(value, str):
+            total += len(value.encode('utf-8')) + 1
+        else:
+            total += len(str(value)) + 1
+    return total
+
+
+def _json_default(value):
+    """Serializar fechas y decimales en el reporte"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class Benchmark:
+    """
+    Acumulador de tiempos, filas y bytes por fase
+
+    Cada fase se puede medir desde un hilo distinto (pipeline): los
+    contadores se actualizan bajo un lock.
+    """
+
+    def __init__(self, proceso: str, count_bytes: bool = False):
+        """
+        Args:
+            proceso: Nombre de la carga (ej. 'fact_ventas')
+            count_bytes: Si True, estima los bytes extraídos de cada fila
+                (tiene costo: se mide fuera del tiempo de la fase)
+        """
+        self.proceso = proceso
+        self.count_bytes = count_bytes
+        self.fases = {}
+        self.inicio = datetime.now()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, fase: str, segundos: float = 0.0, filas: int = 0, bytes_: int = 0):
+        """Sumar tiempo, filas y bytes a una fase"""
+        with self._lock:
+            datos = self.fases.setdefault(fase, {'segundos': 0.0, 'filas': 0, 'bytes': 0, 'llamadas': 0})
+            datos['segundos'] += segundos
+            datos['filas'] += filas
+            datos['bytes'] += bytes_
+            datos['llamadas'] += 1
+
+    @contextmanager
+    def phase(self, fase: str):
+        """
+        Medir un bloque de código
+
+        Yields:
+            Diccionario donde el bloque puede dejar 'filas' procesadas
+        """
+        resultado = {'filas': 0}
+        start = time.perf_counter()
+        try:
+            yield resultado
+        finally:
+            self.add(fase, time.perf_counter() - start, resultado['filas'])
+
+    def timed_chunks(self, chunks: Iterable[list], fase: str = 'extraccion') -> Iterator[list]:
+        """Envolver un iterable de bloques midiendo el tiempo de obtener cada uno"""
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            rows = next(iterator, None)
+            elapsed = time.perf_counter() - start
+            if rows is None:
+                break
+            bytes_ = sum(estimate_row_bytes(row) for row in rows) if self.count_bytes else 0
+            self.add(fase, elapsed, len(rows), bytes_)
+            yield rows
+
+    def timed(self, function, fase: str):
+        """Envolver una función bloque -> bloque midiendo su tiempo y las filas que recibe"""
+        def wrapper(rows):
+            start = time.perf_counter()
+            try:
+                return function(rows)
+            finally:
+                self.add(fase, time.perf_counter() - start, len(rows))
+        return wrapper
+
+    @property
+    def elapsed(self) -> float:
+        """Segundos desde que se creó el medidor"""
+        return time.perf_counter() - self._start
+
+    def report(self, **extra) -> dict:
+        """
+        Armar el reporte
+
+        Args:
+            extra: Secciones adicionales (parámetros, totales, etc.)
+
+        Returns:
+            Diccionario serializable con una entrada por fase
+        """
+        fases = {}
+        for fase, datos in self.fases.items():
+            segundos = datos['segundos']
+            fases[fase] = {
+                'segundos': round(segundos, 4),
+                'filas': datos['filas'],
+                'filas_por_segundo': round(datos['filas'] / segundos, 1) if segundos > 0 else None,
+                'llamadas': datos['llamadas'],
+            }
+            if datos['bytes']:
+                fases[fase]['bytes'] = datos['bytes']
+                fases[fase]['mb_por_segundo'] = (round(datos['bytes'] / segundos / 1024 ** 2, 2)
+                                                 if segundos > 0 else None)
+        return {
+            'proceso': self.proceso,
+            'version': get_setting('project', 'version'),
+            'fecha': self.inicio,
+            'python': platform.python_version(),
+            'segundos_totales': round(self.elapsed, 4),
+            'fases': fases,
+            **extra,
+        }
+
+    def save(self, path: Optional[str] = None, **extra) -> Path:
+        """
+        Escribir el reporte JSON
+
+        Args:
+            path: Archivo destino; por defecto LOG_PATH/benchmark_<proceso>_<fecha>.json
+            extra: Ver report
+
+        Returns:
+            Ruta del archivo escrito
+        """
+        if path:
+            path = Path(path)
+        else:
+            nombre = f"benchmark_{self.proceso}_{self.inicio.strftime('%Y%m%d_%H%M%S')}.json"
+            path = Path(os.getenv('LOG_PATH', './logs')) / nombre
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(**extra), f, indent=2, ensure_ascii=False, default=_json_default)
+        return path
@@ -0,0 +1,119 @@
+"""
+Módulo de Archivos para BULK INSERT
+Genera archivos delimitados (UTF-8) con filas ya transformadas para cargarlas
+en SQL Server con BULK INSERT, sin depender de una conexión
+"""
+import math
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+# Separadores de control ASCII (unit/record separator): no aparecen en los datos
+FIELD_TERMINATOR = '\x1f'
+ROW_TERMINATOR = '\x1e'
+
+# Con KEEPNULLS un campo vacío se carga como NULL; la cadena vacía se escribe como
+# un solo carácter NUL, que BULK INSERT (formato carácter, como bcp) carga como ''
+EMPTY_STRING = '\x00'
+
+# Decimales con que se escriben los float (las columnas DECIMAL del DW tienen a lo sumo 4)
+FLOAT_DECIMALS = 6
+
+_TERMINADORES = str.maketrans('', '', FIELD_TERMINATOR + ROW_TERMINATOR + EMPTY_STRING)
+
+
+def format_value(value) -> str:
+    """
+    Convertir un valor al texto que BULK INSERT interpreta para su columna
+
+    None (y NaN) se escribe como campo vacío, que con KEEPNULLS se carga como
+    NULL; la cadena vacía se escribe como EMPTY_STRING para que una columna de
+    texto NOT NULL reciba '' y no NULL.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ''
+        # Sin notación científica, que no se convierte a DECIMAL
+        return f"{value:.{FLOAT_DECIMALS}f}"
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='microseconds')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.translate(_TERMINADORES) or EMPTY_STRING
+    return str(value)
+
+
+def format_row(params: Sequence) -> str:
+    """Una fila del archivo (con su terminador)"""
+    return FIELD_TERMINATOR.join(format_value(value) for value in params) + ROW_TERMINATOR
+
+
+def write_bulk_file(path, rows: Iterable[Sequence]) -> int:
+    """
+    Escribir un archivo de carga
+
+    Se escribe con extensión .tmp y se renombra al terminar, de modo que un
+    archivo con el nombre final siempre está completo.
+
+    Args:
+        path: Ruta del archivo
+        rows: Filas (tuplas en el orden de las columnas destino)
+
+    Returns:
+        Filas escritas
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporal = path.with_suffix(path.suffix + '.tmp')
+    count = 0
+    with open(temporal, 'w', encoding='utf-8', newline='') as f:
+        for params in rows:
+            f.write(format_row(params))
+            count += 1
+    os.replace(temporal, path)
+    return count
+
+
+def read_bulk_file(path) -> list:
+    """
+    Leer un archivo de carga (verificación): lista de filas con los campos
+    como texto, None para los vacíos y '' para EMPTY_STRING
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        contenido = f.read()
+    filas = contenido.split(ROW_TERMINATOR)
+    if filas and filas[-1] == '':
+        filas.pop()
+    valores = {'': None, EMPTY_STRING: ''}
+    return [[valores.get(campo, campo) for campo in fila.split(FIELD_TERMINATOR)] for fila in filas]
+
+
+def bulk_insert_sql(table: str, server_path: str, batch_size: Optional[int] = None) -> str:
+    """
+    Sentencia BULK INSERT para un archivo generado con write_bulk_file
+
+    Args:
+        table: Tabla destino con esquema (sus columnas en el orden del archivo)
+        server_path: Ruta del archivo tal como la ve SQL Server
+        batch_size: Filas por transacción interna de BULK INSERT (None = todo el archivo)
+    """
+    opciones = [
+        f"FIELDTERMINATOR = '0x{ord(FIELD_TERMINATOR):02x}'",
+        f"ROWTERMINATOR = '0x{ord(ROW_TERMINATOR):02x}'",
+        "CODEPAGE = '65001'",
+        "KEEPNULLS",
+        "TABLOCK",
+    ]
+    if batch_size:
+        opciones.append(f"BATCHSIZE = {int(batch_size)}")
+    ruta = str(server_path).replace("'", "''")
+    return f"BULK INSERT {table} FROM '{ruta}' WITH ({', '.join(opciones)})"
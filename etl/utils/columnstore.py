@@ -0,0 +1,136 @@
+"""
+Módulo de Calidad de Rowgroups Columnstore
+Consulta el estado de los rowgroups de una tabla con índice columnstore
+(filas, estado y motivo de recorte) para verificar que las cargas
+comprimen directo a rowgroups completos
+"""
+from collections import Counter
+from typing import Optional
+
+# Máximo de filas de un rowgroup comprimido
+ROWGROUP_MAX_ROWS = 1048576
+
+SELECT_COLUMNSTORE = """
+    SELECT TOP 1 name
+    FROM sys.indexes
+    WHERE object_id = OBJECT_ID(?) AND type IN (5, 6)
+"""
+
+SELECT_ROWGROUPS = """
+    SELECT rg.row_group_id, rg.partition_number, rg.state_desc, rg.total_rows,
+           rg.deleted_rows, rg.size_in_bytes, rg.trim_reason_desc
+    FROM sys.dm_db_column_store_row_group_physical_stats rg
+    WHERE rg.object_id = OBJECT_ID(?)
+    ORDER BY rg.partition_number, rg.row_group_id
+"""
+
+
+def get_columnstore_index(conn, tabla: str) -> Optional[str]:
+    """
+    Obtener el nombre del índice columnstore de una tabla
+
+    Args:
+        conn: Conexión pyodbc destino
+        tabla: Tabla con esquema (ej. 'dbo.fact_ventas')
+
+    Returns:
+        Nombre del índice o None si la tabla no tiene
+    """
+    cursor = conn.cursor()
+    cursor.execute(SELECT_COLUMNSTORE, tabla)
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else None
+
+
+def get_rowgroups(conn, tabla: str) -> list:
+    """
+    Obtener los rowgroups de una tabla (sys.dm_db_column_store_row_group_physical_stats)
+
+    Returns:
+        Lista de diccionarios con row_group_id, partition_number, estado,
+        filas, filas_eliminadas, bytes y motivo_recorte
+    """
+    cursor = conn.cursor()
+    cursor.execute(SELECT_ROWGROUPS, tabla)
+    rowgroups = [
+        {
+            'row_group_id': row[0],
+            'partition_number': row[1],
+            'estado': row[2],
+            'filas': row[3],
+            'filas_eliminadas': row[4],
+            'bytes': row[5],
+            'motivo_recorte': row[6],
+        }
+        for row in cursor.fetchall()
+    ]
+    cursor.close()
+    return rowgroups
+
+
+def rowgroup_summary(rowgroups: list) -> dict:
+    """
+    Resumir la calidad de un conjunto de rowgroups
+
+    Returns:
+        Diccionario con rowgroups por estado, filas en el delta store,
+        promedio de filas por rowgroup comprimido, cuántos están completos
+        (ROWGROUP_MAX_ROWS filas), filas eliminadas y motivos de recorte
+    """
+    comprimidos = [rg for rg in rowgroups if rg['estado'] == 'COMPRESSED']
+    filas_comprimidas = sum(rg['filas'] for rg in comprimidos)
+    return {
+        'rowgroups': len(rowgroups),
+        'por_estado': dict(Counter(rg['estado'] for rg in rowgroups)),
+        'filas_delta_store': sum(rg['filas'] for rg in rowgroups if rg['estado'] in ('OPEN', 'CLOSED')),
+        'promedio_filas_comprimido': round(filas_comprimidas / len(comprimidos)) if comprimidos else 0,
+        'comprimidos_completos': sum(1 for rg in comprimidos if rg['filas'] >= ROWGROUP_MAX_ROWS),
+        'filas_eliminadas': sum(rg['filas_eliminadas'] or 0 for rg in rowgroups),
+        'motivos_recorte': dict(Counter(rg['motivo_recorte'] for rg in comprimidos
+                                        if rg['motivo_recorte'] and rg['motivo_recorte'] != 'NO_TRIM')),
+    }
+
+
+def new_rowgroups(antes: list, despues: list) -> list:
+    """Rowgroups creados o modificados entre dos lecturas de get_rowgroups"""
+    previos = {(rg['partition_number'], rg['row_group_id']): rg for rg in antes}
+    return [rg for rg in despues
+            if previos.get((rg['partition_number'], rg['row_group_id'])) != rg]
+
+
+def rowgroup_problems(antes: list, despues: list) -> list:
+    """
+    Verificar que una carga dejó rowgroups comprimidos y sin recorte
+
+    Cada rowgroup creado por una carga columnstore debe quedar COMPRESSED y
+    con NO_TRIM (ROWGROUP_MAX_ROWS filas). Se tolera el último de cada
+    partición, que recibe las filas sobrantes de la carga: puede quedar
+    recortado o, con menos de 102,400 filas, en el delta store. Los
+    rowgroups que ya existían (p. ej. con filas borradas por --merge) no
+    se evalúan.
+
+    Args:
+        antes: get_rowgroups antes de la carga
+        despues: get_rowgroups después de la carga
+
+    Returns:
+        Lista de mensajes, uno por rowgroup con problemas (vacía si todos cumplen)
+    """
+    previos = {(rg['partition_number'], rg['row_group_id']) for rg in antes}
+    creados = [rg for rg in despues if (rg['partition_number'], rg['row_group_id']) not in previos]
+    ultimos = {}
+    for rg in creados:
+        ultimos[rg['partition_number']] = max(ultimos.get(rg['partition_number'], -1), rg['row_group_id'])
+
+    problemas = []
+    for rg in creados:
+        if rg['row_group_id'] == ultimos[rg['partition_number']]:
+            continue
+        if rg['estado'] != 'COMPRESSED':
+            problemas.append(f"Rowgroup {rg['row_group_id']}: {rg['estado']} con {rg['filas']} filas "
+                             "(delta store: ¿índice columnstore no agrupado?)")
+        elif rg['motivo_recorte'] not in (None, 'NO_TRIM'):
+            problemas.append(f"Rowgroup {rg['row_group_id']}: {rg['filas']} filas, "
+                             f"recortado por {rg['motivo_recorte']}")
+    return problemas
@@ -0,0 +1,57 @@
+"""
+Módulo de Configuración del ETL
+Lee etl/config/config.yaml y expone sus valores a los procesos de carga
+"""
+import os
+from pathlib import Path
+from typing import Any
+import yaml
+
+# Ruta por defecto del archivo de configuración (se puede cambiar con ETL_CONFIG_PATH)
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'config.yaml'
+
+# Configuración cargada (se lee una sola vez por proceso)
+_config = None
+
+
+def get_config() -> dict:
+    """
+    Obtener la configuración completa del ETL
+
+    Las referencias ${VARIABLE} se reemplazan con variables de entorno.
+
+    Returns:
+        Diccionario con la configuración, vacío si no existe el archivo
+    """
+    global _config
+    if _config is None:
+        config_path = Path(os.getenv('ETL_CONFIG_PATH', CONFIG_PATH))
+        if config_path.exists():
+            with open(config_path, encoding='utf-8') as f:
+                _config = yaml.safe_load(os.path.expandvars(f.read())) or {}
+        else:
+            _config = {}
+    return _config
+
+
+def get_setting(section: str, key: str, default: Any = None) -> Any:
+    """
+    Obtener un valor de una sección de la configuración
+
+    Args:
+        section: Sección de config.yaml (ej. 'etl', 'performance')
+        key: Llave dentro de la sección
+        default: Valor por defecto si no está configurado
+
+    Returns:
+        Valor configurado o valor por defecto
+    """
+    value = (get_config().get(section) or {}).get(key)
+    return default if value is None else value
+
+
+if __name__ == "__main__":
+    print(f"Archivo: {CONFIG_PATH}")
+    print(f"etl.batch_size = {get_setting('etl', 'batch_size')}")
+    print(f"etl.lookback_days = {get_setting('etl', 'lookback_days')}")
+    print(f"etl.parallel_processes = {get_setting('etl', 'parallel_processes')}")
@@ -0,0 +1,240 @@
+"""
+Módulo de Control del ETL
+Lee y guarda las marcas de agua (watermarks) de cada proceso en dbo.etl_control
+para que las cargas incrementales extraigan solo lo nuevo, y los checkpoints
+por lote de cada ejecución en dbo.etl_checkpoints para retomar una carga fallida
+"""
+import json
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+
+SELECT_WATERMARK = """
+    SELECT ultimo_id, ultima_fecha, ultimo_updated_at
+    FROM dbo.etl_control
+    WHERE proceso = ?
+"""
+
+MERGE_WATERMARK = """
+    MERGE dbo.etl_control AS t
+    USING (SELECT ? AS proceso) AS s
+        ON t.proceso = s.proceso
+    WHEN MATCHED THEN
+        UPDATE SET ultimo_id = ?, ultima_fecha = ?, ultimo_updated_at = ?,
+                   registros_ultima_carga = ?, fecha_ultima_carga = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (proceso, ultimo_id, ultima_fecha, ultimo_updated_at,
+                registros_ultima_carga, fecha_ultima_carga)
+        VALUES (s.proceso, ?, ?, ?, ?, GETDATE());
+"""
+
+
+def get_watermark(conn, proceso: str) -> Optional[dict]:
+    """
+    Obtener la marca de agua de un proceso
+
+    Args:
+        conn: Conexión pyodbc destino
+        proceso: Nombre del proceso (ej. 'fact_ventas')
+
+    Returns:
+        Diccionario con ultimo_id, ultima_fecha y ultimo_updated_at,
+        o None si el proceso nunca se ha cargado
+    """
+    cursor = conn.cursor()
+    cursor.execute(SELECT_WATERMARK, proceso)
+    row = cursor.fetchone()
+    cursor.close()
+    if row is None:
+        return None
+    return {
+        'ultimo_id': row[0],
+        'ultima_fecha': row[1],
+        'ultimo_updated_at': row[2],
+    }
+
+
+def save_watermark(conn, proceso: str, ultimo_id: Optional[int], ultima_fecha: Optional[date],
+                   ultimo_updated_at: Optional[datetime] = None, registros: int = 0):
+    """
+    Guardar (insertar o actualizar) la marca de agua de un proceso y hacer commit
+
+    Args:
+        conn: Conexión pyodbc destino
+        proceso: Nombre del proceso
+        ultimo_id: Mayor id de origen cargado
+        ultima_fecha: Mayor fecha de negocio cargada
+        ultimo_updated_at: Mayor updated_at de origen cargado (si la tabla lo tiene)
+        registros: Registros procesados en la carga
+    """
+    valores = [ultimo_id, ultima_fecha, ultimo_updated_at, registros]
+    cursor = conn.cursor()
+    cursor.execute(MERGE_WATERMARK, [proceso] + valores + valores)
+    conn.commit()
+    cursor.close()
+
+
+def lookback(value, days: int):
+    """Restar días de margen a una marca (None se mantiene)"""
+    return value - timedelta(days=days) if value is not None else None
+
+
+class WatermarkTracker:
+    """
+    Acumula los máximos de id, fecha y updated_at de las filas extraídas
+
+    Se inicializa con la marca anterior para que la nueva nunca retroceda.
+    """
+
+    def __init__(self, id_column: str, date_column: str, updated_at_column: Optional[str] = None,
+                 previous: Optional[dict] = None):
+        """
+        Args:
+            id_column: Columna con el id de origen
+            date_column: Columna con la fecha de negocio
+            updated_at_column: Columna con el updated_at de origen (opcional)
+            previous: Marca anterior (ver get_watermark)
+        """
+        self.id_column = id_column
+        self.date_column = date_column
+        self.updated_at_column = updated_at_column
+        previous = previous or {}
+        self.ultimo_id = previous.get('ultimo_id')
+        self.ultima_fecha = previous.get('ultima_fecha')
+        self.ultimo_updated_at = previous.get('ultimo_updated_at')
+
+    @staticmethod
+    def _max(actual, valores):
+        valores = [v for v in valores if v is not None]
+        if not valores:
+            return actual
+        mayor = max(valores)
+        return mayor if actual is None or mayor > actual else actual
+
+    def observe(self, rows: list):
+        """Actualizar los máximos con un bloque de filas"""
+        self.ultimo_id = self._max(self.ultimo_id, (r[self.id_column] for r in rows))
+        self.ultima_fecha = self._max(self.ultima_fecha, (r[self.date_column] for r in rows))
+        if self.updated_at_column:
+            self.ultimo_updated_at = self._max(self.ultimo_updated_at,
+                                               (r[self.updated_at_column] for r in rows))
+
+    def track(self, chunks: Iterable[list]) -> Iterator[list]:
+        """Envolver un iterable de bloques observando cada uno al pasar"""
+        for rows in chunks:
+            self.observe(rows)
+            yield rows
+
+    def save(self, conn, proceso: str, registros: int = 0):
+        """Guardar los máximos acumulados en dbo.etl_control"""
+        save_watermark(conn, proceso, self.ultimo_id, self.ultima_fecha,
+                       self.ultimo_updated_at, registros)
+
+
+# ============================================================================
+# CHECKPOINTS POR EJECUCIÓN
+# ============================================================================
+
+INSERT_EJECUCION = """
+    INSERT INTO dbo.etl_checkpoints (ejecucion_id, proceso, parametros, estado)
+    VALUES (?, ?, ?, 'en_curso')
+"""
+
+UPDATE_CHECKPOINT = """
+    UPDATE dbo.etl_checkpoints
+    SET ultima_fecha = ?, ultimo_id = ?, ultimo_detalle_id = ?,
+        lotes = ?, filas = ?, fecha_actualizacion = GETDATE()
+    WHERE ejecucion_id = ?
+"""
+
+UPDATE_ESTADO_EJECUCION = """
+    UPDATE dbo.etl_checkpoints
+    SET estado = ?, fecha_actualizacion = GETDATE()
+    WHERE ejecucion_id = ?
+"""
+
+SELECT_ULTIMA_EJECUCION = """
+    SELECT TOP 1 ejecucion_id, parametros, estado, ultima_fecha, ultimo_id, ultimo_detalle_id,
+           lotes, filas
+    FROM dbo.etl_checkpoints
+    WHERE proceso = ?
+    ORDER BY fecha_inicio_ejecucion DESC
+"""
+
+
+def _json_default(value):
+    """Serializar fechas de los parámetros como texto ISO"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def start_run(conn, ejecucion_id: str, proceso: str, parametros: dict):
+    """
+    Registrar el inicio de una ejecución con checkpoints y hacer commit
+
+    Args:
+        conn: Conexión pyodbc destino
+        ejecucion_id: Identificador de la ejecución
+        proceso: Nombre del proceso (ej. 'fact_ventas')
+        parametros: Parámetros necesarios para retomarla (se guardan como JSON)
+    """
+    cursor = conn.cursor()
+    cursor.execute(INSERT_EJECUCION, ejecucion_id, proceso, json.dumps(parametros, default=_json_default))
+    conn.commit()
+    cursor.close()
+
+
+def save_checkpoint(cursor, ejecucion_id: str, posicion: tuple, lotes: int, filas: int):
+    """
+    Guardar la frontera del último lote escrito (sin commit)
+
+    Se ejecuta en la misma transacción que el lote, de modo que el
+    checkpoint y los datos se confirman juntos.
+
+    Args:
+        cursor: Cursor de la transacción del lote
+        ejecucion_id: Identificador de la ejecución
+        posicion: (fecha, id, id de detalle) de la última fila del lote
+        lotes: Lotes confirmados incluyendo este
+        filas: Filas escritas incluyendo este lote
+    """
+    cursor.execute(UPDATE_CHECKPOINT, *posicion, lotes, filas, ejecucion_id)
+
+
+def set_run_status(conn, ejecucion_id: str, estado: str):
+    """
+    Cambiar el estado de una ejecución ('en_curso', 'completado', 'fallido') y hacer commit
+    """
+    cursor = conn.cursor()
+    cursor.execute(UPDATE_ESTADO_EJECUCION, estado, ejecucion_id)
+    conn.commit()
+    cursor.close()
+
+
+def get_resumable_run(conn, proceso: str) -> Optional[dict]:
+    """
+    Obtener la última ejecución de un proceso si quedó sin completar
+
+    Args:
+        conn: Conexión pyodbc destino
+        proceso: Nombre del proceso
+
+    Returns:
+        Diccionario con ejecucion_id, parametros, posicion (None si no llegó a
+        confirmar ningún lote), lotes y filas; None si no hay nada que retomar
+    """
+    cursor = conn.cursor()
+    cursor.execute(SELECT_ULTIMA_EJECUCION, proceso)
+    row = cursor.fetchone()
+    cursor.close()
+    if row is None or row[2] == 'completado':
+        return None
+    return {
+        'ejecucion_id': row[0],
+        'parametros': json.loads(row[1] or '{}'),
+        'estado': row[2],
+        'posicion': (row[3], row[4], row[5]) if row[3] is not None else None,
+        'lotes': row[6] or 0,
+        'filas': row[7] or 0,
+    }
@@ -3,7 +3,10 @@ Módulo de Conexión a Bases de Datos
 Proporciona clases para conectar a MariaDB (origen) y SQL Server (destino)
 """
 import os
-from typing import Optional
+import queue
+import threading
+from datetime import datetime
+from typing import Iterator, Optional
 import pymysql
 import pyodbc
 from dotenv import load_dotenv
@@ -68,6 +71,194 @@ class SourceDatabase(DatabaseConnection):
         except Exception as e:
             print(f"Error conectando a MariaDB: {e}")
             return False
+    
+    def stream_query(self, query: str, params=None, chunk_size: int = 1000,
+                     net_write_timeout: int = 600) -> Iterator[list]:
+        """
+        Ejecutar un query con cursor del lado del servidor (SSDictCursor)
+        
+        Las filas se leen por bloques con fetchmany, sin cargar todo el
+        resultado en memoria. La conexión queda ocupada hasta terminar de
+        consumir el generador.
+        
+        Args:
+            query: Query SQL
+            params: Parámetros del query (opcional)
+            chunk_size: Filas por bloque
+            net_write_timeout: Segundos que el servidor espera a que el
+                cliente consuma filas antes de cortar la conexión
+        
+        Yields:
+            Lista de diccionarios por cada bloque
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+        try:
+            cursor.execute(f"SET SESSION net_write_timeout = {int(net_write_timeout)}")
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+    
+    def start_consistent_snapshot(self):
+        """
+        Iniciar una transacción de solo lectura con snapshot consistente
+        
+        Todas las consultas siguientes en esta conexión ven los datos tal
+        como estaban al iniciar el snapshot (REPEATABLE READ de InnoDB).
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        cursor.close()
+    
+    def has_column(self, table: str, column: str) -> bool:
+        """Verificar si una tabla de la base origen tiene una columna"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) AS total FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+            (table, column)
+        )
+        total = cursor.fetchone()['total']
+        cursor.close()
+        return total > 0
+
+    def get_server_time(self) -> datetime:
+        """Hora actual del servidor origen (base de las marcas de agua por updated_at)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT NOW() AS ahora")
+        ahora = cursor.fetchone()['ahora']
+        cursor.close()
+        return ahora
+
+    def iter_rows(self, query: str, params=None, chunk_size: int = 1000) -> Iterator[dict]:
+        """
+        Igual que stream_query pero entregando fila por fila
+        
+        Yields:
+            Diccionario por cada fila
+        """
+        for rows in self.stream_query(query, params, chunk_size):
+            yield from rows
+
+
+def open_consistent_snapshots(databases: list, sync_lock: bool = False) -> bool:
+    """
+    Abrir un snapshot consistente en varias conexiones origen
+    
+    Con sync_lock se toma FLUSH TABLES WITH READ LOCK mientras se abren los
+    snapshots, de modo que todas las conexiones ven exactamente el mismo
+    punto en el tiempo (requiere privilegio RELOAD y bloquea escrituras
+    durante unos milisegundos). Sin él, los snapshots se abren uno tras otro.
+    
+    Args:
+        databases: Lista de SourceDatabase
+        sync_lock: Sincronizar los snapshots con un bloqueo global de lectura
+    
+    Returns:
+        True si los snapshots quedaron sincronizados por el bloqueo
+    """
+    lock_db = SourceDatabase() if sync_lock else None
+    locked = False
+    try:
+        if lock_db:
+            lock_cursor = lock_db.get_connection().cursor()
+            try:
+                lock_cursor.execute("FLUSH TABLES WITH READ LOCK")
+                locked = True
+            except pymysql.MySQLError as e:
+                print(f"No se pudo sincronizar snapshots (FLUSH TABLES WITH READ LOCK): {e}")
+        
+        for db in databases:
+            db.start_consistent_snapshot()
+    finally:
+        if locked:
+            lock_cursor.execute("UNLOCK TABLES")
+        if lock_db:
+            lock_db.close()
+    return locked
+
+
+def stream_partitions(partitions: list, chunk_size: int = 1000, workers: int = 4,
+                      consistent_snapshot: bool = True, sync_lock: bool = False,
+                      queue_size: int = 8) -> Iterator[list]:
+    """
+    Extraer varias particiones de un query en paralelo
+    
+    Cada hilo usa su propia conexión SourceDatabase y recorre en streaming
+    las particiones que le tocan; los bloques se entregan en el orden en que
+    llegan (sin orden global entre particiones).
+    
+    Args:
+        partitions: Lista de tuplas (query, params), una por partición
+        chunk_size: Filas por bloque
+        workers: Conexiones concurrentes (como máximo una por partición)
+        consistent_snapshot: Iniciar cada conexión con START TRANSACTION WITH CONSISTENT SNAPSHOT
+        sync_lock: Ver open_consistent_snapshots
+        queue_size: Bloques en espera antes de frenar a los hilos extractores
+    
+    Yields:
+        Lista de diccionarios por cada bloque
+    """
+    workers = max(1, min(workers, len(partitions)))
+    databases = [SourceDatabase() for _ in range(workers)]
+    chunks = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def extract(db: SourceDatabase, assigned: list):
+        try:
+            for query, params in assigned:
+                for rows in db.stream_query(query, params, chunk_size):
+                    if not put(rows):
+                        return
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+    
+    try:
+        if consistent_snapshot:
+            open_consistent_snapshots(databases, sync_lock)
+        
+        threads = [
+            threading.Thread(target=extract, args=(db, partitions[i::workers]),
+                             name=f'etl-particion-{i}', daemon=True)
+            for i, db in enumerate(databases)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        pending = len(threads)
+        while pending:
+            item = chunks.get()
+            if item is done:
+                pending -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        for db in databases:
+            db.close()
 
 
 class TargetDatabase(DatabaseConnection):
@@ -0,0 +1,259 @@
+"""
+Módulo de Carga Genérica de Dimensiones SCD Tipo 2
+Cada dimensión con versiones se describe en la sección dimensions de
+config.yaml (query origen, llave natural, atributos con su limpieza) y se
+carga con un mismo motor: hash de atributos para detectar cambios y escritura
+de versiones por lotes vía staging (etl/utils/scd.py). La carga incremental
+extrae solo las filas de origen modificadas desde la marca de agua de cada
+tabla origen (dbo.etl_control)
+"""
+from datetime import date, datetime
+from typing import Optional
+
+from etl.utils.config import get_config, get_setting
+from etl.utils.control import get_watermark, save_watermark, lookback
+from etl.utils.helpers import clean_string, safe_date
+from etl.utils.schema import get_target_schema, TypedParameters
+from etl.utils.scd import HASH_COLUMN, NUEVO, MODIFICADO, INFERIDO, attribute_hash
+
+
+# Marcador del query origen donde se agregan los filtros de marca de agua
+MARCADOR_FILTROS = '{filtros}'
+
+# Columnas de marca de agua por defecto de cada tabla origen
+COLUMNAS_WATERMARK = ('updated_at', 'created_at')
+
+# Limpiezas disponibles para los atributos (null en config.yaml = valor sin cambios)
+LIMPIEZAS = {
+    'texto': clean_string,
+    'fecha': safe_date,
+}
+
+
+class DimensionSpec:
+    """
+    Descripción de una dimensión SCD2 (una entrada de dimensions en config.yaml)
+
+    Llaves de la entrada:
+        name, table_target, scd_type: 2
+        natural_id: columna de la llave natural (la misma en el origen y el DW)
+        inferred: si la dimensión admite miembros inferidos (columna es_inferido)
+        source.query: SELECT con una fila por llave natural y columnas con el
+            nombre de las columnas destino
+        attributes: columna destino -> limpieza (ver LIMPIEZAS); todas entran
+            en el hash y un cambio en cualquiera abre una versión nueva
+        watermarks: tablas origen {table, alias, columns, link} cuyos cambios
+            filtran la carga incremental vía el marcador {filtros} del query;
+            columns por defecto COLUMNAS_WATERMARK, link une una tabla que no
+            está en el FROM (condición de un EXISTS)
+    """
+
+    def __init__(self, config: dict):
+        self.name = config.get('name')
+        self.table = config.get('table_target')
+        self.natural_id = config.get('natural_id')
+        if not self.name or not self.table or not self.natural_id:
+            raise ValueError("Cada dimensión SCD2 requiere name, table_target y natural_id")
+        self.query = (config.get('source') or {}).get('query')
+        if not self.query:
+            raise ValueError(f"Dimensión {self.name}: falta source.query")
+        self.inferred = bool(config.get('inferred', False))
+
+        self.watermarks = []
+        for fuente in config.get('watermarks') or []:
+            if not fuente.get('table') or not fuente.get('alias'):
+                raise ValueError(f"Dimensión {self.name}: cada watermark requiere table y alias")
+            self.watermarks.append({
+                'table': fuente['table'],
+                'alias': fuente['alias'],
+                'columns': tuple(fuente.get('columns') or COLUMNAS_WATERMARK),
+                'link': fuente.get('link'),
+            })
+        if self.watermarks and MARCADOR_FILTROS not in self.query:
+            raise ValueError(f"Dimensión {self.name}: source.query debe incluir el marcador {MARCADOR_FILTROS} "
+                             f"para usar watermarks")
+
+        atributos = config.get('attributes') or {}
+        if not atributos:
+            raise ValueError(f"Dimensión {self.name}: falta attributes")
+        desconocidas = [l for l in atributos.values() if l is not None and l not in LIMPIEZAS]
+        if desconocidas:
+            raise ValueError(f"Dimensión {self.name}: limpiezas no soportadas: {', '.join(desconocidas)} "
+                             f"(disponibles: {', '.join(LIMPIEZAS)})")
+        self.attributes = tuple(atributos)
+        self._limpiezas = tuple(LIMPIEZAS.get(l) for l in atributos.values())
+
+        # Columnas de cada versión: llave, atributos, hash y versión (las de stg_<tabla>)
+        self.columns = (self.natural_id,) + self.attributes + (HASH_COLUMN, 'version')
+        esquema = get_target_schema().get(self.target.lower())
+        if esquema is None:
+            raise ValueError(f"Dimensión {self.name}: {self.target} no está definida en database/target")
+        faltantes = [c for c in self.columns if c not in esquema]
+        if faltantes:
+            raise ValueError(f"Dimensión {self.name}: columnas no definidas en {self.target}: "
+                             f"{', '.join(faltantes)}")
+        # Tipos destino de los atributos: el hash se calcula sobre los valores
+        # tal como quedan guardados, igual para el origen y para el DW
+        self.types = TypedParameters(self.target, self.attributes)
+
+    @property
+    def target(self) -> str:
+        """Tabla destino con esquema"""
+        return f"dbo.{self.table}"
+
+    @property
+    def proceso(self) -> str:
+        """Nombre del proceso en dbo.etl_control"""
+        return self.table
+
+    def watermark_proceso(self, tabla: str) -> str:
+        """Nombre en dbo.etl_control de la marca de agua de una tabla origen"""
+        return f"{self.table}.{tabla}"
+
+    def transform(self, row: dict) -> tuple:
+        """Llave natural y atributos limpios de una fila extraída (sin hash ni versión)"""
+        valores = [row[self.natural_id]]
+        for columna, limpieza in zip(self.attributes, self._limpiezas):
+            valor = row.get(columna)
+            valores.append(limpieza(valor) if limpieza else valor)
+        return tuple(valores)
+
+    def hash(self, params: tuple) -> bytes:
+        """Hash de los atributos de una fila transformada (sin la llave natural)"""
+        return attribute_hash(self.types.normalize(params[1:]))
+
+
+def get_dimension_specs(enabled_only: bool = True) -> list:
+    """
+    Dimensiones SCD2 declaradas en config.yaml con carga genérica (entradas con source)
+
+    Args:
+        enabled_only: Si True, omite las que tienen enabled: false
+
+    Returns:
+        Lista de DimensionSpec
+    """
+    return [DimensionSpec(entrada) for entrada in get_config().get('dimensions') or []
+            if entrada.get('scd_type') == 2 and entrada.get('source')
+            and (entrada.get('enabled', True) or not enabled_only)]
+
+
+def get_dimension_spec(nombre: str) -> DimensionSpec:
+    """Obtener una dimensión SCD2 por nombre (ej. 'cliente')"""
+    for entrada in get_config().get('dimensions') or []:
+        if entrada.get('name') == nombre and entrada.get('scd_type') == 2 and entrada.get('source'):
+            return DimensionSpec(entrada)
+    raise ValueError(f"Dimensión SCD2 no declarada en config.yaml (dimensions con source): {nombre}")
+
+
+def classify_version(actual: Optional[tuple], hash_atributos: bytes) -> Optional[tuple]:
+    """
+    Decidir qué hacer con una fila de origen frente a la versión actual del DW
+
+    Args:
+        actual: (hash, version[, es_inferido]) de get_current_hashes, None si la llave es nueva
+        hash_atributos: Hash de los atributos de origen
+
+    Returns:
+        (accion, version) para la staging, o None si no hay cambios; el INSERT
+        de la versión nueva la recalcula como MAX(version) + 1 de la llave
+    """
+    if actual is None:
+        return NUEVO, 1
+    if len(actual) > 2 and actual[2]:
+        # Miembro inferido por un hecho: se completa sin crear versión
+        return INFERIDO, actual[1] or 1
+    if actual[0] != hash_atributos:
+        return MODIFICADO, (actual[1] or 1) + 1
+    return None
+
+
+def build_dimension_query(spec: DimensionSpec, desde: Optional[dict] = None,
+                          columnas: Optional[dict] = None) -> tuple:
+    """
+    Construir el query de extracción con los filtros de marca de agua
+
+    Entra toda fila con algún cambio en cualquiera de las tablas origen
+    (condiciones combinadas con OR).
+
+    Args:
+        spec: Dimensión
+        desde: Tabla origen -> updated_at desde el que extraer; None = todo el origen
+        columnas: Tabla origen -> columnas de marca de agua que existen en ella
+
+    Returns:
+        Tupla (query, params) para pymysql
+    """
+    condiciones = []
+    params = []
+    if desde is not None:
+        for fuente in spec.watermarks:
+            cambios = [f"{fuente['alias']}.{columna} >= %s" for columna in columnas[fuente['table']]]
+            params.extend([desde[fuente['table']]] * len(cambios))
+            condicion = ' OR '.join(cambios)
+            if fuente['link']:
+                condicion = (f"EXISTS (SELECT 1 FROM {fuente['table']} {fuente['alias']} "
+                             f"WHERE {fuente['link']} AND ({condicion}))")
+            condiciones.append(f"({condicion})")
+    filtros = f" AND ({' OR '.join(condiciones)})" if condiciones else ""
+    return spec.query.replace(MARCADOR_FILTROS, filtros), (params or None)
+
+
+def get_incremental_window(target_conn, spec: DimensionSpec, columnas: dict) -> tuple:
+    """
+    Marcas de agua desde las que extraer una carga incremental
+
+    La carga recorre todo el origen si la dimensión no declara watermarks, si
+    alguna tabla origen no tiene marca de agua (o columnas para filtrarla) o si
+    el último barrido completo tiene etl.dimension_full_sweep_days o más.
+
+    Args:
+        target_conn: Conexión pyodbc destino
+        spec: Dimensión
+        columnas: Tabla origen -> columnas de marca de agua que existen en ella
+
+    Returns:
+        Tupla (desde, motivo): desde es tabla origen -> updated_at menos
+        etl.lookback_days, o None con el motivo para recorrer todo el origen
+    """
+    if not spec.watermarks:
+        return None, "la dimensión no declara watermarks"
+
+    barrido = get_watermark(target_conn, spec.proceso)
+    if barrido is None or barrido['ultima_fecha'] is None:
+        return None, "no hay un barrido completo previo"
+    dias_barrido = get_setting('etl', 'dimension_full_sweep_days', 7)
+    if dias_barrido and (date.today() - barrido['ultima_fecha']).days >= dias_barrido:
+        return None, f"el último barrido completo fue el {barrido['ultima_fecha']}"
+
+    dias = get_setting('etl', 'lookback_days', 7)
+    desde = {}
+    for fuente in spec.watermarks:
+        tabla = fuente['table']
+        if not columnas.get(tabla):
+            return None, f"{tabla} no tiene {' ni '.join(fuente['columns'])}"
+        marca = get_watermark(target_conn, spec.watermark_proceso(tabla))
+        if marca is None or marca['ultimo_updated_at'] is None:
+            return None, f"no hay marca de agua de {tabla}"
+        desde[tabla] = lookback(marca['ultimo_updated_at'], dias)
+    return desde, None
+
+
+def save_dimension_watermarks(target_conn, spec: DimensionSpec, columnas: dict, inicio: datetime,
+                              registros: int = 0, barrido: bool = False):
+    """
+    Guardar en dbo.etl_control la marca de agua de cada tabla origen
+
+    Args:
+        target_conn: Conexión pyodbc destino
+        spec: Dimensión
+        columnas: Tabla origen -> columnas de marca de agua que existen en ella
+        inicio: Hora del servidor origen al iniciar la extracción
+        registros: Filas extraídas
+        barrido: Si True, la carga recorrió todo el origen (fecha del último barrido)
+    """
+    for fuente in spec.watermarks:
+        if columnas.get(fuente['table']):
+            save_watermark(target_conn, spec.watermark_proceso(fuente['table']), None, None, inicio, registros)
+    if barrido:
+        save_watermark(target_conn, spec.proceso, None, inicio.date(), inicio, registros)
@@ -0,0 +1,583 @@
+"""
+Módulo de Carga Genérica de Hechos
+Cada tabla de hechos se describe en la sección facts de config.yaml (query
+origen, llave natural, roles de dimensión, medidas) y se carga con un mismo
+motor: extracción en streaming, resolución de keys y medidas por bloque en
+forma columnar, y escritura con los escritores por lotes, MERGE, columnstore
+o BULK INSERT
+"""
+import ast
+from functools import reduce
+from typing import Callable, Optional
+import numpy as np
+
+from etl.utils.config import get_config, get_setting
+from etl.utils.schema import get_target_schema, TypedParameters
+from etl.utils.scd import AsOfKeys, get_scd_keys, map_scd_keys, to_days
+from etl.utils.vectorized import rows_to_frame, truthy_mask, to_float, map_keys, to_sql_list
+from etl.utils.writers import (create_writer, MergeWriter, ColumnstoreWriter, BulkInsertWriter,
+                               COLUMNSTORE_MIN_ROWS)
+
+
+# Dimensiones conocidas: tabla, llave natural, surrogate key y si tiene versiones (SCD2)
+# Un rol de dimensión puede indicar su propia tabla/natural_id/key/scd2
+DIMENSIONS = {
+    'tiempo': {'tabla': 'dim_tiempo', 'natural_id': 'fecha', 'key': 'tiempo_key', 'scd2': False},
+    'cliente': {'tabla': 'dim_cliente', 'natural_id': 'cliente_id', 'key': 'cliente_key', 'scd2': True},
+    'producto': {'tabla': 'dim_producto', 'natural_id': 'producto_id', 'key': 'producto_key', 'scd2': True},
+    'vendedor': {'tabla': 'dim_vendedor', 'natural_id': 'vendedor_id', 'key': 'vendedor_key', 'scd2': True},
+    'tipo_documento': {'tabla': 'dim_tipo_documento', 'natural_id': 'tipo_documento_id',
+                       'key': 'tipo_documento_key', 'scd2': False},
+    'condicion_pago': {'tabla': 'dim_condicion_pago', 'natural_id': 'condicion_pago_id',
+                       'key': 'condicion_pago_key', 'scd2': False},
+    'estado_venta': {'tabla': 'dim_estado_venta', 'natural_id': 'estado_venta_id',
+                     'key': 'estado_venta_key', 'scd2': False},
+    'ubicacion': {'tabla': 'dim_ubicacion', 'natural_id': 'municipio_id', 'key': 'ubicacion_key', 'scd2': False},
+}
+
+# Funciones disponibles en las expresiones de medidas (operan sobre arreglos NumPy)
+FUNCIONES_MEDIDAS = {
+    'where': np.where,
+    'abs': np.abs,
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+    'round': np.round,
+}
+
+# Operadores permitidos en las expresiones de medidas (equivalente NumPy de cada nodo)
+OPERADORES_MEDIDAS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide,
+    ast.Mod: np.mod, ast.Pow: np.power,
+    ast.UAdd: np.positive, ast.USub: np.negative, ast.Not: np.logical_not,
+    ast.And: np.logical_and, ast.Or: np.logical_or,
+    ast.Eq: np.equal, ast.NotEq: np.not_equal, ast.Lt: np.less, ast.LtE: np.less_equal,
+    ast.Gt: np.greater, ast.GtE: np.greater_equal,
+}
+
+# Nodos de la sintaxis de Python que puede tener una expresión de medida
+_NODOS_MEDIDAS = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Call,
+                  ast.Name, ast.Load, ast.Constant) + tuple(OPERADORES_MEDIDAS)
+
+# Columnas de auditoría que el motor llena con GETDATE() si la tabla las tiene
+COLUMNA_FECHA_CARGA = 'fecha_carga'
+COLUMNA_FECHA_ACTUALIZACION = 'fecha_actualizacion'
+
+# Marcador del query origen donde se agregan los filtros de fechas y marca de agua
+MARCADOR_FILTROS = '{filtros}'
+
+
+class FactSpec:
+    """
+    Descripción de una tabla de hechos (una entrada de facts en config.yaml)
+
+    Llaves de la entrada:
+        name, table_target
+        source.query: SELECT con el marcador {filtros} después de su WHERE
+        source.date_column / source.id_column: expresiones SQL de fecha de
+            negocio e id para el rango de fechas y la marca de agua
+        source.date_alias / source.id_alias: las mismas columnas en el resultado
+        source.order_by: orden de extracción (opcional)
+        natural_key: columnas destino que identifican una fila (MERGE)
+        dimensions: roles {role, dimension, column, required}
+        attributes: columna destino -> columna extraída (sin transformar)
+        measures: columna destino -> expresión sobre columnas extraídas o
+            medidas anteriores (nulos = 0, ver parse_measure)
+        flags: columna destino -> columna extraída (1 si tiene valor)
+    """
+
+    def __init__(self, config: dict):
+        self.name = config.get('name')
+        self.table = config.get('table_target')
+        if not self.name or not self.table:
+            raise ValueError("Cada hecho requiere name y table_target")
+        source = config.get('source') or {}
+        self.query = source.get('query')
+        if not self.query or MARCADOR_FILTROS not in self.query:
+            raise ValueError(f"Hecho {self.name}: source.query debe incluir el marcador {MARCADOR_FILTROS}")
+        self.date_column = source.get('date_column')
+        self.date_alias = source.get('date_alias')
+        self.id_column = source.get('id_column')
+        self.id_alias = source.get('id_alias')
+        self.order_by = source.get('order_by')
+
+        self.dimensions = [self._role(entrada) for entrada in config.get('dimensions') or []]
+        self.attributes = dict(config.get('attributes') or {})
+        self.measures = dict(config.get('measures') or {})
+        self.flags = dict(config.get('flags') or {})
+        self._expresiones = {columna: parse_measure(expresion, f"Hecho {self.name}, medida {columna}")
+                             for columna, expresion in self.measures.items()}
+
+        # Columnas destino en el orden del DDL (el mismo de la staging y de los archivos de carga)
+        esquema = get_target_schema().get(self.target.lower())
+        if esquema is None:
+            raise ValueError(f"Hecho {self.name}: {self.target} no está definida en database/target")
+        definidas = [rol['role'] for rol in self.dimensions] + list(self.attributes) + \
+            list(self.measures) + list(self.flags)
+        faltantes = [c for c in definidas if c not in esquema]
+        if faltantes:
+            raise ValueError(f"Hecho {self.name}: columnas no definidas en {self.target}: {', '.join(faltantes)}")
+        self.columns = tuple(c for c in esquema if c in definidas)
+        self.natural_key = tuple(config.get('natural_key') or ())
+        if any(c not in self.columns for c in self.natural_key):
+            raise ValueError(f"Hecho {self.name}: la llave natural debe estar entre las columnas cargadas")
+        self.audit_insert = COLUMNA_FECHA_CARGA in esquema
+        self.audit_update = COLUMNA_FECHA_ACTUALIZACION in esquema
+
+    def _role(self, entrada: dict) -> dict:
+        """Completar un rol de dimensión con los datos de DIMENSIONS"""
+        nombre = entrada.get('dimension')
+        rol = {**DIMENSIONS.get(nombre, {}), **entrada}
+        for llave in ('role', 'dimension', 'column', 'tabla', 'natural_id', 'key'):
+            if not rol.get(llave):
+                raise ValueError(f"Hecho {self.name}: al rol {entrada} le falta '{llave}'")
+        rol.setdefault('scd2', False)
+        rol.setdefault('required', False)
+        return rol
+
+    @property
+    def target(self) -> str:
+        """Tabla destino con esquema"""
+        return f"dbo.{self.table}"
+
+    @property
+    def stage_table(self) -> str:
+        """Tabla de staging (MERGE, columnstore y BULK INSERT)"""
+        return f"dbo.stg_{self.table}"
+
+    @property
+    def proceso(self) -> str:
+        """Nombre del proceso en dbo.etl_control"""
+        return self.table
+
+
+def parse_measure(expresion: str, nombre: str = 'Medida') -> ast.expr:
+    """
+    Validar la expresión de una medida y devolver su árbol sintáctico
+
+    Solo se admiten números, nombres de columnas, los operadores de
+    OPERADORES_MEDIDAS y llamadas a FUNCIONES_MEDIDAS con argumentos
+    posicionales; nunca se ejecuta código de config.yaml.
+
+    Args:
+        expresion: Expresión (ej. "where(venta_total > 0, margen_bruto / venta_total * 100, 0.0)")
+        nombre: Contexto para los mensajes de error
+
+    Raises:
+        ValueError: Si la expresión no es válida o usa algo no permitido
+    """
+    try:
+        arbol = ast.parse(str(expresion).strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"{nombre}: expresión inválida '{expresion}' ({e.msg})")
+    for nodo in ast.walk(arbol):
+        if not isinstance(nodo, _NODOS_MEDIDAS):
+            raise ValueError(f"{nombre}: '{expresion}' usa una construcción no permitida "
+                             f"({type(nodo).__name__})")
+        if isinstance(nodo, ast.Constant) and type(nodo.value) not in (int, float):
+            raise ValueError(f"{nombre}: '{expresion}' solo admite constantes numéricas")
+        if isinstance(nodo, ast.Call) and not (isinstance(nodo.func, ast.Name) and nodo.func.id in FUNCIONES_MEDIDAS
+                                               and not nodo.keywords):
+            raise ValueError(f"{nombre}: '{expresion}' solo puede llamar a "
+                             f"{', '.join(FUNCIONES_MEDIDAS)} (con argumentos posicionales)")
+    return arbol.body
+
+
+def evaluate_measure(nodo: ast.expr, columnas):
+    """
+    Evaluar una expresión de parse_measure sobre arreglos NumPy
+
+    Args:
+        nodo: Árbol de parse_measure
+        columnas: Mapeo nombre -> arreglo (columnas extraídas y medidas anteriores)
+
+    Returns:
+        Arreglo (o escalar si la expresión no usa columnas)
+    """
+    if isinstance(nodo, ast.Constant):
+        return nodo.value
+    if isinstance(nodo, ast.Name):
+        return columnas[nodo.id]
+    if isinstance(nodo, ast.BinOp):
+        return OPERADORES_MEDIDAS[type(nodo.op)](evaluate_measure(nodo.left, columnas),
+                                                 evaluate_measure(nodo.right, columnas))
+    if isinstance(nodo, ast.UnaryOp):
+        return OPERADORES_MEDIDAS[type(nodo.op)](evaluate_measure(nodo.operand, columnas))
+    if isinstance(nodo, ast.BoolOp):
+        return reduce(OPERADORES_MEDIDAS[type(nodo.op)], [evaluate_measure(v, columnas) for v in nodo.values])
+    if isinstance(nodo, ast.Compare):
+        # a < b < c equivale a (a < b) and (b < c)
+        izquierda = evaluate_measure(nodo.left, columnas)
+        resultado = True
+        for operador, comparado in zip(nodo.ops, nodo.comparators):
+            derecha = evaluate_measure(comparado, columnas)
+            resultado = np.logical_and(resultado, OPERADORES_MEDIDAS[type(operador)](izquierda, derecha))
+            izquierda = derecha
+        return resultado
+    # ast.Call (parse_measure solo admite FUNCIONES_MEDIDAS)
+    return FUNCIONES_MEDIDAS[nodo.func.id](*[evaluate_measure(arg, columnas) for arg in nodo.args])
+
+
+def get_fact_specs(enabled_only: bool = True) -> list:
+    """
+    Hechos declarados en config.yaml con carga genérica (entradas con source)
+
+    Args:
+        enabled_only: Si True, omite los que tienen enabled: false
+
+    Returns:
+        Lista de FactSpec
+    """
+    return [FactSpec(entrada) for entrada in get_config().get('facts') or []
+            if entrada.get('source') and (entrada.get('enabled', True) or not enabled_only)]
+
+
+def get_fact_spec(nombre: str) -> FactSpec:
+    """Obtener un hecho por nombre (ej. 'ventas_diarias')"""
+    for entrada in get_config().get('facts') or []:
+        if entrada.get('name') == nombre and entrada.get('source'):
+            return FactSpec(entrada)
+    raise ValueError(f"Hecho no declarado en config.yaml (facts con source): {nombre}")
+
+
+def build_fact_query(spec: FactSpec, fecha_inicio=None, fecha_fin=None, desde_id=None) -> tuple:
+    """
+    Construir el query de extracción con los filtros parametrizados
+
+    Igual que en fact_ventas, fecha_inicio y desde_id se combinan con OR:
+    entra toda fila dentro de la ventana de fechas o con id posterior a la
+    marca de agua.
+
+    Returns:
+        Tupla (query, params) para pymysql
+    """
+    if (fecha_inicio or fecha_fin) and not spec.date_column:
+        raise ValueError(f"Hecho {spec.name}: filtrar por fechas requiere source.date_column")
+    filtros = ""
+    params = []
+    desde = []
+    if fecha_inicio:
+        desde.append(f"{spec.date_column} >= %s")
+        params.append(fecha_inicio)
+    if desde_id is not None and spec.id_column:
+        desde.append(f"{spec.id_column} > %s")
+        params.append(desde_id)
+    if desde:
+        filtros += f" AND ({' OR '.join(desde)})"
+    if fecha_fin:
+        filtros += f" AND {spec.date_column} <= %s"
+        params.append(fecha_fin)
+    query = spec.query.replace(MARCADOR_FILTROS, filtros)
+    if spec.order_by:
+        query = f"{query.rstrip()}\n        ORDER BY {spec.order_by}"
+    return query, params
+
+
+def load_dimension_keys(target_cursor, spec: FactSpec, as_of: bool = False) -> dict:
+    """
+    Cargar los mapeos de las dimensiones que usa un hecho (una vez por dimensión)
+
+    Returns:
+        Diccionario dimensión -> mapeo (AsOfKeys para SCD2 con as_of)
+    """
+    dim_keys = {}
+    for rol in spec.dimensions:
+        if rol['dimension'] in dim_keys:
+            continue
+        if rol['scd2']:
+            dim_keys[rol['dimension']] = get_scd_keys(target_cursor, rol['tabla'], rol['natural_id'],
+                                                      rol['key'], as_of)
+        else:
+            target_cursor.execute(f"SELECT {rol['key']}, {rol['natural_id']} FROM dbo.{rol['tabla']}")
+            dim_keys[rol['dimension']] = {row[1]: row[0] for row in target_cursor.fetchall()}
+    return dim_keys
+
+
+class _Columnas(dict):
+    """Espacio de nombres de las expresiones: medidas ya calculadas o columnas extraídas como float"""
+
+    def __init__(self, frame):
+        super().__init__()
+        self.frame = frame
+
+    def __missing__(self, nombre):
+        if nombre not in self.frame.columns:
+            raise KeyError(f"Columna no extraída en el query origen: {nombre}")
+        valores = to_float(self.frame[nombre])
+        self[nombre] = valores
+        return valores
+
+
+def transform_fact_rows(spec: FactSpec, rows: list, dim_keys: dict, stats: dict) -> list:
+    """
+    Transformar un bloque de filas extraídas en parámetros del destino (columnar)
+
+    Las filas sin alguna dimensión obligatoria se omiten y se cuentan.
+
+    Args:
+        spec: Hecho
+        rows: Filas extraídas (diccionarios)
+        dim_keys: Mapeos de load_dimension_keys
+        stats: Contadores extraidos, omitidos y errores (se actualizan)
+
+    Returns:
+        Lista de tuplas en el orden de spec.columns
+    """
+    df = rows_to_frame(rows)
+    n = len(df)
+    valores = {}
+    missing = np.zeros(n, dtype=bool)
+    fechas = df[spec.date_alias] if spec.date_alias else [None] * n
+
+    # Roles de dimensión (la fecha se convierte una sola vez para todos los roles por fecha)
+    dias = None
+    if any(isinstance(mapping, AsOfKeys) for mapping in dim_keys.values()):
+        dias = to_days(fechas)
+    faltantes = {}
+    for rol in spec.dimensions:
+        naturales = df[rol['column']]
+        mapping = dim_keys[rol['dimension']]
+        if rol['scd2']:
+            keys = map_scd_keys(naturales, fechas, mapping, dias)
+        else:
+            keys = map_keys(naturales, mapping)
+        # Sin llave natural -> NULL (mismo criterio que bool(valor))
+        keys[~truthy_mask(naturales)] = np.nan
+        if rol['required']:
+            sin_key = np.isnan(keys) | (keys == 0)
+            faltantes[rol['role']] = sin_key
+            missing |= sin_key
+        valores[rol['role']] = keys
+
+    # Medidas, en el orden declarado (cada una puede usar las anteriores)
+    columnas = _Columnas(df)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for columna, expresion in spec._expresiones.items():
+            resultado = evaluate_measure(expresion, columnas)
+            resultado = np.broadcast_to(np.asarray(resultado, dtype='float64'), (n,))
+            columnas[columna] = resultado
+            valores[columna] = resultado
+
+    for columna, origen in spec.flags.items():
+        valores[columna] = truthy_mask(df[origen]).astype(np.int64)
+    for columna, origen in spec.attributes.items():
+        valores[columna] = df[origen].to_numpy()
+
+    stats['extraidos'] += n
+    skipped = np.flatnonzero(missing)
+    stats['omitidos'] += len(skipped)
+    for i in skipped[:max(0, 5 - len(stats['errores']))]:
+        llave = ', '.join(f"{c} {valores[c][i]}" for c in spec.natural_key) or f"fila {i}"
+        roles = ', '.join(rol for rol, sin_key in faltantes.items() if sin_key[i])
+        stats['errores'].append(f"{llave}: Falta key de dimensión ({roles})")
+
+    valid = ~missing
+    roles = {rol['role'] for rol in spec.dimensions}
+    salida = []
+    for columna in spec.columns:
+        columna_valores = valores[columna][valid]
+        if columna in roles:
+            salida.append(to_sql_list(columna_valores, as_int=True))
+        elif columna in spec.measures:
+            salida.append(to_sql_list(columna_valores))
+        else:
+            salida.append(columna_valores.tolist())
+    return list(zip(*salida))
+
+
+def build_insert_sql(spec: FactSpec, stage: bool = False) -> str:
+    """INSERT parametrizado sobre el destino o la staging"""
+    columnas = ', '.join(spec.columns)
+    parametros = ', '.join('?' * len(spec.columns))
+    if stage:
+        return f"INSERT INTO {spec.stage_table} ({columnas}) VALUES ({parametros})"
+    if spec.audit_insert:
+        return f"INSERT INTO {spec.target} ({columnas}, {COLUMNA_FECHA_CARGA}) VALUES ({parametros}, GETDATE())"
+    return f"INSERT INTO {spec.target} ({columnas}) VALUES ({parametros})"
+
+
+def build_insert_select_sql(spec: FactSpec) -> str:
+    """INSERT ... SELECT WITH (TABLOCK) de la staging al destino (carga masiva)"""
+    columnas = ', '.join(spec.columns)
+    if spec.audit_insert:
+        return (f"INSERT INTO {spec.target} WITH (TABLOCK) ({columnas}, {COLUMNA_FECHA_CARGA}) "
+                f"SELECT {columnas}, GETDATE() FROM {spec.stage_table}")
+    return f"INSERT INTO {spec.target} WITH (TABLOCK) ({columnas}) SELECT {columnas} FROM {spec.stage_table}"
+
+
+def build_merge_sql(spec: FactSpec) -> str:
+    """
+    MERGE de la staging al destino por la llave natural: inserta las filas
+    nuevas y actualiza solo las que cambiaron
+    """
+    if not spec.natural_key:
+        raise ValueError(f"Hecho {spec.name}: MERGE requiere natural_key")
+    atributos = [c for c in spec.columns if c not in spec.natural_key]
+    on = ' AND '.join(f"t.{c} = s.{c}" for c in spec.natural_key)
+    update = ', '.join(f"{c} = s.{c}" for c in atributos)
+    if spec.audit_update:
+        update += f", {COLUMNA_FECHA_ACTUALIZACION} = GETDATE()"
+    insert_columnas = ', '.join(spec.columns)
+    insert_valores = ', '.join('s.' + c for c in spec.columns)
+    if spec.audit_insert:
+        insert_columnas += f", {COLUMNA_FECHA_CARGA}"
+        insert_valores += ", GETDATE()"
+    return f"""
+    MERGE {spec.target} WITH (HOLDLOCK) AS t
+    USING {spec.stage_table} AS s
+        ON {on}
+    WHEN MATCHED AND EXISTS (
+        SELECT {', '.join('s.' + c for c in atributos)}
+        EXCEPT
+        SELECT {', '.join('t.' + c for c in atributos)}
+    ) THEN
+        UPDATE SET {update}
+    WHEN NOT MATCHED BY TARGET THEN
+        INSERT ({insert_columnas})
+        VALUES ({insert_valores});
+    """
+
+
+def build_delete_staged_sql(spec: FactSpec) -> str:
+    """DELETE de las filas del destino que vienen en la staging (por la llave natural)"""
+    if not spec.natural_key:
+        raise ValueError(f"Hecho {spec.name}: reemplazar filas requiere natural_key")
+    on = ' AND '.join(f"t.{c} = s.{c}" for c in spec.natural_key)
+    return f"DELETE t FROM {spec.target} t INNER JOIN {spec.stage_table} s ON {on}"
+
+
+def ensure_stage_table(conn, spec: FactSpec):
+    """
+    Crear la staging del hecho si no existe, con las columnas cargadas y sus
+    tipos tomados del destino (SELECT TOP 0 ... INTO)
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        IF OBJECT_ID('{spec.stage_table}', 'U') IS NULL
+            SELECT TOP 0 {', '.join(spec.columns)} INTO {spec.stage_table} FROM {spec.target}
+    """)
+    conn.commit()
+    cursor.close()
+
+
+def fact_statements(spec: FactSpec, merge: bool = False) -> dict:
+    """
+    Sentencias de escritura de un hecho (ver create_staged_writer)
+
+    Args:
+        spec: Hecho
+        merge: Si True, incluye el MERGE y el reemplazo por la llave natural
+    """
+    sentencias = {
+        'insert': build_insert_sql(spec),
+        'stage_insert': build_insert_sql(spec, stage=True),
+        'clear': f"TRUNCATE TABLE {spec.stage_table}",
+        'insert_select': build_insert_select_sql(spec),
+    }
+    if merge:
+        sentencias['merge'] = build_merge_sql(spec)
+        # Un MERGE insertaría fila por fila en el delta store: con columnstore se reemplazan las filas
+        sentencias['replace'] = [build_delete_staged_sql(spec), sentencias['insert_select']]
+    return sentencias
+
+
+def resolve_insert_mode(insert_mode: Optional[str] = None, truncate: bool = False) -> str:
+    """
+    Modo de inserción efectivo de una carga de hechos
+
+    Por defecto 'bulk' solo en recargas con truncate, con
+    performance.use_bulk_insert activo y un directorio de archivos que SQL
+    Server pueda leer (performance.bulk_insert_server_directory); si no,
+    'batch'. Pedir 'bulk' sin ese directorio es un error: en un servidor
+    remoto cada archivo fallaría y los lotes caerían al reintento fila por fila.
+
+    Args:
+        insert_mode: Modo pedido ('batch', 'row', 'bulk') o None
+        truncate: Si la carga es una recarga completa
+    """
+    servidor = get_setting('performance', 'bulk_insert_server_directory')
+    if insert_mode is None:
+        masivo = truncate and get_setting('performance', 'use_bulk_insert', False) and servidor
+        return 'bulk' if masivo else 'batch'
+    if insert_mode == 'bulk' and not servidor:
+        raise ValueError("El modo bulk requiere performance.bulk_insert_server_directory "
+                         "(el directorio de los archivos tal como lo ve SQL Server)")
+    return insert_mode
+
+
+def create_staged_writer(conn, stage_table: str, sentencias: dict, insert_mode: str = 'batch',
+                         merge: bool = False, columnstore: bool = False, batch_size: int = 1000,
+                         on_error: Optional[Callable] = None):
+    """
+    Elegir el escritor de un hecho según el modo de carga
+
+    Con BULK INSERT, MERGE o columnstore cada lote pasa por la staging y se
+    aplica con INSERT ... SELECT, MERGE o borrar + insertar; si no, se inserta
+    directo con create_writer. Lo usan create_fact_writer y load_fact_ventas
+    (que pasa sus propias sentencias).
+
+    Args:
+        conn: Conexión pyodbc destino
+        stage_table: Tabla de staging con las columnas en el orden de las filas
+        sentencias: Diccionario con insert, stage_insert, clear, insert_select
+            y, con merge, merge y replace (sentencia o lista)
+        insert_mode: 'batch', 'row' o 'bulk' (archivos + BULK INSERT)
+        merge: Si True, aplica cada lote por la llave natural
+        columnstore: Si True, lotes de al menos COLUMNSTORE_MIN_ROWS filas
+            aplicados con INSERT ... SELECT WITH (TABLOCK)
+        batch_size: Filas por lote
+        on_error: Función (params, exception) para filas que fallan
+
+    Returns:
+        Escritor (sin tipos de parámetros)
+    """
+    if not merge:
+        aplicar = sentencias['insert_select']
+    elif columnstore:
+        aplicar = sentencias['replace']
+    else:
+        aplicar = sentencias['merge']
+    if insert_mode == 'bulk':
+        filas_archivo = get_setting('performance', 'bulk_insert_rows', 100000)
+        if columnstore:
+            filas_archivo = max(filas_archivo, COLUMNSTORE_MIN_ROWS)
+        return BulkInsertWriter(conn, stage_table, sentencias['stage_insert'], aplicar, sentencias['clear'],
+                                get_setting('performance', 'bulk_insert_directory', 'staging/bulk'),
+                                get_setting('performance', 'bulk_insert_server_directory'),
+                                filas_archivo, get_setting('performance', 'bulk_insert_batch_size'),
+                                on_error=on_error)
+    if columnstore:
+        filas_rowgroup = max(get_setting('performance', 'columnstore_batch_size', COLUMNSTORE_MIN_ROWS),
+                             COLUMNSTORE_MIN_ROWS)
+        return ColumnstoreWriter(conn, sentencias['stage_insert'], aplicar, sentencias['clear'],
+                                 filas_rowgroup, batch_size, on_error)
+    if merge:
+        return MergeWriter(conn, sentencias['stage_insert'], aplicar, sentencias['clear'], batch_size, on_error)
+    return create_writer(insert_mode, conn, sentencias['insert'], batch_size, on_error)
+
+
+def create_fact_writer(spec: FactSpec, conn, insert_mode: str = 'batch', merge: bool = False,
+                       columnstore: bool = False, batch_size: int = 1000,
+                       on_error: Optional[Callable] = None):
+    """
+    Crear el escritor de un hecho
+
+    Args:
+        spec: Hecho
+        conn: Conexión pyodbc destino
+        insert_mode: 'batch', 'row' o 'bulk' (archivos + BULK INSERT)
+        merge: Si True, aplica cada lote con MERGE por la llave natural
+        columnstore: Si True, lotes de al menos COLUMNSTORE_MIN_ROWS filas
+            aplicados con INSERT ... SELECT WITH (TABLOCK)
+        batch_size: Filas por lote
+        on_error: Función (params, exception) para filas que fallan
+
+    Returns:
+        Escritor con los tipos de parámetros del destino
+    """
+    if insert_mode == 'bulk' or merge or columnstore:
+        ensure_stage_table(conn, spec)
+    writer = create_staged_writer(conn, spec.stage_table, fact_statements(spec, merge), insert_mode,
+                                  merge, columnstore, batch_size, on_error)
+    if get_setting('performance', 'typed_parameters', True):
+        writer.parameter_types = TypedParameters(spec.target, spec.columns)
+    return writer
@@ -0,0 +1,112 @@
+"""
+Módulo de Joins del Lado del Cliente
+Lecturas simples por llave sobre la base origen (WHERE id IN (...)) para
+resolver en Python, con diccionarios, los joins que de otro modo haría MariaDB
+"""
+from typing import Iterable, Optional, Sequence
+
+# Ids por consulta IN (...)
+IDS_POR_CONSULTA = 1000
+
+
+def fetch_by_ids(conn, table: str, columns: Sequence[str], ids: Iterable, key: str = 'id',
+                 batch_size: int = IDS_POR_CONSULTA) -> list:
+    """
+    Leer las filas de una tabla cuya columna llave está en una lista de ids
+
+    Cada consulta es un acceso por índice (PRIMARY o índice de la llave foránea).
+
+    Args:
+        conn: Conexión pymysql (DictCursor)
+        table: Tabla origen
+        columns: Columnas a leer (deben incluir la llave)
+        ids: Valores de la llave (se ignoran None y repetidos)
+        key: Columna por la que se filtra
+        batch_size: Ids por consulta
+
+    Returns:
+        Lista de diccionarios
+    """
+    ids = sorted({i for i in ids if i is not None})
+    rows = []
+    cursor = conn.cursor()
+    try:
+        for i in range(0, len(ids), batch_size):
+            bloque = ids[i:i + batch_size]
+            cursor.execute(
+                f"SELECT {', '.join(columns)} FROM {table} "
+                f"WHERE {key} IN ({', '.join(['%s'] * len(bloque))})",
+                bloque
+            )
+            rows.extend(cursor.fetchall())
+    finally:
+        cursor.close()
+    return rows
+
+
+def group_by(rows: Iterable[dict], key: str, order_by: Optional[str] = None) -> dict:
+    """
+    Agrupar filas por una columna (lado "muchos" de un join)
+
+    Args:
+        rows: Filas a agrupar
+        key: Columna de agrupación
+        order_by: Columna por la que se ordena cada grupo
+
+    Returns:
+        Diccionario valor -> lista de filas
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[key], []).append(row)
+    if order_by:
+        for group in groups.values():
+            group.sort(key=lambda row: row[order_by])
+    return groups
+
+
+class LookupCache:
+    """
+    Tabla de búsqueda por id con caché
+
+    Pensada para catálogos (clientes, productos, precios): cada id se consulta
+    una sola vez por ejecución; los que no existen también se recuerdan.
+    """
+
+    def __init__(self, table: str, columns: Sequence[str], key: str = 'id'):
+        """
+        Args:
+            table: Tabla origen
+            columns: Columnas a leer (deben incluir la llave)
+            key: Columna llave
+        """
+        self.table = table
+        self.columns = list(columns)
+        self.key = key
+        self.rows = {}
+        self.queries = 0
+
+    def load(self, conn, ids: Iterable) -> dict:
+        """
+        Asegurar que los ids estén en la caché
+
+        Args:
+            conn: Conexión pymysql (DictCursor)
+            ids: Ids requeridos
+
+        Returns:
+            El diccionario id -> fila (None si el id no existe)
+        """
+        faltantes = {i for i in ids if i is not None and i not in self.rows}
+        if faltantes:
+            for row in fetch_by_ids(conn, self.table, self.columns, faltantes, self.key):
+                self.rows[row[self.key]] = row
+            for i in faltantes:
+                self.rows.setdefault(i, None)
+            self.queries += 1
+        return self.rows
+
+    def get(self, natural_id, column: str):
+        """Valor de una columna para un id (None si no existe)"""
+        row = self.rows.get(natural_id)
+        return row[column] if row else None
@@ -2,7 +2,7 @@
 Módulo de Funciones Auxiliares para ETL
 Funciones comunes para transformación y limpieza de datos
 """
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import Any, Optional
 import pandas as pd
 import numpy as np
@@ -85,14 +85,14 @@ def safe_date(value: Any, default: Optional[date] = None) -> Optional[date]:
     if pd.isna(value) or value is None:
         return default
     
+    # Si es datetime (antes que date: datetime es subclase de date)
+    if isinstance(value, datetime):
+        return value.date()
+    
     # Si ya es date
     if isinstance(value, date):
         return value
     
-    # Si es datetime
-    if isinstance(value, datetime):
-        return value.date()
-    
     # Si es Timestamp de pandas
     if isinstance(value, pd.Timestamp):
         return value.date()
@@ -265,6 +265,36 @@ def batch_dataframe(df: pd.DataFrame, batch_size: int = 1000):
         yield df.iloc[start_idx:end_idx]
 
 
+def split_date_range(fecha_inicio: date, fecha_fin: date, partes: int) -> list:
+    """
+    Dividir un rango de fechas (inclusivo) en tramos contiguos
+    
+    Args:
+        fecha_inicio: Primera fecha del rango
+        fecha_fin: Última fecha del rango
+        partes: Número de tramos deseado
+    
+    Returns:
+        Lista de tuplas (inicio, fin) inclusivas, sin solaparse; puede tener
+        menos de 'partes' tramos si el rango tiene menos días
+    """
+    total_dias = (fecha_fin - fecha_inicio).days + 1
+    if total_dias <= 0:
+        return []
+    
+    partes = max(1, min(partes, total_dias))
+    tamano, resto = divmod(total_dias, partes)
+    
+    tramos = []
+    inicio = fecha_inicio
+    for i in range(partes):
+        dias = tamano + (1 if i < resto else 0)
+        fin = inicio + timedelta(days=dias - 1)
+        tramos.append((inicio, fin))
+        inicio = fin + timedelta(days=1)
+    return tramos
+
+
 def compare_dataframes(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: list) -> dict:
     """
     Comparar dos DataFrames e identificar nuevos, modificados y eliminados
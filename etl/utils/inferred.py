@@ -0,0 +1,131 @@
+"""
+Módulo de Miembros Inferidos de Dimensiones
+Cuando un hecho referencia una llave natural que todavía no existe en la
+dimensión, se inserta una fila mínima marcada con es_inferido = 1 en lugar de
+descartar el hecho; la siguiente carga de la dimensión la completa en su lugar
+"""
+
+from etl.utils.database import TargetDatabase
+
+
+# Dimensiones que admiten miembros inferidos
+# columnas: valores de relleno ({id} se reemplaza por la llave natural)
+INFERRED_MEMBERS = {
+    'cliente': {
+        'tabla': 'dim_cliente',
+        'natural_id': 'cliente_id',
+        'key': 'cliente_key',
+        'columnas': {'nombre': 'CLIENTE INFERIDO {id}', 'departamento': 'NO ESPECIFICADO'},
+        'scd2': True,
+    },
+    'producto': {
+        'tabla': 'dim_producto',
+        'natural_id': 'producto_id',
+        'key': 'producto_key',
+        'columnas': {'nombre': 'PRODUCTO INFERIDO {id}', 'categoria_nombre': 'NO ESPECIFICADO'},
+        'scd2': True,
+    },
+    'tipo_documento': {
+        'tabla': 'dim_tipo_documento',
+        'natural_id': 'tipo_documento_id',
+        'key': 'tipo_documento_key',
+        'columnas': {'codigo': '{id}', 'nombre': 'TIPO INFERIDO {id}'},
+        'scd2': False,
+    },
+}
+
+# Filas por INSERT (SQL Server admite hasta 1000 filas en VALUES y 2100 parámetros)
+_FILAS_POR_INSERT = 500
+
+
+def get_inferred_ids(cursor, dimension: str) -> set:
+    """
+    Obtener las llaves naturales con miembro inferido pendiente de completar
+
+    Args:
+        cursor: Cursor pyodbc destino
+        dimension: Nombre en INFERRED_MEMBERS (ej. 'cliente')
+
+    Returns:
+        Conjunto de llaves naturales
+    """
+    spec = INFERRED_MEMBERS[dimension]
+    query = f"SELECT {spec['natural_id']} FROM dbo.{spec['tabla']} WHERE es_inferido = 1"
+    if spec['scd2']:
+        query += " AND es_actual = 1"
+    cursor.execute(query)
+    return {row[0] for row in cursor.fetchall()}
+
+
+class InferredMembers:
+    """
+    Crea miembros inferidos por bloque de hechos y los agrega a los mapeos en memoria
+
+    Usa su propia conexión (con commit inmediato) para no mezclarse con la
+    transacción del escritor de hechos, que puede correr en otro hilo.
+    """
+
+    def __init__(self, columnas: dict):
+        """
+        Args:
+            columnas: Dimensión -> columna de la fila extraída con la llave natural
+                (ej. {'cliente': 'cliente_id', 'producto': 'producto_id'})
+        """
+        self.columnas = columnas
+        self.creados = {dimension: 0 for dimension in columnas}
+        self._db = TargetDatabase()
+
+    def resolve(self, rows: list, dim_keys: dict):
+        """
+        Insertar miembros inferidos para las llaves naturales desconocidas del bloque
+
+        Args:
+            rows: Bloque de registros extraídos
+            dim_keys: Mapeos de dimensiones; se actualizan con las keys nuevas
+        """
+        for dimension, columna in self.columnas.items():
+            mapping = dim_keys[dimension]
+            faltantes = {row[columna] for row in rows
+                         if row[columna] is not None and row[columna] not in mapping}
+            if faltantes:
+                # Un solo update por dimensión y bloque (AsOfKeys reindexa una vez)
+                mapping.update(self._insert(dimension, sorted(faltantes)))
+                self.creados[dimension] += len(faltantes)
+
+    def _insert(self, dimension: str, natural_ids: list) -> list:
+        """Insertar las filas de relleno y devolver pares (natural_id, key)"""
+        spec = INFERRED_MEMBERS[dimension]
+        columnas = [spec['natural_id']] + list(spec['columnas']) + ['es_inferido']
+        valores = ['?'] * (1 + len(spec['columnas'])) + ['1']
+        if spec['scd2']:
+            columnas += ['fecha_inicio', 'fecha_fin', 'version', 'es_actual']
+            valores += ['CAST(GETDATE() AS DATE)', 'NULL', '1', '1']
+        fila = f"({', '.join(valores)})"
+
+        conn = self._db.get_connection()
+        cursor = conn.cursor()
+        keys = []
+        for i in range(0, len(natural_ids), _FILAS_POR_INSERT):
+            bloque = natural_ids[i:i + _FILAS_POR_INSERT]
+            params = []
+            for natural_id in bloque:
+                params.append(natural_id)
+                params.extend(valor.format(id=natural_id) for valor in spec['columnas'].values())
+            cursor.execute(
+                f"INSERT INTO dbo.{spec['tabla']} ({', '.join(columnas)}) "
+                f"OUTPUT inserted.{spec['natural_id']}, inserted.{spec['key']} "
+                f"VALUES {', '.join([fila] * len(bloque))}",
+                params
+            )
+            keys.extend((row[0], row[1]) for row in cursor.fetchall())
+        conn.commit()
+        cursor.close()
+        return keys
+
+    @property
+    def total(self) -> int:
+        """Total de miembros inferidos creados"""
+        return sum(self.creados.values())
+
+    def close(self):
+        self._db.close()
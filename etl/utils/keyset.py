@@ -0,0 +1,121 @@
+"""
+Módulo de Paginación por Llave (Keyset)
+Extrae un resultado ordenado en páginas independientes con
+WHERE (llave) > (última posición) ... LIMIT n, de modo que una extracción
+larga sobrevive a reconexiones y puede retomarse desde la última página
+"""
+import time
+from typing import Callable, Iterator, Optional, Sequence
+import pymysql
+
+from etl.utils.database import SourceDatabase
+
+
+# Errores de conexión que justifican reconectar y repetir la página
+ERRORES_CONEXION = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+
+class KeysetPaginator:
+    """
+    Paginador por llave sobre la base origen
+
+    La posición es la tupla de valores de la llave de la última fila leída;
+    se puede guardar y pasar como position para continuar en otra ejecución.
+    """
+
+    def __init__(self, query: str, params: Sequence, key_exprs: Sequence[str],
+                 key_columns: Sequence[str], page_size: int = 1000,
+                 position: Optional[tuple] = None, max_retries: int = 3,
+                 retry_delay: float = 5, database_factory: Callable = SourceDatabase):
+        """
+        Args:
+            query: Query base sin ORDER BY; debe terminar en una cláusula WHERE
+                (las condiciones de paginación se agregan con AND)
+            params: Parámetros del query base
+            key_exprs: Expresiones SQL de la llave, en orden (ej. ['v.fecha', 'v.id', 's.id'])
+            key_columns: Nombres de esas columnas en cada fila extraída
+            page_size: Filas por página
+            position: Posición desde la que continuar (None = desde el inicio)
+            max_retries: Reintentos por página ante errores de conexión
+            retry_delay: Segundos de espera antes de reconectar
+            database_factory: Crea la conexión origen (SourceDatabase)
+        """
+        self.query = query
+        self.params = list(params or [])
+        self.key_exprs = list(key_exprs)
+        self.key_columns = list(key_columns)
+        self.page_size = page_size
+        self.position = tuple(position) if position else None
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.database_factory = database_factory
+        self.pages_read = 0
+        self.rows_read = 0
+        self.reconnects = 0
+        self._db = None
+
+    def _page_query(self) -> tuple:
+        """Query y parámetros de la siguiente página"""
+        query = self.query
+        params = list(self.params)
+        if self.position is not None:
+            # La primera condición permite usar el índice de la columna principal
+            query += (f" AND {self.key_exprs[0]} >= %s"
+                      f" AND ({', '.join(self.key_exprs)}) > ({', '.join(['%s'] * len(self.key_exprs))})")
+            params.append(self.position[0])
+            params.extend(self.position)
+        query += f" ORDER BY {', '.join(self.key_exprs)} LIMIT {int(self.page_size)}"
+        return query, params
+
+    def _fetch_page(self) -> list:
+        """Leer una página, reconectando ante errores de conexión"""
+        query, params = self._page_query()
+        intento = 0
+        while True:
+            try:
+                if self._db is None:
+                    self._db = self.database_factory()
+                cursor = self._db.get_connection().cursor()
+                try:
+                    cursor.execute(query, params)
+                    return cursor.fetchall()
+                finally:
+                    cursor.close()
+            except ERRORES_CONEXION:
+                intento += 1
+                self.close()
+                if intento > self.max_retries:
+                    raise
+                self.reconnects += 1
+                time.sleep(self.retry_delay)
+
+    def pages(self) -> Iterator[list]:
+        """
+        Recorrer el resultado página por página
+
+        Yields:
+            Lista de diccionarios por página; al entregarla, position ya
+            apunta a su última fila
+        """
+        try:
+            while True:
+                rows = self._fetch_page()
+                if not rows:
+                    break
+                last = rows[-1]
+                self.position = tuple(last[column] for column in self.key_columns)
+                self.pages_read += 1
+                self.rows_read += len(rows)
+                yield rows
+                if len(rows) < self.page_size:
+                    break
+        finally:
+            self.close()
+
+    def close(self):
+        if self._db is not None:
+            try:
+                self._db.close()
+            except Exception:
+                pass
+            self._db = None
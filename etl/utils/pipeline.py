@@ -0,0 +1,137 @@
+"""
+Módulo de Pipeline Extracción → Transformación → Carga
+Ejecuta cada etapa en su propio hilo unidas por colas acotadas, de modo que
+la lectura de MariaDB y la escritura en SQL Server se solapan
+"""
+import queue
+import threading
+import time
+from typing import Callable, Iterable
+
+# Marca de fin de datos entre etapas
+_FIN = object()
+
+
+class PipelineError(Exception):
+    """Error ocurrido en una de las etapas del pipeline"""
+
+
+class Pipeline:
+    """
+    Pipeline de tres etapas (extractor, transformador, escritor)
+
+    Las colas acotadas aplican contrapresión: si el escritor es más lento,
+    el extractor se detiene al llenarse la cola y la memoria queda limitada
+    a queue_size bloques por etapa.
+    """
+
+    def __init__(self, queue_size: int = 4):
+        """
+        Args:
+            queue_size: Máximo de bloques en espera entre cada par de etapas
+        """
+        self.queue_size = queue_size
+        self.busy = {'extraccion': 0.0, 'transformacion': 0.0, 'escritura': 0.0}
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Encolar respetando la señal de parada; False si se abortó"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Desencolar respetando la señal de parada; _FIN si se abortó"""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _FIN
+
+    def _fail(self, stage: str, e: Exception):
+        self._errors.append((stage, e))
+        self._stop.set()
+
+    def _extract(self, source: Iterable, out_q: queue.Queue):
+        try:
+            iterator = iter(source)
+            while True:
+                start = time.perf_counter()
+                chunk = next(iterator, _FIN)
+                self.busy['extraccion'] += time.perf_counter() - start
+                if chunk is _FIN or not self._put(out_q, chunk):
+                    break
+        except Exception as e:
+            self._fail('extraccion', e)
+        finally:
+            self._put(out_q, _FIN)
+
+    def _transform(self, transform: Callable, in_q: queue.Queue, out_q: queue.Queue):
+        try:
+            while True:
+                chunk = self._get(in_q)
+                if chunk is _FIN:
+                    break
+                start = time.perf_counter()
+                result = transform(chunk)
+                self.busy['transformacion'] += time.perf_counter() - start
+                if not self._put(out_q, result):
+                    break
+        except Exception as e:
+            self._fail('transformacion', e)
+        finally:
+            self._put(out_q, _FIN)
+
+    def _write(self, sink: Callable, in_q: queue.Queue):
+        try:
+            while True:
+                chunk = self._get(in_q)
+                if chunk is _FIN:
+                    break
+                start = time.perf_counter()
+                sink(chunk)
+                self.busy['escritura'] += time.perf_counter() - start
+        except Exception as e:
+            self._fail('escritura', e)
+
+    def run(self, source: Iterable, transform: Callable, sink: Callable):
+        """
+        Ejecutar el pipeline hasta agotar la fuente
+
+        Args:
+            source: Iterable de bloques extraídos (ej. SourceDatabase.stream_query)
+            transform: Función bloque extraído -> bloque transformado
+            sink: Función que escribe un bloque transformado
+
+        Raises:
+            PipelineError: Si alguna etapa falla (las demás se detienen)
+        """
+        extract_q = queue.Queue(maxsize=self.queue_size)
+        write_q = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._extract, args=(source, extract_q),
+                             name='etl-extractor', daemon=True),
+            threading.Thread(target=self._transform, args=(transform, extract_q, write_q),
+                             name='etl-transform', daemon=True),
+            threading.Thread(target=self._write, args=(sink, write_q),
+                             name='etl-writer', daemon=True),
+        ]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+
+        if self._errors:
+            stage, error = self._errors[0]
+            raise PipelineError(f"Falló la etapa de {stage}: {error}") from error
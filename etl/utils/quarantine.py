@@ -0,0 +1,101 @@
+"""
+Módulo de Cuarentena de Registros Rechazados
+Guarda por lotes las filas que una carga no pudo procesar (ids de origen,
+motivo, dimensiones faltantes y tipo de excepción) para analizarlas y
+reprocesarlas sin repetir toda la extracción
+"""
+import threading
+import uuid
+from collections import Counter
+from typing import Iterable, Optional
+
+from etl.utils.database import TargetDatabase
+from etl.utils.writers import BatchWriter
+
+
+# Códigos de motivo
+FALTA_DIMENSION = 'FALTA_DIMENSION'
+ERROR_TRANSFORMACION = 'ERROR_TRANSFORMACION'
+ERROR_ESCRITURA = 'ERROR_ESCRITURA'
+
+# Largo máximo del detalle guardado (columna NVARCHAR(400))
+_LARGO_DETALLE = 400
+
+
+def new_run_id() -> str:
+    """Generar un identificador único de ejecución"""
+    return str(uuid.uuid4())
+
+
+class Quarantine:
+    """
+    Registro de rechazos escrito por lotes (fast_executemany) en su propia conexión
+
+    Se puede usar desde varios hilos (transformación y escritura del pipeline).
+    """
+
+    def __init__(self, tabla: str, id_columns: Iterable[str], ejecucion_id: Optional[str] = None,
+                 batch_size: int = 1000):
+        """
+        Args:
+            tabla: Tabla de cuarentena (ej. 'etl_rechazos_fact_ventas')
+            id_columns: Columnas con los ids de origen de cada fila rechazada
+            ejecucion_id: Identificador de la ejecución (por defecto uno nuevo)
+            batch_size: Rechazos por lote
+        """
+        self.tabla = tabla
+        self.id_columns = list(id_columns)
+        self.ejecucion_id = ejecucion_id or new_run_id()
+        self.resumen = Counter()
+        self._lock = threading.Lock()
+        self._db = TargetDatabase()
+
+        columnas = ['ejecucion_id'] + self.id_columns + ['etapa', 'motivo', 'dimensiones_faltantes',
+                                                          'excepcion', 'detalle']
+        insert_sql = (f"INSERT INTO dbo.{tabla} ({', '.join(columnas)}) "
+                      f"VALUES ({', '.join('?' * len(columnas))})")
+        self._writer = BatchWriter(self._db.get_connection(), insert_sql, batch_size)
+
+    def add(self, ids: dict, etapa: str, motivo: str, dimensiones: Iterable[str] = (),
+            error: Optional[Exception] = None):
+        """
+        Registrar una fila rechazada
+
+        Args:
+            ids: Columna de id -> valor (las que falten quedan NULL)
+            etapa: 'transformacion' o 'escritura'
+            motivo: Código de motivo (FALTA_DIMENSION, ERROR_TRANSFORMACION, ERROR_ESCRITURA)
+            dimensiones: Dimensiones sin key (solo FALTA_DIMENSION)
+            error: Excepción que causó el rechazo
+        """
+        dimensiones = ','.join(dimensiones) or None
+        params = (
+            self.ejecucion_id,
+            *(ids.get(columna) for columna in self.id_columns),
+            etapa,
+            motivo,
+            dimensiones,
+            type(error).__name__ if error else None,
+            str(error)[:_LARGO_DETALLE] if error else None,
+        )
+        with self._lock:
+            self.resumen[(motivo, dimensiones)] += 1
+            self._writer.add(params)
+
+    @property
+    def total(self) -> int:
+        """Total de filas rechazadas en la ejecución"""
+        return sum(self.resumen.values())
+
+    def summary_lines(self) -> list:
+        """Resumen de la ejecución agrupado por motivo, de mayor a menor"""
+        lines = []
+        for (motivo, dimensiones), total in self.resumen.most_common():
+            lines.append(f"{motivo}{f' ({dimensiones})' if dimensiones else ''}: {total}")
+        return lines
+
+    def close(self):
+        """Escribir los rechazos pendientes y cerrar la conexión"""
+        with self._lock:
+            self._writer.close()
+        self._db.close()
@@ -0,0 +1,441 @@
+"""
+Módulo de Utilidades SCD Tipo 2
+Resolución de surrogate keys según la versión vigente en una fecha (as-of),
+hash de atributos para detectar cambios sin traer las filas del DW y
+aplicación de versiones por lotes vía staging
+"""
+import hashlib
+from bisect import bisect_right
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from etl.utils.vectorized import map_keys
+from etl.utils.writers import MergeWriter
+from etl.utils.schema import TypedParameters
+
+# Las llaves compuestas se codifican como natural_id * _ESCALA + días desde 1900-01-01
+_ESCALA = 10 ** 6
+_EPOCA = np.datetime64('1900-01-01', 'D')
+_ORDINAL_EPOCA = date(1900, 1, 1).toordinal()
+
+# Versiones por registro hasta las que AsOfKeys.lookup avanza en lugar de usar searchsorted
+_MAX_AVANCES = 8
+
+# Columna BINARY(16) con el hash de los atributos de cada versión
+HASH_COLUMN = 'hash_atributos'
+
+# Separador de valores en el texto que se hashea y marcador de NULL
+_SEPARADOR = '\x1f'
+_NULO = '\x00'
+
+# Acción de cada fila en la staging de una dimensión (columna accion)
+NUEVO = 'N'
+MODIFICADO = 'M'
+INFERIDO = 'I'
+
+
+def _to_days(values) -> np.ndarray:
+    """Convertir fechas (date, datetime, None) a días desde 1900-01-01 (NaN si es nula)"""
+    fechas = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce')
+    dias = (fechas.to_numpy(dtype='datetime64[D]') - _EPOCA).astype('float64')
+    dias[fechas.isna().to_numpy()] = np.nan
+    return dias
+
+
+def to_days(fechas) -> np.ndarray:
+    """
+    Días desde 1900-01-01 de una columna de fechas (NaN si es nula)
+
+    Un bloque de hechos repite pocas fechas: se convierte solo cada fecha
+    distinta. El resultado se puede pasar a AsOfKeys.lookup (dias) para no
+    convertir la misma columna una vez por dimensión.
+    """
+    codigos, distintas = pd.factorize(np.asarray(fechas, dtype=object))
+    return np.append(_to_days(distintas), np.nan)[codigos]
+
+
+def _as_date(value) -> Optional[date]:
+    """Normalizar datetime/date a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class AsOfKeys:
+    """
+    Mapeo natural_id -> surrogate key por fecha de vigencia (SCD Tipo 2)
+
+    Todas las versiones se guardan ordenadas por (natural_id, fecha_inicio) en
+    arreglos NumPy; la versión vigente en una fecha es la última que inició en
+    o antes de esa fecha, y se ubica con búsqueda binaria (searchsorted).
+    Si la fecha es anterior a la primera versión (hechos previos a la primera
+    carga de la dimensión) se usa la primera versión del registro.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        """
+        Args:
+            rows: Tuplas (natural_id, fecha_inicio, fecha_fin, key) de todas las versiones
+        """
+        rows = [r for r in rows if r[0] is not None and r[1] is not None]
+        ids = np.array([r[0] for r in rows], dtype='int64')
+        inicio = _to_days([r[1] for r in rows])
+        fin = _to_days([r[2] for r in rows])
+        keys = np.array([r[3] for r in rows], dtype='float64')
+
+        # Versiones cerradas el mismo día en que abrieron nunca estuvieron vigentes
+        vigentes = ~(fin <= inicio)
+        ids, inicio, keys = ids[vigentes], inicio[vigentes], keys[vigentes]
+
+        orden = np.lexsort((keys, inicio, ids))
+        self.ids = ids[orden]
+        self.inicio = inicio[orden].astype('int64')
+        self.keys = keys[orden]
+        self._indexar()
+
+        # Índice por natural_id para búsquedas fila por fila (bisect)
+        self._por_id = {}
+        for natural_id, dia, key in zip(self.ids.tolist(), self.inicio.tolist(), self.keys.tolist()):
+            dias, llaves = self._por_id.setdefault(natural_id, ([], []))
+            dias.append(dia)
+            llaves.append(int(key))
+
+    def _indexar(self):
+        """Llaves compuestas y bloque [desde, hasta) de versiones de cada natural_id (una vez, no por bloque)"""
+        self._compuesta = self.ids * _ESCALA + self.inicio
+        self._ids_unicos, self._desde, conteos = np.unique(self.ids, return_index=True, return_counts=True)
+        self._hasta = self._desde + conteos
+        self._max_versiones = int(conteos.max()) if len(conteos) else 0
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+    def __contains__(self, natural_id) -> bool:
+        return natural_id in self._por_id
+
+    def __setitem__(self, natural_id, key):
+        """Agregar un registro nuevo con una sola versión vigente desde hoy (ej. miembro inferido)"""
+        self.update([(natural_id, key)])
+
+    def update(self, pairs: Iterable[tuple]):
+        """
+        Agregar en bloque registros nuevos, cada uno con una sola versión vigente desde hoy
+
+        Los arreglos se concatenan, ordenan e indexan una sola vez por llamada
+        (no por registro), de modo que agregar los miembros inferidos de un
+        bloque de hechos cuesta lo mismo que uno solo.
+
+        Args:
+            pairs: Pares (natural_id, key), como dict.update
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+        dia = date.today().toordinal() - _ORDINAL_EPOCA
+        ids = np.concatenate([self.ids, np.array([p[0] for p in pairs], dtype='int64')])
+        inicio = np.concatenate([self.inicio, np.full(len(pairs), dia, dtype='int64')])
+        keys = np.concatenate([self.keys, np.array([p[1] for p in pairs], dtype='float64')])
+        orden = np.lexsort((keys, inicio, ids))
+        self.ids, self.inicio, self.keys = ids[orden], inicio[orden], keys[orden]
+        self._indexar()
+        for natural_id, key in pairs:
+            dias, llaves = self._por_id.setdefault(natural_id, ([], []))
+            pos = bisect_right(dias, dia)
+            dias.insert(pos, dia)
+            llaves.insert(pos, int(key))
+
+    def get(self, natural_id, fecha=None) -> Optional[int]:
+        """
+        Resolver una sola key
+
+        Args:
+            natural_id: Llave natural
+            fecha: Fecha de referencia (None = versión más reciente)
+
+        Returns:
+            Surrogate key o None si el registro no existe
+        """
+        versiones = self._por_id.get(natural_id)
+        if versiones is None:
+            return None
+        dias, llaves = versiones
+        if fecha is None:
+            return llaves[-1]
+        dia = _as_date(fecha).toordinal() - _ORDINAL_EPOCA
+        return llaves[max(bisect_right(dias, dia) - 1, 0)]
+
+    def lookup(self, natural_ids, fechas=None, dias: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Resolver keys en bloque
+
+        Las llaves se convierten una vez por valor distinto (factorize) y el
+        bloque de versiones de cada natural_id viene precalculado; la versión
+        vigente se ubica avanzando dentro del bloque (pocas versiones por
+        registro) o con searchsorted si algún registro tiene muchas.
+
+        Args:
+            natural_ids: Llaves naturales (Serie o arreglo), None = sin valor
+            fechas: Fechas de referencia de cada fila
+            dias: Las mismas fechas ya convertidas con to_days (evita
+                convertirlas otra vez por cada dimensión del bloque)
+
+        Returns:
+            Arreglo float64 con la key o NaN si el registro no existe
+        """
+        if dias is None:
+            dias = to_days(fechas)
+
+        # Bloque [desde, hasta) de versiones de cada natural_id distinto
+        codigos, distintos = pd.factorize(np.asarray(natural_ids, dtype=object))
+        if not len(self._ids_unicos):
+            return np.full(len(codigos), np.nan)
+        ids = pd.to_numeric(pd.Series(distintos, dtype=object), errors='coerce').to_numpy(dtype='float64')
+        ids = np.where(np.isnan(ids), -1, ids).astype('int64')
+        bloque = np.minimum(np.searchsorted(self._ids_unicos, ids), len(self._ids_unicos) - 1)
+        existe = self._ids_unicos[bloque] == ids
+        # El código -1 (nulo) cae en la última posición, como un registro inexistente
+        existe = np.append(existe, False)[codigos]
+        desde = np.append(self._desde[bloque], 0)[codigos]
+        hasta = np.append(self._hasta[bloque], 1)[codigos]
+
+        # Sin fecha de referencia se toma la versión más reciente
+        dia = np.where(np.isnan(dias), _ESCALA - 1, dias).astype('int64')
+
+        # Última versión iniciada en o antes del día (o la primera si es anterior a todas)
+        if self._max_versiones <= _MAX_AVANCES:
+            pos = desde
+            for _ in range(self._max_versiones - 1):
+                siguiente = np.minimum(pos + 1, hasta - 1)
+                pos = np.where(self.inicio[siguiente] <= dia, siguiente, pos)
+        else:
+            pos = np.searchsorted(self._compuesta, self.ids[desde] * _ESCALA + dia, side='right') - 1
+            pos = np.clip(pos, desde, hasta - 1)
+        result = self.keys[pos]
+        result[~existe] = np.nan
+        return result
+
+
+def get_scd_keys(target_cursor, tabla: str, natural_id: str, key: str, as_of: bool = False):
+    """
+    Obtener el mapeo de una dimensión SCD Tipo 2
+
+    Args:
+        target_cursor: Cursor pyodbc destino
+        tabla: Tabla de la dimensión (ej. 'dim_cliente')
+        natural_id: Columna de la llave natural
+        key: Columna de la surrogate key
+        as_of: Si True, carga todas las versiones para resolver por fecha de venta
+
+    Returns:
+        AsOfKeys si as_of, si no diccionario natural_id -> key (solo registros actuales)
+    """
+    if as_of:
+        target_cursor.execute(f"SELECT {natural_id}, fecha_inicio, fecha_fin, {key} FROM dbo.{tabla}")
+        return AsOfKeys(tuple(row) for row in target_cursor.fetchall())
+    target_cursor.execute(f"SELECT {key}, {natural_id} FROM dbo.{tabla} WHERE es_actual = 1")
+    return {row[1]: row[0] for row in target_cursor.fetchall()}
+
+
+def scd_key(mapping, natural_id, fecha):
+    """Resolver una key de dimensión SCD2 (por fecha si el mapeo es AsOfKeys)"""
+    if isinstance(mapping, AsOfKeys):
+        return mapping.get(natural_id, fecha)
+    return mapping.get(natural_id)
+
+
+def map_scd_keys(natural_ids, fechas, mapping, dias: Optional[np.ndarray] = None) -> np.ndarray:
+    """Versión en bloque de scd_key (dias: fechas ya convertidas con to_days)"""
+    if isinstance(mapping, AsOfKeys):
+        return mapping.lookup(natural_ids, fechas, dias)
+    return map_keys(natural_ids, mapping)
+
+
+def _hash_text(value) -> str:
+    """Texto canónico de un valor: el mismo para el dato de origen y el leído del DW"""
+    if value is None:
+        return _NULO
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if np.isnan(value):
+            return _NULO
+        value = Decimal(repr(value))
+    if isinstance(value, Decimal):
+        return format(value.normalize(), 'f')
+    if isinstance(value, datetime):
+        # Las columnas de fecha del DW son DATE: la hora no es un cambio
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def attribute_hash(values: Iterable) -> bytes:
+    """
+    Hash (MD5, 16 bytes) de los atributos ya limpios de una versión
+
+    Se calcula en el ETL al insertar cada versión y se guarda en HASH_COLUMN;
+    la detección de cambios compara solo este valor. 0/1 y False/True, así
+    como 1.5 y Decimal('1.50'), producen el mismo hash.
+    """
+    texto = _SEPARADOR.join(_hash_text(value) for value in values)
+    return hashlib.md5(texto.encode('utf-8')).digest()
+
+
+def get_current_hashes(target_cursor, tabla: str, natural_id: str, extra: Sequence[str] = ()) -> dict:
+    """
+    Hash de la versión actual de cada llave natural de una dimensión SCD2
+
+    Args:
+        target_cursor: Cursor pyodbc destino
+        tabla: Tabla de la dimensión (ej. 'dim_cliente')
+        natural_id: Columna de la llave natural
+        extra: Columnas adicionales a traer (ej. 'version', 'es_inferido')
+
+    Returns:
+        Diccionario natural_id -> (hash, *extra); el hash es None en filas
+        anteriores a la columna (ver backfill_hashes)
+    """
+    columnas = ', '.join((natural_id, HASH_COLUMN) + tuple(extra))
+    target_cursor.execute(f"SELECT {columnas} FROM dbo.{tabla} WHERE es_actual = 1")
+    return {row[0]: tuple(row[1:]) for row in target_cursor.fetchall()}
+
+
+def backfill_hashes(target_conn, tabla: str, natural_id: str, columnas: Sequence[str],
+                    batch_size: int = 1000, normalizar: Optional[Callable] = None) -> int:
+    """
+    Calcular el hash de las versiones actuales que aún no lo tienen
+
+    Se ejecuta antes de detectar cambios: las filas cargadas antes de existir
+    HASH_COLUMN se leen una sola vez con sus atributos y quedan con su hash,
+    sin crear versiones nuevas. Los valores del DW ya pasaron por los tipos de
+    sus columnas (textos recortados, decimales redondeados); para que coincidan
+    con el hash de los datos de origen, ambos lados deben hashearse con la
+    misma normalización (ver TypedParameters.normalize).
+
+    Args:
+        target_conn: Conexión pyodbc destino
+        tabla: Tabla de la dimensión
+        natural_id: Columna de la llave natural
+        columnas: Atributos en el mismo orden con que se calcula el hash al insertar
+        normalizar: Función aplicada a los atributos antes del hash (la misma
+            que se usa con los datos de origen)
+
+    Returns:
+        Filas actualizadas
+    """
+    cursor = target_conn.cursor()
+    cursor.execute(f"SELECT {natural_id}, {', '.join(columnas)} FROM dbo.{tabla} "
+                   f"WHERE es_actual = 1 AND {HASH_COLUMN} IS NULL")
+    normalizar = normalizar or tuple
+    filas = [(attribute_hash(normalizar(row[1:])), row[0]) for row in cursor.fetchall()]
+    if filas:
+        cursor.fast_executemany = True
+        sql = f"UPDATE dbo.{tabla} SET {HASH_COLUMN} = ? WHERE {natural_id} = ? AND es_actual = 1"
+        for i in range(0, len(filas), batch_size):
+            cursor.executemany(sql, filas[i:i + batch_size])
+        target_conn.commit()
+    cursor.close()
+    return len(filas)
+
+
+def build_scd2_apply_sql(tabla: str, natural_id: str, columnas: Sequence[str], inferidos: bool = True) -> list:
+    """
+    Sentencias que aplican la staging de una dimensión SCD2, en orden
+
+    1. Cierra la versión actual de las llaves modificadas
+    2. Completa en su lugar los miembros inferidos (si la dimensión los admite)
+    3. Inserta las versiones nuevas (llaves nuevas y modificadas) con versión
+       MAX(version) + 1 de la llave; es la última para que rows_merged del
+       escritor cuente las versiones insertadas
+
+    Args:
+        tabla: Tabla de la dimensión (ej. 'dim_cliente'); la staging es dbo.stg_<tabla>
+        natural_id: Columna de la llave natural
+        columnas: Columnas de la versión (llave, atributos, hash y version), sin accion
+        inferidos: Si la dimensión tiene es_inferido
+    """
+    stage = f"dbo.stg_{tabla}"
+    sentencias = [f"""
+        UPDATE d
+        SET d.es_actual = 0,
+            d.fecha_fin = CAST(GETDATE() AS DATE),
+            d.updated_at = GETDATE()
+        FROM dbo.{tabla} d
+        INNER JOIN {stage} s ON d.{natural_id} = s.{natural_id}
+        WHERE s.accion = '{MODIFICADO}' AND d.es_actual = 1
+    """]
+    if inferidos:
+        asignaciones = ', '.join(f"d.{c} = s.{c}" for c in columnas if c not in (natural_id, 'version'))
+        sentencias.append(f"""
+        UPDATE d
+        SET {asignaciones}, d.es_inferido = 0, d.updated_at = GETDATE()
+        FROM dbo.{tabla} d
+        INNER JOIN {stage} s ON d.{natural_id} = s.{natural_id}
+        WHERE s.accion = '{INFERIDO}' AND d.es_actual = 1 AND d.es_inferido = 1
+    """)
+    # La versión sigue a la mayor de la llave (también cerradas: una llave dada
+    # de baja que reaparece no repite números de versión)
+    valores = ', '.join(
+        f"ISNULL((SELECT MAX(h.version) FROM dbo.{tabla} h WHERE h.{natural_id} = s.{natural_id}), 0) + 1"
+        if c == 'version' else f"s.{c}"
+        for c in columnas
+    )
+    sentencias.append(f"""
+        INSERT INTO dbo.{tabla} ({', '.join(columnas)}, fecha_inicio, fecha_fin, es_actual)
+        SELECT {valores}, CAST(GETDATE() AS DATE), NULL, 1
+        FROM {stage} s
+        WHERE s.accion IN ('{NUEVO}', '{MODIFICADO}')
+    """)
+    return sentencias
+
+
+def create_scd2_writer(conn, tabla: str, natural_id: str, columnas: Sequence[str], inferidos: bool = True,
+                       batch_size: int = 10000, on_error=None) -> MergeWriter:
+    """
+    Escritor de versiones SCD2 vía dbo.stg_<tabla>
+
+    Cada fila es (*columnas, accion) con accion NUEVO, MODIFICADO o INFERIDO.
+    Cada lote se carga en la staging con fast_executemany y se aplica con las
+    sentencias de build_scd2_apply_sql en la misma transacción: los cambios de
+    todo un catálogo cuestan unos pocos viajes por lote en lugar de un UPDATE
+    y un INSERT por llave.
+    """
+    stage = f"dbo.stg_{tabla}"
+    columnas_stage = tuple(columnas) + ('accion',)
+    stage_insert_sql = (f"INSERT INTO {stage} ({', '.join(columnas_stage)}) "
+                        f"VALUES ({', '.join('?' * len(columnas_stage))})")
+    writer = MergeWriter(conn, stage_insert_sql, build_scd2_apply_sql(tabla, natural_id, columnas, inferidos),
+                         f"TRUNCATE TABLE {stage}", batch_size, on_error)
+    writer.parameter_types = TypedParameters(stage, columnas_stage)
+    return writer
+
+
+def close_versions(target_conn, tabla: str, natural_id: str, ids: Sequence, batch_size: int = 10000) -> int:
+    """
+    Cerrar la versión actual de llaves que ya no vienen del origen (sin versión nueva)
+
+    Args:
+        target_conn: Conexión pyodbc destino
+        tabla: Tabla de la dimensión
+        natural_id: Columna de la llave natural
+        ids: Llaves naturales a cerrar
+
+    Returns:
+        Llaves cerradas
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    cursor = target_conn.cursor()
+    cursor.fast_executemany = True
+    sql = (f"UPDATE dbo.{tabla} SET es_actual = 0, fecha_fin = CAST(GETDATE() AS DATE), updated_at = GETDATE() "
+           f"WHERE {natural_id} = ? AND es_actual = 1")
+    for i in range(0, len(ids), batch_size):
+        cursor.executemany(sql, [(valor,) for valor in ids[i:i + batch_size]])
+    target_conn.commit()
+    cursor.close()
+    return len(ids)
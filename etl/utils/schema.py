@@ -0,0 +1,196 @@
+"""
+Módulo de Tipos de Parámetros desde el Esquema Destino
+Lee los tipos de columna de los scripts DDL del DW (database/target) y
+arma las declaraciones de setinputsizes de pyodbc, para que cada sentencia
+declare una sola vez el tipo y tamaño de sus parámetros en lugar de que
+pyodbc los infiera fila por fila y SQL Server los convierta
+"""
+import math
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence
+import pyodbc
+
+# Scripts DDL con las tablas que escribe el ETL (los ALTER TABLE ... ADD se aplican en orden)
+SCHEMA_DIR = Path(__file__).parent.parent.parent / 'database' / 'target'
+SCHEMA_FILES = ('01_crear_dimensiones.sql', '02_crear_hechos.sql', '05_crear_tablas_etl.sql')
+
+ColumnType = namedtuple('ColumnType', ['tipo', 'longitud', 'escala'])
+
+# Página de códigos de las columnas VARCHAR del DW (intercalación Latin1/Modern_Spanish)
+PAGINA_CODIGOS = 'cp1252'
+
+_CREATE_TABLE = re.compile(r'CREATE TABLE\s+(\w+\.\w+)\s*\((.*?)\n\s*\);', re.DOTALL)
+_ALTER_ADD = re.compile(r'ALTER TABLE\s+(\w+\.\w+)\s+ADD\s+([a-z_]\w*)\s+([A-Z]\w*)(?:\s*\(\s*(\w+)\s*(?:,\s*(\d+)\s*)?\))?')
+# Columnas en minúscula; las líneas de constraints empiezan con palabras reservadas
+_COLUMNA = re.compile(r'^\s*([a-z_]\w*)\s+([A-Z]\w*)(?:\s*\(\s*(\w+)\s*(?:,\s*(\d+)\s*)?\))?')
+
+
+def _column_type(tipo: str, longitud: Optional[str], escala: Optional[str]) -> ColumnType:
+    """Normalizar tipo, largo (None para MAX o sin largo) y escala"""
+    if longitud is not None:
+        longitud = None if longitud.upper() == 'MAX' else int(longitud)
+    return ColumnType(tipo.upper(), longitud, int(escala) if escala else 0)
+
+
+def parse_schema(sql: str) -> dict:
+    """
+    Extraer las columnas de los CREATE TABLE y ALTER TABLE ... ADD de un script
+
+    Returns:
+        Diccionario tabla (ej. 'dbo.fact_ventas') -> {columna: ColumnType} en orden
+    """
+    tablas = {}
+    for tabla, cuerpo in _CREATE_TABLE.findall(sql):
+        columnas = tablas.setdefault(tabla.lower(), {})
+        for linea in cuerpo.splitlines():
+            match = _COLUMNA.match(linea.split('--')[0])
+            if match:
+                columnas[match.group(1)] = _column_type(*match.group(2, 3, 4))
+    for tabla, columna, tipo, longitud, escala in _ALTER_ADD.findall(sql):
+        tablas.setdefault(tabla.lower(), {}).setdefault(columna, _column_type(tipo, longitud or None, escala))
+    return tablas
+
+
+@lru_cache(maxsize=None)
+def get_target_schema() -> dict:
+    """Columnas de todas las tablas de los scripts de SCHEMA_FILES (se leen una vez)"""
+    tablas = {}
+    for nombre in SCHEMA_FILES:
+        sql = (SCHEMA_DIR / nombre).read_text(encoding='utf-8')
+        for tabla, columnas in parse_schema(sql).items():
+            existentes = tablas.setdefault(tabla, {})
+            for columna, tipo in columnas.items():
+                existentes.setdefault(columna, tipo)
+    return tablas
+
+
+def get_column_types(tabla: str, columnas: Sequence[str]) -> list:
+    """
+    Tipos de un conjunto de columnas de una tabla del DW
+
+    Args:
+        tabla: Tabla con esquema (ej. 'dbo.fact_ventas')
+        columnas: Columnas en el orden de los parámetros
+
+    Returns:
+        Lista de ColumnType
+    """
+    esquema = get_target_schema().get(tabla.lower())
+    if esquema is None:
+        raise ValueError(f"Tabla no definida en {', '.join(SCHEMA_FILES)}: {tabla}")
+    faltantes = [c for c in columnas if c not in esquema]
+    if faltantes:
+        raise ValueError(f"Columnas no definidas en {tabla}: {', '.join(faltantes)}")
+    return [esquema[c] for c in columnas]
+
+
+def input_size(column_type: ColumnType) -> Optional[tuple]:
+    """
+    Declaración (tipo SQL, tamaño, decimales) de pyodbc para una columna
+
+    Los tipos sin equivalente directo se declaran como None (pyodbc los infiere).
+    """
+    tipo, longitud, escala = column_type
+    if tipo in ('DECIMAL', 'NUMERIC'):
+        return (pyodbc.SQL_DECIMAL, longitud or 18, escala)
+    if tipo == 'INT':
+        return (pyodbc.SQL_INTEGER, 0, 0)
+    if tipo == 'BIGINT':
+        return (pyodbc.SQL_BIGINT, 0, 0)
+    if tipo == 'SMALLINT':
+        return (pyodbc.SQL_SMALLINT, 0, 0)
+    if tipo == 'BIT':
+        return (pyodbc.SQL_BIT, 0, 0)
+    if tipo == 'DATE':
+        return (pyodbc.SQL_TYPE_DATE, 10, 0)
+    if tipo in ('DATETIME2', 'DATETIME'):
+        return (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7)
+    if tipo == 'NVARCHAR':
+        return (pyodbc.SQL_WVARCHAR, longitud or 0, 0)
+    if tipo in ('VARCHAR', 'CHAR'):
+        return (pyodbc.SQL_VARCHAR, longitud or 0, 0)
+    if tipo in ('BINARY', 'VARBINARY'):
+        return (pyodbc.SQL_VARBINARY, longitud or 0, 0)
+    return None
+
+
+class TypedParameters:
+    """
+    Tipos de los parámetros de una sentencia según las columnas destino
+
+    sizes se pasa a cursor.setinputsizes; convert ajusta cada fila a esos
+    tipos: los float de columnas DECIMAL se redondean a la escala de la
+    columna como Decimal (sin deriva de precisión ni conversión en el
+    servidor) y los datetime de columnas DATE se truncan a date.
+    """
+
+    def __init__(self, tabla: str, columnas: Sequence[str]):
+        """
+        Args:
+            tabla: Tabla destino con esquema
+            columnas: Columnas en el orden de los parámetros
+        """
+        self.tabla = tabla
+        self.columnas = tuple(columnas)
+        tipos = get_column_types(tabla, self.columnas)
+        self.sizes = [input_size(t) for t in tipos]
+        # (posición, formato) de las columnas DECIMAL y posiciones de las DATE
+        self._decimales = [(i, f'.{t.escala}f') for i, t in enumerate(tipos) if t.tipo in ('DECIMAL', 'NUMERIC')]
+        self._fechas = [i for i, t in enumerate(tipos) if t.tipo == 'DATE']
+        self._bits = [i for i, t in enumerate(tipos) if t.tipo == 'BIT']
+        # (posición, largo, es unicode) de las columnas de texto
+        self._textos = [(i, t.longitud, t.tipo.startswith('N')) for i, t in enumerate(tipos)
+                        if t.tipo in ('NVARCHAR', 'VARCHAR', 'NCHAR', 'CHAR')]
+
+    def convert(self, params: Sequence) -> tuple:
+        """Ajustar una fila de parámetros a los tipos declarados"""
+        valores = list(params)
+        for i, formato in self._decimales:
+            valor = valores[i]
+            if isinstance(valor, float):
+                # NaN no es un DECIMAL válido: se envía NULL
+                valores[i] = None if math.isnan(valor) else Decimal(format(valor, formato))
+            elif isinstance(valor, int):
+                valores[i] = Decimal(valor)
+        for i in self._fechas:
+            if isinstance(valores[i], datetime):
+                valores[i] = valores[i].date()
+        return tuple(valores)
+
+    def normalize(self, params: Sequence) -> tuple:
+        """
+        Valores tal como quedan guardados en las columnas destino
+
+        Además de convert, redondea los Decimal a la escala de la columna,
+        guarda BIT como 0/1 y recorta los textos al largo de la columna (los
+        VARCHAR en PAGINA_CODIGOS). Sirve para comparar un dato de origen con el
+        mismo dato leído del DW (ej. el hash de atributos de una dimensión).
+        """
+        valores = list(self.convert(params))
+        for i, formato in self._decimales:
+            if isinstance(valores[i], Decimal) and valores[i].is_finite():
+                valores[i] = Decimal(format(valores[i], formato))
+        for i in self._bits:
+            if valores[i] is not None:
+                valores[i] = int(bool(valores[i]))
+        for i, longitud, unicode in self._textos:
+            valor = valores[i]
+            if not isinstance(valor, str):
+                continue
+            if longitud:
+                valor = valor[:longitud]
+            if not unicode:
+                valor = valor.encode(PAGINA_CODIGOS, errors='replace').decode(PAGINA_CODIGOS)
+            valores[i] = valor
+        return tuple(valores)
+
+    def bind(self, cursor):
+        """Declarar los tipos en un cursor (quedan hasta setinputsizes(None))"""
+        cursor.setinputsizes(self.sizes)
+        return cursor
+
@@ -0,0 +1,107 @@
+"""
+Módulo de Transformaciones Vectorizadas
+Funciones columnares (NumPy/pandas) para transformar bloques de filas
+extraídas sin recorrerlas una por una en Python
+"""
+from typing import Sequence
+import numpy as np
+import pandas as pd
+
+
+def rows_to_frame(rows: Sequence[dict]) -> pd.DataFrame:
+    """
+    Convertir un bloque de filas (diccionarios) a DataFrame sin alterar tipos
+
+    Todas las columnas quedan como object para conservar los valores
+    originales (ints con None no se convierten a float, Decimal se mantiene).
+
+    Args:
+        rows: Lista de diccionarios extraídos con DictCursor
+
+    Returns:
+        DataFrame con columnas object
+    """
+    return pd.DataFrame(list(rows), dtype=object)
+
+
+def truthy_mask(values) -> np.ndarray:
+    """
+    Máscara equivalente a bool(valor) para una columna object
+
+    None/NaN, 0 y '' se consideran falsos, igual que en Python.
+
+    Args:
+        values: Serie o arreglo de valores
+
+    Returns:
+        Arreglo booleano
+    """
+    series = pd.Series(values, dtype=object)
+    return (series.notna() & (series != 0) & (series != '')).to_numpy(dtype=bool)
+
+
+def to_float(values, default: float = 0.0) -> np.ndarray:
+    """
+    Convertir una columna a float64, reemplazando nulos por default
+
+    Equivale a float(valor or default) fila por fila.
+
+    Args:
+        values: Serie o arreglo de valores (Decimal, int, float, None)
+        default: Valor para nulos
+
+    Returns:
+        Arreglo float64
+    """
+    result = pd.Series(values, dtype=object).astype('float64').to_numpy()
+    return np.where(np.isnan(result), default, result)
+
+
+def map_keys(values, mapping: dict) -> np.ndarray:
+    """
+    Resolver surrogate keys en bloque (factorize + mapeo vectorizado)
+
+    Solo se consulta el diccionario una vez por valor distinto; el resultado
+    se expande a todas las filas indexando con los códigos de factorize.
+
+    Args:
+        values: Llaves naturales (Serie o arreglo), None = sin valor
+        mapping: Diccionario llave natural -> surrogate key
+
+    Returns:
+        Arreglo float64 con la key o NaN si no existe
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    lookup = np.empty(len(uniques) + 1, dtype='float64')
+    for i, value in enumerate(uniques):
+        key = mapping.get(value)
+        lookup[i] = np.nan if key is None else key
+    # El código -1 (nulo) cae en la última posición
+    lookup[-1] = np.nan
+    return lookup[codes]
+
+
+def to_sql_list(values: np.ndarray, missing: np.ndarray = None, as_int: bool = False) -> list:
+    """
+    Convertir un arreglo NumPy a lista de tipos nativos de Python para pyodbc
+
+    pyodbc no acepta numpy.int64, por eso se convierte con tolist() y los
+    faltantes se reemplazan por None.
+
+    Args:
+        values: Arreglo numérico
+        missing: Máscara de valores que deben enviarse como NULL
+        as_int: Si True, convierte a int
+
+    Returns:
+        Lista de valores nativos
+    """
+    if missing is None:
+        missing = np.isnan(values) if values.dtype.kind == 'f' else np.zeros(len(values), dtype=bool)
+    if as_int:
+        result = np.where(missing, 0, values).astype(np.int64).tolist()
+    else:
+        result = values.tolist()
+    for i in np.flatnonzero(missing):
+        result[i] = None
+    return result
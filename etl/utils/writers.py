@@ -0,0 +1,361 @@
+"""
+Módulo de Escritura por Lotes hacia SQL Server
+Acumula filas transformadas y las envía con executemany (fast_executemany)
+"""
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
+from etl.utils.bulkfile import write_bulk_file, bulk_insert_sql
+
+# Filas mínimas para que una carga masiva comprima directo a un rowgroup de un
+# columnstore agrupado (con menos, las filas quedan en el delta store)
+COLUMNSTORE_MIN_ROWS = 102400
+
+
+class RowWriter:
+    """
+    Escritor fila por fila (un execute por registro)
+    Se mantiene para comparar rendimiento contra BatchWriter
+    """
+
+    def __init__(self, conn, insert_sql: str, batch_size: int = 1000,
+                 on_error: Optional[Callable] = None):
+        """
+        Args:
+            conn: Conexión pyodbc destino
+            insert_sql: INSERT parametrizado con '?'
+            batch_size: Cada cuántas filas se hace commit
+            on_error: Función (params, exception) llamada cuando una fila falla
+        """
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.insert_sql = insert_sql
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        # Función (cursor, params) llamada antes de cada commit con la última fila del lote,
+        # dentro de la misma transacción (ej. guardar un checkpoint)
+        self.before_commit: Optional[Callable] = None
+        # Tipos de los parámetros del INSERT (etl.utils.schema.TypedParameters):
+        # se declaran con setinputsizes solo mientras corre el INSERT
+        self.parameter_types = None
+        self._pending = 0
+        self._last = None
+
+    def add(self, params: Sequence):
+        """Insertar una fila"""
+        start = time.perf_counter()
+        if self.parameter_types:
+            params = self.parameter_types.convert(params)
+        self._last = params
+        try:
+            with self._typed():
+                self.cursor.execute(self.insert_sql, params)
+            self.rows_written += 1
+            self._pending += 1
+        except Exception as e:
+            self.rows_failed += 1
+            if self.on_error:
+                self.on_error(params, e)
+        if self._pending >= self.batch_size:
+            self._commit()
+        self.elapsed += time.perf_counter() - start
+
+    def extend(self, rows: Iterable[Sequence]):
+        """Insertar varias filas"""
+        for params in rows:
+            self.add(params)
+
+    @contextmanager
+    def _typed(self):
+        """Declarar los tipos de parámetros durante el bloque (otras sentencias del cursor no los usan)"""
+        if not self.parameter_types:
+            yield
+            return
+        self.parameter_types.bind(self.cursor)
+        try:
+            yield
+        finally:
+            self.cursor.setinputsizes(None)
+
+    def _commit(self):
+        if self.before_commit and self._last is not None:
+            self.before_commit(self.cursor, self._last)
+        self.conn.commit()
+        self.batches += 1
+        self._pending = 0
+
+    def flush(self):
+        """Confirmar filas pendientes"""
+        start = time.perf_counter()
+        if self._pending:
+            self._commit()
+        self.elapsed += time.perf_counter() - start
+
+    def close(self):
+        """Confirmar pendientes y cerrar el cursor"""
+        self.flush()
+        self.cursor.close()
+
+    @property
+    def rows_per_second(self) -> float:
+        """Filas escritas por segundo (solo tiempo de escritura)"""
+        return self.rows_written / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class BatchWriter(RowWriter):
+    """
+    Escritor por lotes con executemany en modo fast_executemany
+    pyodbc envía cada lote como arreglos de parámetros en un solo viaje
+    """
+
+    def __init__(self, conn, insert_sql: str, batch_size: int = 1000,
+                 on_error: Optional[Callable] = None):
+        super().__init__(conn, insert_sql, batch_size, on_error)
+        self.cursor.fast_executemany = True
+        self.buffer = []
+
+    def add(self, params: Sequence):
+        """Agregar una fila al lote; se envía al llenarse"""
+        if self.parameter_types:
+            params = self.parameter_types.convert(params)
+        self.buffer.append(params)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Enviar el lote acumulado y hacer commit"""
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        start = time.perf_counter()
+        self._send(batch)
+        if self.before_commit:
+            self.before_commit(self.cursor, batch[-1])
+        self.conn.commit()
+        self.batches += 1
+        self.elapsed += time.perf_counter() - start
+
+    def _send(self, batch: list):
+        """Enviar un lote dentro de la transacción actual"""
+        self._before_batch()
+        try:
+            with self._typed():
+                self._execute_batch(batch)
+            self.rows_written += len(batch)
+        except Exception:
+            # El lote falló completo: reintentar fila por fila para aislar los errores
+            self.conn.rollback()
+            self._before_batch()
+            with self._typed():
+                self._write_rows(batch)
+        self._after_batch()
+
+    def _execute_batch(self, batch: list):
+        """Enviar el lote completo con executemany"""
+        self.cursor.executemany(self.insert_sql, batch)
+
+    def _before_batch(self):
+        """Punto de extensión: se ejecuta antes de enviar cada lote"""
+
+    def _after_batch(self):
+        """Punto de extensión: se ejecuta después de enviar cada lote"""
+
+    def _write_rows(self, batch: list):
+        """Insertar un lote fila por fila (solo tras un error en executemany)"""
+        for params in batch:
+            try:
+                self.cursor.execute(self.insert_sql, params)
+                self.rows_written += 1
+            except Exception as e:
+                self.rows_failed += 1
+                if self.on_error:
+                    self.on_error(params, e)
+
+
+class MergeWriter(BatchWriter):
+    """
+    Escritor idempotente vía tabla de staging
+    Cada lote se carga en la tabla de staging con fast_executemany y se
+    aplica al destino con un único MERGE (inserta o actualiza), todo en la
+    misma transacción
+    """
+
+    def __init__(self, conn, stage_insert_sql: str, merge_sql, clear_sql: str,
+                 batch_size: int = 1000, on_error: Optional[Callable] = None):
+        """
+        Args:
+            conn: Conexión pyodbc destino
+            stage_insert_sql: INSERT parametrizado sobre la tabla de staging
+            merge_sql: Sentencia (o lista de sentencias) que aplica la staging al
+                destino; las filas afectadas se toman de la última
+            clear_sql: Sentencia que vacía la staging (ej. TRUNCATE TABLE)
+            batch_size: Filas por lote
+            on_error: Función (params, exception) para filas que fallan
+        """
+        super().__init__(conn, stage_insert_sql, batch_size, on_error)
+        self.merge_sql = [merge_sql] if isinstance(merge_sql, str) else list(merge_sql)
+        self.clear_sql = clear_sql
+        self.rows_merged = 0
+
+    def _before_batch(self):
+        self.cursor.execute(self.clear_sql)
+
+    def _after_batch(self):
+        for statement in self.merge_sql:
+            self.cursor.execute(statement)
+        self.rows_merged += max(self.cursor.rowcount, 0)
+
+
+class ColumnstoreWriter(MergeWriter):
+    """
+    Escritor para tablas con índice columnstore agrupado
+    Acumula al menos COLUMNSTORE_MIN_ROWS filas en la tabla de staging (en
+    envíos de stage_batch_size filas) y las aplica con un único
+    INSERT ... SELECT WITH (TABLOCK), que SQL Server carga como inserción
+    masiva: cada lote se comprime directo a un rowgroup en lugar de pasar
+    por el delta store (con un columnstore no agrupado las filas pasan
+    igual por el delta store). Los lotes de menos de 1,048,576 filas
+    quedan como rowgroups recortados
+    """
+
+    def __init__(self, conn, stage_insert_sql: str, apply_sql, clear_sql: str,
+                 batch_size: int = COLUMNSTORE_MIN_ROWS, stage_batch_size: int = 1000,
+                 on_error: Optional[Callable] = None):
+        """
+        Args:
+            conn: Conexión pyodbc destino
+            stage_insert_sql: INSERT parametrizado sobre la tabla de staging
+            apply_sql: Sentencia (o lista) que aplica la staging; la última
+                debe ser el INSERT ... SELECT WITH (TABLOCK)
+            clear_sql: Sentencia que vacía la staging
+            batch_size: Filas por rowgroup (se eleva a COLUMNSTORE_MIN_ROWS)
+            stage_batch_size: Filas por executemany sobre la staging
+            on_error: Función (params, exception) para filas que fallan
+        """
+        super().__init__(conn, stage_insert_sql, apply_sql, clear_sql,
+                         max(batch_size, COLUMNSTORE_MIN_ROWS), on_error)
+        self.stage_batch_size = stage_batch_size
+
+    def _execute_batch(self, batch: list):
+        for i in range(0, len(batch), self.stage_batch_size):
+            self.cursor.executemany(self.insert_sql, batch[i:i + self.stage_batch_size])
+
+
+class BulkInsertWriter(MergeWriter):
+    """
+    Escritor vía archivos y BULK INSERT
+    Cada lote se escribe como archivo delimitado en un directorio local, se
+    carga en la tabla de staging con BULK INSERT (TABLOCK) y se aplica al
+    destino en la misma transacción; el archivo se borra al terminar. Si el
+    BULK INSERT falla, el lote se reintenta fila por fila sobre la staging.
+    """
+
+    def __init__(self, conn, stage_table: str, stage_insert_sql: str, apply_sql, clear_sql: str,
+                 directory: str, server_directory: Optional[str] = None, batch_size: int = 100000,
+                 bulk_batch_size: Optional[int] = None, keep_files: bool = False,
+                 on_error: Optional[Callable] = None):
+        """
+        Args:
+            conn: Conexión pyodbc destino
+            stage_table: Tabla de staging con las columnas en el orden de las filas
+            stage_insert_sql: INSERT parametrizado sobre la staging (reintento fila por fila)
+            apply_sql: Sentencia (o lista) que aplica la staging al destino
+            clear_sql: Sentencia que vacía la staging
+            directory: Directorio local donde se escriben los archivos
+            server_directory: El mismo directorio visto desde SQL Server
+                (ruta compartida); por defecto directory
+            batch_size: Filas por archivo
+            bulk_batch_size: BATCHSIZE de BULK INSERT (None = archivo completo)
+            keep_files: Conservar los archivos cargados (diagnóstico)
+            on_error: Función (params, exception) para filas que fallan
+        """
+        super().__init__(conn, stage_insert_sql, apply_sql, clear_sql, batch_size, on_error)
+        self.stage_table = stage_table
+        self.directory = Path(directory).resolve()
+        self.server_directory = server_directory or str(self.directory)
+        # Separador de rutas del servidor (Windows o Linux)
+        self._separador = '\\' if '\\' in self.server_directory else '/'
+        self.bulk_batch_size = bulk_batch_size
+        self.keep_files = keep_files
+        self.files = 0
+        self._prefix = uuid.uuid4().hex[:8]
+
+    def _execute_batch(self, batch: list):
+        self.files += 1
+        nombre = f"{self.stage_table.split('.')[-1]}_{self._prefix}_{self.files:05d}.dat"
+        path = self.directory / nombre
+        write_bulk_file(path, batch)
+        try:
+            server_path = f"{self.server_directory.rstrip(self._separador)}{self._separador}{nombre}"
+            self.cursor.execute(bulk_insert_sql(self.stage_table, server_path, self.bulk_batch_size))
+        finally:
+            if not self.keep_files:
+                os.remove(path)
+
+
+class NullWriter:
+    """
+    Escritor que descarta las filas (dry-run)
+    Cuenta filas y lotes con la misma interfaz que RowWriter, sin tocar el destino
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        self.before_commit: Optional[Callable] = None
+        self._pending = 0
+
+    def add(self, params: Sequence):
+        self.rows_written += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows: Iterable[Sequence]):
+        for params in rows:
+            self.add(params)
+
+    def flush(self):
+        if self._pending:
+            self.batches += 1
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+
+    @property
+    def rows_per_second(self) -> float:
+        return 0.0
+
+
+def create_writer(mode: str, conn, insert_sql: str, batch_size: int = 1000,
+                  on_error: Optional[Callable] = None) -> RowWriter:
+    """
+    Crear el escritor según el modo de inserción
+
+    Args:
+        mode: 'row' (fila por fila) o 'batch' (executemany por lotes)
+        conn: Conexión pyodbc destino
+        insert_sql: INSERT parametrizado con '?'
+        batch_size: Tamaño de lote
+        on_error: Función (params, exception) para filas que fallan
+
+    Returns:
+        Instancia de RowWriter o BatchWriter
+    """
+    if mode == 'row':
+        return RowWriter(conn, insert_sql, batch_size, on_error)
+    if mode == 'batch':
+        return BatchWriter(conn, insert_sql, batch_size, on_error)
+    raise ValueError(f"Modo de inserción no soportado: {mode}")
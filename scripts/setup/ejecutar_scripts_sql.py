@@ -52,7 +52,8 @@ if __name__ == "__main__":
         "01_crear_dimensiones.sql",
         "02_crear_hechos.sql",
         "03_crear_vistas.sql",
-        "04_crear_stored_procedures.sql"
+        "04_crear_stored_procedures.sql",
+        "05_crear_tablas_etl.sql"
     ]
     
     print("\n" + "="*80)
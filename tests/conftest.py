@@ -0,0 +1,12 @@
+"""
+Configuración de pytest para las pruebas unitarias (sin servidor)
+Cubren la lógica pura de etl/ (formatos, transformaciones, SQL generado);
+los scripts que trabajan contra las bases se siguen ejecutando con python
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Script de conexión a SQL Server que se ejecuta al importarse: no es una prueba de pytest
+collect_ignore = ['test_sqlserver.py']
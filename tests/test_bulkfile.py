@@ -0,0 +1,49 @@
+"""Pruebas del formato de archivos para BULK INSERT (etl/utils/bulkfile.py)"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from etl.utils.bulkfile import (write_bulk_file, read_bulk_file, bulk_insert_sql, format_value,
+                                FIELD_TERMINATOR, ROW_TERMINATOR, EMPTY_STRING)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'stg_fact_ventas_00001.dat'
+    filas = [
+        (1, 'ñandú', Decimal('12.3400'), date(2024, 1, 2), datetime(2024, 1, 2, 3, 4, 5), True),
+        (2, 'línea\nnueva', 1.5e-07, None, '', False),
+    ]
+
+    assert write_bulk_file(path, filas) == 2
+    assert not path.with_suffix('.dat.tmp').exists()
+    assert read_bulk_file(path) == [
+        ['1', 'ñandú', '12.3400', '2024-01-02', '2024-01-02 03:04:05.000000', '1'],
+        ['2', 'línea\nnueva', '0.000000', None, '', '0'],
+    ]
+
+
+def test_nulos_y_cadena_vacia():
+    # Con KEEPNULLS un campo vacío se carga como NULL; la cadena vacía lleva su propio marcador
+    assert format_value(None) == ''
+    assert format_value(float('nan')) == ''
+    assert format_value('') == EMPTY_STRING
+    assert format_value(f"{FIELD_TERMINATOR}{EMPTY_STRING}") == EMPTY_STRING
+
+
+def test_terminadores_dentro_de_los_datos():
+    assert format_value(f"a{FIELD_TERMINATOR}b{ROW_TERMINATOR}c") == 'abc'
+
+
+def test_float_sin_notacion_cientifica():
+    assert format_value(1e-07) == '0.000000'
+    assert format_value(1234.5) == '1234.500000'
+
+
+def test_bulk_insert_sql():
+    sql = bulk_insert_sql('dbo.stg_fact_ventas', "C:\\carga's\\x.dat", 5000)
+
+    assert sql.startswith("BULK INSERT dbo.stg_fact_ventas FROM 'C:\\carga''s\\x.dat' WITH (")
+    assert "FIELDTERMINATOR = '0x1f'" in sql
+    assert "ROWTERMINATOR = '0x1e'" in sql
+    assert 'KEEPNULLS' in sql and 'TABLOCK' in sql
+    assert 'BATCHSIZE = 5000' in sql
+    assert 'BATCHSIZE' not in bulk_insert_sql('dbo.stg_fact_ventas', '/srv/x.dat')
@@ -0,0 +1,61 @@
+"""Pruebas de la transformación del snapshot de cartera (etl/load/load_fact_cartera_snapshot.py)"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    # Sin el driver ODBC (libodbc) el módulo no se puede importar
+    pytest.skip('pyodbc no disponible', allow_module_level=True)
+
+from etl.load.load_fact_cartera_snapshot import esta_abierta, transform_cartera  # noqa: E402
+
+
+FECHA = date(2024, 3, 31)
+
+
+def venta(**cambios) -> dict:
+    row = {
+        'venta_id': 1, 'cliente_id': 5, 'vendedor_id': 2, 'condicion_pago_id': 3,
+        'fecha_venta': date(2024, 3, 1), 'monto_credito': Decimal('100.00'), 'saldo': Decimal('40.00'),
+        'fecha_liquidado': None, 'fecha_anulado': None,
+    }
+    row.update(cambios)
+    return row
+
+
+def test_esta_abierta():
+    assert esta_abierta(venta(), FECHA)
+    # Contado (0/1) o sin saldo
+    assert not esta_abierta(venta(condicion_pago_id=1), FECHA)
+    assert not esta_abierta(venta(condicion_pago_id=None), FECHA)
+    assert not esta_abierta(venta(saldo=Decimal('0')), FECHA)
+    # Liquidada o anulada en o antes del día del snapshot
+    assert not esta_abierta(venta(fecha_liquidado=FECHA), FECHA)
+    assert not esta_abierta(venta(fecha_anulado=date(2024, 3, 2)), FECHA)
+    assert esta_abierta(venta(fecha_liquidado=date(2024, 4, 1)), FECHA)
+
+
+def test_transform_cartera():
+    dim_keys = {'cliente': {5: 50}, 'vendedor': {2: 20}, 'condicion_pago': {3: 30}}
+    stats = {'omitidos': 0, 'errores': []}
+    rows = [
+        venta(),
+        venta(venta_id=2, saldo=0),
+        venta(venta_id=3, cliente_id=99),
+        venta(venta_id=4, vendedor_id=None),
+    ]
+
+    result = transform_cartera(rows, FECHA, dim_keys, stats)
+
+    assert result == [
+        (1, 50, 20, 30, date(2024, 3, 1), 100.0, 40.0, 1),
+        (2, None, None, None, None, None, None, 0),
+        # Cliente sin dimensión: se omite, pero la fila del snapshot base no se arrastra
+        (3, None, None, None, None, None, None, 0),
+        (4, 50, None, 30, date(2024, 3, 1), 100.0, 40.0, 1),
+    ]
+    assert stats['omitidos'] == 1
+    assert len(stats['errores']) == 1
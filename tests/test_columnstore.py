@@ -0,0 +1,41 @@
+"""Pruebas de la calidad de rowgroups columnstore (etl/utils/columnstore.py)"""
+from etl.utils.columnstore import ROWGROUP_MAX_ROWS, new_rowgroups, rowgroup_problems, rowgroup_summary
+
+
+def rowgroup(row_group_id: int, estado: str = 'COMPRESSED', filas: int = ROWGROUP_MAX_ROWS,
+             motivo: str = 'NO_TRIM', eliminadas: int = 0) -> dict:
+    return {
+        'row_group_id': row_group_id, 'partition_number': 1, 'estado': estado, 'filas': filas,
+        'filas_eliminadas': eliminadas, 'bytes': 0, 'motivo_recorte': motivo,
+    }
+
+
+ANTES = [rowgroup(0), rowgroup(1, filas=200000, motivo='BULKLOAD')]
+
+
+def test_carga_completa_sin_problemas():
+    # El último rowgroup lleva las filas sobrantes: puede quedar recortado
+    despues = ANTES + [rowgroup(2), rowgroup(3), rowgroup(4, filas=300000, motivo='BULKLOAD')]
+
+    assert rowgroup_problems(ANTES, despues) == []
+    resumen = rowgroup_summary(new_rowgroups(ANTES, despues))
+    assert resumen['comprimidos_completos'] == 2
+    assert resumen['motivos_recorte'] == {'BULKLOAD': 1}
+
+
+def test_rowgroups_recortados_o_en_delta_store():
+    despues = ANTES + [rowgroup(2, filas=102400, motivo='BULKLOAD'), rowgroup(3, 'OPEN', 5000, None),
+                       rowgroup(4, 'OPEN', 1000, None)]
+
+    problemas = rowgroup_problems(ANTES, despues)
+
+    assert len(problemas) == 2
+    assert 'BULKLOAD' in problemas[0] and 'OPEN' in problemas[1]
+
+
+def test_rowgroups_previos_no_se_evaluan():
+    # Un --merge borra filas de rowgroups existentes: cambian, pero no son de esta carga
+    despues = [rowgroup(0, eliminadas=10), ANTES[1], rowgroup(2)]
+
+    assert rowgroup_problems(ANTES, despues) == []
+    assert [rg['row_group_id'] for rg in new_rowgroups(ANTES, despues)] == [0, 2]
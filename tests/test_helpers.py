@@ -0,0 +1,27 @@
+"""Pruebas de las utilidades de etl/utils/helpers.py"""
+from datetime import date, timedelta
+
+from etl.utils.helpers import split_date_range
+
+
+def test_split_date_range_contiguo():
+    tramos = split_date_range(date(2024, 1, 1), date(2024, 1, 10), 3)
+
+    assert tramos == [
+        (date(2024, 1, 1), date(2024, 1, 4)),
+        (date(2024, 1, 5), date(2024, 1, 7)),
+        (date(2024, 1, 8), date(2024, 1, 10)),
+    ]
+    for (_, fin), (inicio, _) in zip(tramos, tramos[1:]):
+        assert inicio == fin + timedelta(days=1)
+
+
+def test_split_date_range_mas_partes_que_dias():
+    tramos = split_date_range(date(2024, 1, 1), date(2024, 1, 2), 8)
+
+    assert tramos == [(date(2024, 1, 1), date(2024, 1, 1)), (date(2024, 1, 2), date(2024, 1, 2))]
+
+
+def test_split_date_range_vacio():
+    assert split_date_range(date(2024, 1, 2), date(2024, 1, 1), 4) == []
+    assert split_date_range(date(2024, 1, 1), date(2024, 1, 1), 0) == [(date(2024, 1, 1), date(2024, 1, 1))]
@@ -0,0 +1,35 @@
+"""Pruebas del query de cada página del paginador por llave (etl/utils/keyset.py)"""
+import pytest
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    # Sin el driver ODBC (libodbc) el módulo no se puede importar
+    pytest.skip('pyodbc no disponible', allow_module_level=True)
+
+from etl.utils.keyset import KeysetPaginator  # noqa: E402
+
+
+QUERY = "SELECT v.id, v.fecha FROM ventas v WHERE v.fecha >= %s"
+
+
+def test_primera_pagina():
+    paginador = KeysetPaginator(QUERY, ['2024-01-01'], ('v.fecha', 'v.id'), ('fecha', 'id'), page_size=500)
+
+    query, params = paginador._page_query()
+
+    assert query == f"{QUERY} ORDER BY v.fecha, v.id LIMIT 500"
+    assert params == ['2024-01-01']
+
+
+def test_pagina_desde_posicion():
+    paginador = KeysetPaginator(QUERY, ['2024-01-01'], ('v.fecha', 'v.id', 's.id'), ('fecha', 'id', 'salida_id'),
+                                page_size=1000, position=('2024-02-01', 7, 70))
+
+    query, params = paginador._page_query()
+
+    assert query == (f"{QUERY} AND v.fecha >= %s AND (v.fecha, v.id, s.id) > (%s, %s, %s)"
+                     " ORDER BY v.fecha, v.id, s.id LIMIT 1000")
+    assert params == ['2024-01-01', '2024-02-01', '2024-02-01', 7, 70]
+    # Los parámetros base no se modifican entre páginas
+    assert paginador.params == ['2024-01-01']
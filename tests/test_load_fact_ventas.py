@@ -0,0 +1,52 @@
+"""Pruebas de la resolución de modos de carga (etl/load/load_fact_ventas.py)"""
+import pytest
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    # Sin el driver ODBC (libodbc) el módulo no se puede importar
+    pytest.skip('pyodbc no disponible', allow_module_level=True)
+
+from etl.load.load_fact_ventas import LoadOptions  # noqa: E402
+
+
+def test_dry_run_no_escribe():
+    opciones = LoadOptions(dry_run=True, truncate=True, insert_mode='bulk', infer_members=True, quarantine=True)
+
+    assert not opciones.truncate and not opciones.infer_members and not opciones.quarantine
+    assert opciones.modo == 'dry-run' and not opciones.checkpoints
+
+
+def test_reproceso_por_encima_de_la_extraccion():
+    opciones = LoadOptions(reprocess=True, truncate=True, keyset=True, shards=3, hash_join=True,
+                           posicion=('2024-01-01', 1, 1))
+
+    assert opciones.merge and opciones.quarantine and not opciones.truncate
+    assert opciones.extraccion == 'reproceso' and opciones.shards == 1 and opciones.posicion is None
+    assert not opciones.checkpoints
+
+
+def test_incremental_implica_merge():
+    opciones = LoadOptions(incremental=True, insert_mode='row')
+
+    assert opciones.merge and opciones.modo == 'merge'
+    assert opciones.extraccion == 'streaming' and opciones.checkpoints
+
+
+def test_extraccion_por_prioridad():
+    assert LoadOptions(keyset=True, shards=3, hash_join=True).extraccion == 'keyset'
+    assert LoadOptions(shards=3, hash_join=True).extraccion == 'shards'
+    assert LoadOptions(hash_join=True).extraccion == 'hash_join'
+
+
+def test_retomar_usa_los_parametros_de_la_ejecucion():
+    opciones = LoadOptions(resume=True, reprocess=True, truncate=True, shards=3)
+    opciones.apply_run({
+        'parametros': {'fecha_inicio': '2024-01-01', 'fecha_fin': '2024-01-31', 'merge': True,
+                       'incremental': False, 'as_of': True},
+        'posicion': ('2024-01-15', 10, 20),
+    })
+
+    assert not opciones.reprocess and not opciones.truncate and opciones.as_of
+    assert opciones.fecha_inicio == '2024-01-01' and opciones.posicion == ('2024-01-15', 10, 20)
+    assert opciones.extraccion == 'keyset' and opciones.modo == 'merge'
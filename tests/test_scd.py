@@ -0,0 +1,98 @@
+"""Pruebas de los auxiliares SCD Tipo 2 sin conexión (etl/utils/scd.py)"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    # Sin el driver ODBC (libodbc) el módulo no se puede importar
+    pytest.skip('pyodbc no disponible', allow_module_level=True)
+
+from etl.utils.scd import (AsOfKeys, attribute_hash, build_scd2_apply_sql, map_scd_keys, scd_key,  # noqa: E402
+                           to_days)
+
+
+# Cliente 1 con dos versiones, cliente 2 con una, y una versión cerrada el día en que abrió
+VERSIONES = [
+    (1, date(2024, 1, 1), date(2024, 3, 1), 10),
+    (1, date(2024, 3, 1), None, 11),
+    (2, date(2024, 2, 1), None, 20),
+    (3, date(2024, 5, 1), date(2024, 5, 1), 30),
+]
+
+
+def test_as_of_get():
+    mapping = AsOfKeys(VERSIONES)
+
+    assert mapping.get(1, date(2024, 2, 15)) == 10
+    assert mapping.get(1, datetime(2024, 3, 1, 8, 0)) == 11
+    assert mapping.get(1) == 11
+    # Antes de la primera versión se usa la primera
+    assert mapping.get(2, date(2023, 1, 1)) == 20
+    assert mapping.get(3, date(2024, 5, 1)) is None
+    assert mapping.get(99, date(2024, 1, 1)) is None
+
+
+def test_as_of_lookup_igual_a_get():
+    mapping = AsOfKeys(VERSIONES)
+    ids = [1, 1, 1, 2, None, 99, 1, '2']
+    fechas = [date(2024, 1, 5), date(2024, 3, 1), None, date(2023, 1, 1), date(2024, 1, 1),
+              date(2024, 1, 1), datetime(2024, 2, 29, 23, 0), date(2024, 6, 1)]
+
+    resultado = mapping.lookup(ids, fechas)
+
+    np.testing.assert_array_equal(resultado, [10, 11, 11, 20, np.nan, np.nan, 10, 20])
+    np.testing.assert_array_equal(mapping.lookup(ids, dias=to_days(fechas)), resultado)
+    assert map_scd_keys(ids, fechas, mapping).tolist()[:4] == [10, 11, 11, 20]
+
+
+def test_as_of_agregar_miembro():
+    mapping = AsOfKeys(VERSIONES)
+    mapping[5] = 50
+
+    assert mapping.get(5) == 50
+    assert mapping.lookup([5, 1], [None, date(2024, 1, 5)]).tolist() == [50, 10]
+
+
+def test_as_of_agregar_en_bloque():
+    mapping = AsOfKeys(VERSIONES)
+    mapping.update([(7, 70), (4, 40), (6, 60)])
+    mapping.update([])
+
+    assert len(mapping) == 5
+    assert mapping.get(4) == 40 and mapping.get(7, date.today()) == 70
+    assert mapping.lookup([6, 4, 1, 2], [None, None, date(2024, 1, 5), None]).tolist() == [60, 40, 10, 20]
+
+
+def test_as_of_vacio():
+    mapping = AsOfKeys([])
+
+    assert len(mapping) == 0
+    assert np.isnan(mapping.lookup([1, None], [date(2024, 1, 1), None])).all()
+
+
+def test_scd_key_con_diccionario():
+    assert scd_key({1: 10}, 1, date(2024, 1, 1)) == 10
+    assert map_scd_keys([1, 2], [None, None], {1: 10}).tolist()[0] == 10
+
+
+def test_attribute_hash():
+    base = attribute_hash(['Ana', Decimal('1.50'), True, date(2024, 1, 2), None])
+
+    assert len(base) == 16
+    assert attribute_hash(['Ana', 1.5, 1, datetime(2024, 1, 2, 10, 0), None]) == base
+    assert attribute_hash(['Ana', Decimal('1.50'), True, date(2024, 1, 2), '']) != base
+    assert attribute_hash(['Ana', None]) != attribute_hash([None, 'Ana'])
+
+
+def test_apply_sql_numera_desde_la_ultima_version():
+    sentencias = build_scd2_apply_sql('dim_cliente', 'cliente_id', ('cliente_id', 'nombre', 'version'))
+    insert = ' '.join(sentencias[-1].split())
+
+    assert insert.startswith('INSERT INTO dbo.dim_cliente (cliente_id, nombre, version, fecha_inicio')
+    # Una llave que reaparece continúa su numeración (todas sus filas, no solo la actual)
+    assert ("ISNULL((SELECT MAX(h.version) FROM dbo.dim_cliente h WHERE h.cliente_id = s.cliente_id), 0) + 1"
+            in insert)
@@ -0,0 +1,62 @@
+"""Pruebas de la lectura de DDL y los tipos de parámetros (etl/utils/schema.py)"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    # Sin el driver ODBC (libodbc) el módulo no se puede importar
+    pytest.skip('pyodbc no disponible', allow_module_level=True)
+
+from etl.utils.schema import parse_schema, get_column_types, ColumnType, TypedParameters  # noqa: E402
+
+
+DDL = """
+CREATE TABLE dbo.Prueba (
+    prueba_key INT IDENTITY(1,1) PRIMARY KEY,
+    nombre NVARCHAR(191) NOT NULL,   -- comentario DECIMAL(1,1)
+    notas NVARCHAR(MAX) NULL,
+    monto DECIMAL(12,4) NOT NULL DEFAULT 0.0,
+    fecha DATE NULL,
+    CONSTRAINT pk_prueba PRIMARY KEY (prueba_key)
+);
+
+ALTER TABLE dbo.Prueba ADD codigo VARCHAR(2) NULL;
+ALTER TABLE dbo.Prueba ADD monto DECIMAL(8,2) NULL;
+"""
+
+
+def test_parse_schema():
+    columnas = parse_schema(DDL)['dbo.prueba']
+
+    assert list(columnas) == ['prueba_key', 'nombre', 'notas', 'monto', 'fecha', 'codigo']
+    assert columnas['nombre'] == ColumnType('NVARCHAR', 191, 0)
+    assert columnas['notas'] == ColumnType('NVARCHAR', None, 0)
+    # Un ALTER ... ADD no reemplaza una columna ya declarada
+    assert columnas['monto'] == ColumnType('DECIMAL', 12, 4)
+    assert columnas['codigo'] == ColumnType('VARCHAR', 2, 0)
+
+
+def test_get_column_types_errores():
+    with pytest.raises(ValueError):
+        get_column_types('dbo.no_existe', ['x'])
+    with pytest.raises(ValueError):
+        get_column_types('dbo.fact_ventas', ['no_existe'])
+
+
+def test_typed_parameters_convert():
+    tipos = TypedParameters('dbo.fact_ventas', ('venta_id', 'cantidad', 'porcentaje_margen', 'fecha_venta'))
+
+    assert len(tipos.sizes) == 4
+    assert tipos.convert((1, 0.1 + 0.2, float('nan'), datetime(2024, 1, 2, 10, 30))) == \
+        (1, Decimal('0.3000'), None, date(2024, 1, 2))
+    assert tipos.convert((1, 3, None, None)) == (1, Decimal(3), None, None)
+
+
+def test_typed_parameters_normalize():
+    tipos = TypedParameters('dbo.dim_producto', ('codigo', 'categoria_codigo', 'nombre'))
+
+    assert tipos.normalize(('€ñ✓', 'ABC', 'x' * 200)) == ('€ñ?', 'AB', 'x' * 191)
+    assert tipos.normalize((None, None, None)) == (None, None, None)
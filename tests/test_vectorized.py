@@ -0,0 +1,40 @@
+"""Pruebas de las transformaciones columnares (etl/utils/vectorized.py)"""
+from decimal import Decimal
+
+import numpy as np
+
+from etl.utils.vectorized import rows_to_frame, truthy_mask, to_float, map_keys, to_sql_list
+
+
+def test_rows_to_frame_conserva_tipos():
+    df = rows_to_frame([{'id': 1, 'monto': Decimal('1.50')}, {'id': None, 'monto': None}])
+
+    assert df['id'].tolist() == [1, None]
+    assert isinstance(df['monto'][0], Decimal)
+
+
+def test_truthy_mask_igual_a_bool():
+    valores = [None, 0, '', 1, 'a', float('nan'), 5]
+
+    assert truthy_mask(valores).tolist() == [False, False, False, True, True, False, True]
+
+
+def test_to_float():
+    resultado = to_float([Decimal('1.25'), None, 3], default=-1.0)
+
+    assert resultado.tolist() == [1.25, -1.0, 3.0]
+
+
+def test_map_keys():
+    resultado = map_keys([1, 2, None, 1, 99], {1: 10, 2: 20})
+
+    np.testing.assert_array_equal(resultado, [10, 20, np.nan, 10, np.nan])
+
+
+def test_to_sql_list():
+    valores = np.array([1.0, np.nan, 3.0])
+
+    assert to_sql_list(valores) == [1.0, None, 3.0]
+    assert to_sql_list(valores, as_int=True) == [1, None, 3]
+    assert all(type(v) is int for v in to_sql_list(valores, as_int=True) if v is not None)
+    assert to_sql_list(np.array([1, 2]), missing=np.array([False, True])) == [1, None]